@@ -0,0 +1,106 @@
+# app/benchmark_leitor_excel.py
+"""
+Compara os motores de leitura de Excel disponíveis (ver app.logic.leitor_excel) em planilhas
+representativas do sistema, sempre com dtype=str, como os processadores leem:
+  - ACO: o formato importado pelas telas de ACO (OPERACAO, MATRICULA, CODIGO, VALOR, REFERENCIA, PRAZO);
+  - cadastro: o cadastro geral usado pelo Acordo de Prestadores (CPF, NOME, MATRICULA, CLAS_FUNC, SITUACAO);
+  - implantação: o arquivo de implantações (Matricula, Codigo, Operacao, Valor, Referencia, Prazo, Observacao).
+
+Além do tempo, confere se cada motor produz exatamente o mesmo DataFrame que o openpyxl.
+
+Uso:
+    python -m app.benchmark_leitor_excel [--linhas 20000] [--repeticoes 3] [--arquivos a.xlsx b.xlsx ...]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from app.logic.leitor_excel import ler_excel, motores_disponiveis, MOTORES_SUPORTADOS
+
+
+def gerar_planilhas(pasta: str, linhas: int) -> list:
+    """Cria as três planilhas de exemplo e retorna os seus caminhos."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(7)
+    matriculas = rng.integers(100_000, 999_999, linhas)
+    exemplos = {
+        "aco.xlsx": pd.DataFrame({
+            'OPERACAO': rng.choice([7, 8, 9], linhas),
+            'MATRICULA': matriculas,
+            'CODIGO': rng.choice([116, 898, 215, 301], linhas),
+            'VALOR': rng.integers(0, 500_000, linhas) / 100,
+            'REFERENCIA': rng.choice([0, 12, 24, 48, 96, 192], linhas),
+            'PRAZO': rng.choice(['', '1', '4'], linhas),
+        }),
+        "cadastro.xlsx": pd.DataFrame({
+            'CPF': [f"{v:011d}" for v in rng.integers(1_000_000_000, 99_999_999_999, linhas)],
+            'NOME': [f"SERVIDOR {m}" for m in matriculas],
+            'MATRICULA': matriculas,
+            'CLAS_FUNC': rng.choice([10021, 10033, 10015, 49911, 49921, 30000], linhas),
+            'SITUACAO': rng.choice(['ATIVO', 'AFASTADO', 'APOSENTADO'], linhas),
+        }),
+        "implantacao.xlsx": pd.DataFrame({
+            'Matricula': matriculas,
+            'Codigo': rng.choice([116, 898], linhas),
+            'Operacao': rng.choice([7, 8], linhas),
+            'Valor': rng.integers(0, 500_000, linhas) / 100,
+            'Referencia': rng.choice(['', '012', '024'], linhas),
+            'Prazo': rng.choice(['', '4'], linhas),
+            'Observacao': rng.choice(['', 'ACORDO', 'DECISÃO JUDICIAL'], linhas),
+            'Data': pd.Timestamp('2024-01-31'),
+        }),
+    }
+    caminhos = []
+    for nome, df in exemplos.items():
+        caminho = os.path.join(pasta, nome)
+        df.to_excel(caminho, index=False)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def medir(caminhos: list, repeticoes: int) -> list:
+    """Retorna linhas (arquivo, motor, melhor tempo em s, igual ao openpyxl)."""
+    resultados = []
+    for caminho in caminhos:
+        referencia = None
+        for motor in reversed(motores_disponiveis()):  # openpyxl primeiro, como referência
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                df = ler_excel(caminho, motor=motor, dtype=str)
+                tempos.append(time.perf_counter() - inicio)
+            if referencia is None:
+                referencia = df
+            resultados.append((os.path.basename(caminho), motor, min(tempos), df.equals(referencia)))
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara os motores de leitura de planilhas Excel.")
+    parser.add_argument("--linhas", type=int, default=20_000, help="Linhas das planilhas de exemplo.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--arquivos", nargs="*", help="Planilhas próprias a medir, no lugar das de exemplo.")
+    args = parser.parse_args(argv)
+
+    indisponiveis = [motor for motor in MOTORES_SUPORTADOS if motor not in motores_disponiveis()]
+    if indisponiveis:
+        print(f"⚠️ AVISO: Motores não instalados: {', '.join(indisponiveis)} (para o calamine: pip install python-calamine).")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = args.arquivos or gerar_planilhas(pasta, args.linhas)
+        resultados = medir(caminhos, args.repeticoes)
+
+    tempos_openpyxl = {arquivo: tempo for arquivo, motor, tempo, _ in resultados if motor == 'openpyxl'}
+    print(f"{'Arquivo':<22} {'Motor':<10} {'Tempo':>10}  {'Ganho':>6}  Resultado")
+    for arquivo, motor, tempo, igual in resultados:
+        ganho = tempos_openpyxl[arquivo] / tempo
+        print(f"{arquivo:<22} {motor:<10} {tempo * 1000:8.0f} ms  {ganho:5.1f}x  {'idêntico' if igual else 'DIFERENTE do openpyxl'}")
+    return 0 if all(igual for *_, igual in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
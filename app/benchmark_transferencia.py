@@ -0,0 +1,96 @@
+# app/benchmark_transferencia.py
+"""
+Compara a transferência de um DataFrame grande de um processo de trabalho para a interface:
+  - pickle: o DataFrame é enviado pelo pipe (serializado no filho e reconstruído no pai);
+  - arrow_shm: o filho publica a tabela em Arrow IPC na memória compartilhada e o pai a abre
+    sem cópia (é assim que os resultados chegam ao DataFrameTableModel);
+  - arrow_shm + to_pandas: o mesmo, convertendo em seguida para DataFrame comum.
+
+O tempo medido vai do pedido de envio até o objeto estar utilizável no processo pai; a geração
+dos dados no filho não entra na conta.
+
+Uso:
+    python -m app.benchmark_transferencia [--linhas 1000000] [--repeticoes 3]
+"""
+import sys
+import time
+import argparse
+import multiprocessing
+
+from app.transferencia_arrow import arrow_disponivel, publicar_tabela, abrir_tabela, liberar_tabelas_publicadas
+
+
+def gerar_dataframe(linhas: int):
+    """DataFrame no formato do resultado da Análise da Folha (texto, números e a coluna de teste)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    matriculas = rng.integers(1_000_000, 9_999_999, linhas)
+    return pd.DataFrame({
+        'MATRICULA': matriculas.astype(str),
+        'CODIGO': rng.integers(100, 999, linhas).astype(str),
+        'OPERACAO': rng.choice([7, 8, 9], linhas),
+        'VALOR_transp': rng.integers(0, 500_000, linhas).astype(float),
+        'VALOR_dados': rng.integers(0, 500_000, linhas).astype(float),
+        'NOME': pd.Series([f"SERVIDOR {m}" for m in matriculas]),
+        'ORGAO': rng.choice(['SEAD', 'SESAU', 'SEDUC', 'PM', 'PC'], linhas),
+        'TESTE': rng.choice(['SUCESSO', 'FALHOU'], linhas),
+    })
+
+
+def _filho(conexao, linhas: int, modo: str):
+    df = gerar_dataframe(linhas)
+    conexao.send('pronto')
+    while conexao.recv() == 'enviar':
+        liberar_tabelas_publicadas()  # A tabela anterior já foi aberta
+        conexao.send(df if modo == 'pickle' else publicar_tabela(df))
+    liberar_tabelas_publicadas()
+
+
+def medir(linhas: int, repeticoes: int) -> dict:
+    """Retorna o melhor tempo (em segundos) de cada modo."""
+    mp = multiprocessing.get_context('spawn')
+    modos = ['pickle'] + (['arrow_shm', 'arrow_shm + to_pandas'] if arrow_disponivel() else [])
+    resultados = {}
+    for modo in modos:
+        conexao, conexao_filho = mp.Pipe()
+        processo = mp.Process(target=_filho, args=(conexao_filho, linhas, 'pickle' if modo == 'pickle' else 'arrow'))
+        processo.start()
+        conexao.recv()
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            conexao.send('enviar')
+            recebido = conexao.recv()
+            if modo != 'pickle':
+                recebido = abrir_tabela(recebido)
+                if modo == 'arrow_shm + to_pandas':
+                    recebido = recebido.to_pandas()
+            tempos.append(time.perf_counter() - inicio)
+            assert len(recebido) == linhas
+            del recebido
+        conexao.send('parar')
+        processo.join()
+        resultados[modo] = min(tempos)
+    return resultados
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compara pickle e Arrow em memória compartilhada na transferência de resultados.")
+    parser.add_argument("--linhas", type=int, default=1_000_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if not arrow_disponivel():
+        print("⚠️ AVISO: pyarrow não está instalado; apenas o modo pickle será medido.")
+    print(f"Transferindo um DataFrame de {args.linhas:,} linhas (melhor de {args.repeticoes}):".replace(',', '.'))
+    resultados = medir(args.linhas, args.repeticoes)
+    base = resultados['pickle']
+    for modo, tempo in resultados.items():
+        print(f"  {modo:<22} {tempo * 1000:9.1f} ms  ({base / tempo:5.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,10 @@ import pandas as pd
 import os
 from collections import defaultdict
 
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel
+from app.logic.cabecalho_planilha import ler_cabecalho, colunas_faltantes
+
 
 class AcoDemaisCatProcessor:
     """
@@ -44,27 +48,35 @@ class AcoDemaisCatProcessor:
         return h_majorada, h_normal
 
     def validar_e_padronizar_arquivo(self, caminho_arquivo):
-        """Valida se o arquivo Excel possui as colunas necessárias e estrutura correta."""
+        """
+        Valida se o arquivo Excel possui as colunas necessárias e estrutura correta.
+        Lê apenas o cabeçalho e uma amostra das linhas (ver ler_cabecalho), não o arquivo inteiro.
+        """
         try:
             if not os.path.exists(caminho_arquivo):
                 return {'status': 'erro', 'mensagem': f'Arquivo não encontrado: {caminho_arquivo}'}
-            df = pd.read_excel(caminho_arquivo, dtype=str, engine='openpyxl')
-            if df.empty:
+            cabecalho = ler_cabecalho(caminho_arquivo)
+            amostra = cabecalho['amostra']
+            if amostra.empty:
                 return {'status': 'erro', 'mensagem': 'Arquivo está vazio'}
             # A validação de colunas é simplificada, pois VALOR não é mais usado para lógica
             colunas_obrigatorias = ['OPERACAO', 'MATRICULA', 'CODIGO', 'REFERENCIA', 'PRAZO']
-            colunas_faltantes = [col for col in colunas_obrigatorias if col not in df.columns]
-            if colunas_faltantes:
-                return {'status': 'erro', 'mensagem': f'Colunas obrigatórias faltantes: {", ".join(colunas_faltantes)}'}
-            if df['MATRICULA'].isna().all():
+            faltantes = colunas_faltantes(cabecalho['colunas'], colunas_obrigatorias)
+            if faltantes:
+                return {'status': 'erro', 'mensagem': f'Colunas obrigatórias faltantes: {", ".join(faltantes)}'}
+            if amostra['MATRICULA'].isna().all():
                 return {'status': 'erro', 'mensagem': 'Coluna MATRICULA não possui dados válidos'}
             return {'status': 'sucesso', 'mensagem': 'Arquivo válido'}
         except Exception as e:
             return {'status': 'erro', 'mensagem': f'Erro ao validar arquivo: {str(e)}'}
 
     def processar_arquivos(self, arquivos_com_limites: list, pasta_destino: str,
-                           gerar_analise: bool = True) -> dict:
-        """Consolida e processa arquivos de ajuda de custo."""
+                           gerar_analise: bool = True, contexto: ContextoProgresso = None) -> dict:
+        """
+        Consolida e processa arquivos de ajuda de custo.
+        O `contexto` (opcional) recebe o progresso por linha e pode interromper o processamento entre blocos de linhas.
+        """
+        contexto = contexto or CONTEXTO_NULO
         if not arquivos_com_limites:
             raise ValueError("Nenhum arquivo para processar foi fornecido.")
         os.makedirs(pasta_destino, exist_ok=True)
@@ -73,15 +85,18 @@ class AcoDemaisCatProcessor:
 
         # Etapa Única: Processar todos os arquivos de ajuda de custo
         self.log("\n--- Iniciando Processamento de Ajuda de Custo ---")
-        for item in arquivos_com_limites:
+        for n_arquivo, item in enumerate(arquivos_com_limites, start=1):
             caminho_arquivo = item['caminho']
             nome_amigavel = item.get('nome_amigavel', os.path.basename(caminho_arquivo))
             limite_horas = item.get('limite_horas', self.LIMITE_PADRAO_HORAS)
+            etapa = f"Arquivo {n_arquivo}/{len(arquivos_com_limites)}: {nome_amigavel}"
+            contexto.progresso(0, 0, etapa)
             self.log(f"Lendo arquivo '{nome_amigavel}' (Limite de Horas: {limite_horas})")
 
             try:
-                df = pd.read_excel(caminho_arquivo, dtype=str, engine='openpyxl')
-                for _, row in df.iterrows():
+                df = ler_excel(caminho_arquivo, dtype=str)
+                for i, (_, row) in enumerate(df.iterrows(), start=1):
+                    contexto.marcar(i, len(df), etapa)
                     matricula = self._limpar_campo(row.get('MATRICULA'))
                     codigo = self._limpar_campo(row.get('CODIGO'))
                     ref_val = pd.to_numeric(row.get('REFERENCIA'), errors='coerce')
@@ -112,7 +127,8 @@ class AcoDemaisCatProcessor:
         # Etapa final: Geração dos arquivos
         self.log("\n--- Análise de horas e geração de arquivos ---")
         lista_final_para_df = []
-        for matricula, data in dados_consolidados.items():
+        for i, (matricula, data) in enumerate(dados_consolidados.items(), start=1):
+            contexto.marcar(i, len(dados_consolidados), "Análise de horas por matrícula")
             for codigo, detalhes in data['detalhes_por_codigo'].items():
                 soma_ref_bruta = detalhes['soma_referencia']
                 h_majorada, h_normal = self._parse_referencia(soma_ref_bruta)
@@ -132,6 +148,7 @@ class AcoDemaisCatProcessor:
                     "caminhos_saida": {}}
 
         df_completo = pd.DataFrame(lista_final_para_df)
+        contexto.etapa("Gerando arquivos de saída")
 
         # Filtro para o arquivo de implantação
         df_implantacao_filtrado = df_completo[df_completo['TOTAL_HORAS'] <= df_completo['LIMITE_HORAS_APLICADO']].copy()
@@ -4,6 +4,9 @@ import re
 from collections import defaultdict
 import json
 
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel, ler_abas
+
 
 class AcoMilitarProcessor:
     """
@@ -71,7 +74,7 @@ class AcoMilitarProcessor:
             if not os.path.exists(caminho_arquivo):
                 return {'status': 'erro', 'mensagem': f'Arquivo não encontrado: {caminho_arquivo}', 'dataframe': None}
 
-            df = pd.read_excel(caminho_arquivo, dtype=str, engine='openpyxl').fillna('')
+            df = ler_excel(caminho_arquivo, dtype=str).fillna('')
 
             if df.empty:
                 return {'status': 'erro', 'mensagem': 'O arquivo Excel está vazio.', 'dataframe': None}
@@ -162,9 +165,22 @@ class AcoMilitarProcessor:
             return {'status': 'erro', 'mensagem': f'Erro inesperado ao ler ou validar o arquivo: {str(e)}',
                     'dataframe': None}
 
+    def validar_arquivo(self, caminho_arquivo, contexto: ContextoProgresso = None) -> dict:
+        """
+        validar_e_padronizar_arquivo sem o DataFrame no resultado ({'status', 'mensagem'}): usada
+        pela interface em um processo de trabalho, para os dados não voltarem pelo pipe. O
+        processamento lê e valida o arquivo de novo.
+        """
+        resultado = self.validar_e_padronizar_arquivo(caminho_arquivo)
+        return {'status': resultado['status'], 'mensagem': resultado['mensagem']}
+
     def processar_arquivos_militares(self, arquivos_info: list, pasta_destino: str,
-                                     gerar_analise: bool = True) -> dict:
-        """Consolida e processa arquivos de ACO e Magistério, utilizando DataFrames pré-validados quando disponíveis."""
+                                     gerar_analise: bool = True, contexto: ContextoProgresso = None) -> dict:
+        """
+        Consolida e processa arquivos de ACO e Magistério, utilizando DataFrames pré-validados quando disponíveis.
+        O `contexto` (opcional) recebe o progresso por linha e pode interromper o processamento entre blocos de linhas.
+        """
+        contexto = contexto or CONTEXTO_NULO
         if not arquivos_info:
             raise ValueError("Nenhum arquivo para processar foi fornecido.")
         os.makedirs(pasta_destino, exist_ok=True)
@@ -176,17 +192,24 @@ class AcoMilitarProcessor:
         # ETAPA 1: Processar Magistério para criar um dicionário de consulta
         self.log("\n--- ETAPA 1: Criando lookup de horas de Magistério ---")
         arquivos_magisterio = [f for f in arquivos_info if f.get('tipo', '').strip().upper() == 'MAGISTERIO']
-        for item in arquivos_magisterio:
+        for n_arquivo, item in enumerate(arquivos_magisterio, start=1):
             caminho_arquivo = item['caminho']
             nome_amigavel = item.get('nome_amigavel', os.path.basename(caminho_arquivo))
+            etapa = f"Magistério {n_arquivo}/{len(arquivos_magisterio)}: {nome_amigavel}"
+            contexto.progresso(0, 0, etapa)
             self.log(f"Lendo arquivo de Magistério para consulta: '{nome_amigavel}'")
             try:
-                # Lógica para Magistério continua lendo do disco, pois não passa pela mesma validação na GUI
-                all_sheets = pd.read_excel(caminho_arquivo, dtype=str, sheet_name=None, engine='openpyxl')
-                first_sheet_name = list(all_sheets.keys())[0]
-                df_mag = all_sheets[first_sheet_name]
-
-                for _, row in df_mag.iterrows():
+                # Lógica para Magistério continua lendo do disco, pois não passa pela mesma validação na GUI.
+                # Lê só as abas selecionadas no item (padrão: a primeira), e não a planilha inteira.
+                abas_mag = ler_abas(caminho_arquivo, item.get('abas'), dtype=str)
+                if not abas_mag:
+                    raise ValueError("nenhuma aba corresponde à seleção")
+                if len(abas_mag) > 1:
+                    self.log(f"-> Abas lidas: {', '.join(abas_mag)}")
+                df_mag = pd.concat(abas_mag.values(), ignore_index=True)
+
+                for i, (_, row) in enumerate(df_mag.iterrows(), start=1):
+                    contexto.marcar(i, len(df_mag), etapa)
                     matricula = self._limpar_campo(row.get('MATRICULA'))
                     if not matricula: continue
 
@@ -206,11 +229,13 @@ class AcoMilitarProcessor:
         if not arquivos_aco:
             raise ValueError("Nenhum arquivo do tipo 'ACO' (militar/padrão) foi fornecido para processamento.")
 
-        for item in arquivos_aco:
+        for n_arquivo, item in enumerate(arquivos_aco, start=1):
             caminho_arquivo = item['caminho']
             nome_amigavel = item.get('nome_amigavel', os.path.basename(caminho_arquivo))
             limite_horas = item.get('limite_horas', self.LIMITE_PADRAO_HORAS)
             limite_gmr = item.get('limite_gmr_horas', self.LIMITE_PADRAO_GMR_HORAS)
+            etapa = f"ACO {n_arquivo}/{len(arquivos_aco)}: {nome_amigavel}"
+            contexto.progresso(0, 0, etapa)
             self.log(f"Processando arquivo ACO '{nome_amigavel}'")
             try:
                 # --- MELHORIA: Utiliza DataFrame pré-validado se disponível ---
@@ -218,12 +243,16 @@ class AcoMilitarProcessor:
                     self.log(f"-> Usando dados pré-validados e limpos para '{nome_amigavel}'.")
                     df_aco = item['dataframe']
                 else:
-                    # Fallback: lê o arquivo do disco se não houver DataFrame
-                    self.log(f"-> Lendo arquivo do disco para '{nome_amigavel}' (validação não fornecida).")
-                    df_aco = pd.read_excel(caminho_arquivo, dtype=str, engine='openpyxl')
+                    # Sem DataFrame (ex: a interface envia só o caminho): lê e valida o arquivo do disco
+                    self.log(f"-> Lendo e validando o arquivo do disco para '{nome_amigavel}'.")
+                    validacao = self.validar_e_padronizar_arquivo(caminho_arquivo)
+                    if validacao['status'] != 'sucesso':
+                        raise ValueError(validacao['mensagem'])
+                    df_aco = validacao['dataframe']
                 # --- FIM DA MELHORIA ---
 
-                for _, row in df_aco.iterrows():
+                for i, (_, row) in enumerate(df_aco.iterrows(), start=1):
+                    contexto.marcar(i, len(df_aco), etapa)
                     matricula = self._limpar_campo(row.get('MATRICULA'))
                     codigo = self._limpar_campo(row.get('CODIGO'))
                     valor_num = self._tratar_valor_monetario(row.get('VALOR'))
@@ -265,7 +294,9 @@ class AcoMilitarProcessor:
 
         # ... (O restante da função continua igual)
         caminhos_saida = {}
+        contexto.verificar_cancelamento()
         if log_detalhado:
+            contexto.etapa("Salvando log detalhado")
             df_log_detalhado = pd.DataFrame(log_detalhado)
             caminho_log_detalhado = os.path.join(pasta_destino, "log_detalhado_processamento.xlsx")
             df_log_detalhado.to_excel(caminho_log_detalhado, index=False)
@@ -275,7 +306,8 @@ class AcoMilitarProcessor:
         # ETAPA 3: Geração da estrutura interna e do arquivo final
         self.log("\n--- INICIANDO ETAPA 3: Análise de horas e geração de arquivos ---")
         lista_final_para_df = []
-        for matricula, data in dados_consolidados.items():
+        for i, (matricula, data) in enumerate(dados_consolidados.items(), start=1):
+            contexto.marcar(i, len(dados_consolidados), "Análise de horas por matrícula")
             for codigo, detalhes in data['detalhes_por_codigo'].items():
                 soma_ref_bruta = detalhes['soma_referencia']
                 h_majorada, h_normal = self._parse_referencia(soma_ref_bruta)
@@ -309,6 +341,7 @@ class AcoMilitarProcessor:
 
         df_completo = pd.DataFrame(lista_final_para_df)
 
+        contexto.etapa("Gerando arquivos de saída")
         caminhos_saida["estrutura_interna"] = self._gerar_arquivo_estrutura_interna(df_completo, pasta_destino)
 
         # Gerando arquivo final para implantação com filtro
@@ -3,7 +3,27 @@ import pandas as pd
 import os
 import re
 import sys  # Para sys.exit(), se ainda for necessário em caso de cancelamento
+import time
 import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel
+from app.logic.escrita_em_fluxo import salvar_excel
+
+
+def _cronometrar(funcao, *args, **kwargs) -> tuple:
+    """Executa a função e retorna (resultado, segundos gastos)."""
+    inicio = time.perf_counter()
+    return funcao(*args, **kwargs), time.perf_counter() - inicio
+
+
+def _ler_no_processo(metodo: str, caminho: str) -> tuple:
+    """Executa uma leitura do processador em um processo separado (sem log) e a cronometra."""
+    processador = AcordoPrestadoresProcessor(logger_callback=lambda _mensagem: None)
+    return _cronometrar(getattr(processador, metodo), caminho)
 
 
 class AcordoPrestadoresProcessor:
@@ -21,6 +41,9 @@ class AcordoPrestadoresProcessor:
         self.log = logger_callback if logger_callback else self._default_logger
         self.clf_habilitadas = [10021, 10033, 10015, 49911, 49921]  # Constante de filtro
 
+    COLUNAS_FOLHA = ['MATRICULA', 'NOME', 'CODIGO', 'VALOR', 'REFERENCIA', 'PRAZO', 'ORGAO', 'CLF', 'SIMBOLO',
+                     'SITUACAO', 'SAIDA', 'DATA_AFAST', 'GRUPO', 'REGIME_PREV']
+
     def _default_logger(self, message):
         """Um logger padrão simples para uso quando nenhum callback é fornecido."""
         print(message)
@@ -38,46 +61,38 @@ class AcordoPrestadoresProcessor:
         mat_texto = str(mat).split('.')[0]
         return mat_texto.strip()
 
-    def processar_acordo_prestadores(self,
-                                     arquivo_cadastro: str,
-                                     arquivo_advogados: str,
-                                     arquivo_116: str,
-                                     arquivo_898_csv: str,
-                                     caminho_base_saida: str):
-        """
-        Orquestra todo o processo de geração do 'Acordo de Prestadores'.
+    def _ler_cadastro(self, arquivo_cadastro: str) -> pd.DataFrame:
+        """Cadastro geral filtrado pelas CLFs habilitadas, com o CPF padronizado."""
+        colunas_cadastro = ['CPF', 'NOME', 'MATRICULA', 'CLAS_FUNC', 'SITUACAO']
+        df_cadastro = ler_excel(arquivo_cadastro, usecols=colunas_cadastro)
+        df_cadastro.dropna(subset=['CPF'], inplace=True)
+        df_resumido = df_cadastro[df_cadastro['CLAS_FUNC'].isin(self.clf_habilitadas)].copy()
+        df_resumido['CPF_PADRAO'] = df_resumido['CPF'].apply(self._formatar_cpf_padrao)
+        return df_resumido
 
-        Args:
-            arquivo_cadastro (str): Caminho para o arquivo Excel de cadastro geral.
-            arquivo_advogados (str): Caminho para a lista de advogados (Excel).
-            arquivo_116 (str): Caminho para o arquivo CSV do código 116.
-            arquivo_898_csv (str): Caminho para o arquivo CSV do código 898.
-            caminho_base_saida (str): Pasta onde todos os arquivos de saída serão salvos.
-        """
-        self.log("----- INICIANDO PROCESSO COMPLETO DE ACORDO DE PRESTADORES -----")
-        os.makedirs(caminho_base_saida, exist_ok=True)  # Garante que a pasta de destino exista
+    def _ler_advogados(self, arquivo_advogados: str) -> pd.DataFrame:
+        """Lista dos advogados com o CPF padronizado."""
+        df_adv = ler_excel(arquivo_advogados, usecols=['CPF x1'])
+        df_adv.dropna(subset=['CPF x1'], inplace=True)
+        df_adv['CPF_PADRAO'] = df_adv['CPF x1'].apply(self._formatar_cpf_padrao)
+        return df_adv
 
-        # --- 2. LEITURA E FILTRO INICIAL DO CADASTRO ---
-        try:
-            colunas_cadastro = ['CPF', 'NOME', 'MATRICULA', 'CLAS_FUNC', 'SITUACAO']
-            df_cadastro = pd.read_excel(arquivo_cadastro, usecols=colunas_cadastro)
-            df_cadastro.dropna(subset=['CPF'], inplace=True)
-            df_resumido = df_cadastro[df_cadastro['CLAS_FUNC'].isin(self.clf_habilitadas)].copy()
-            df_resumido['CPF_PADRAO'] = df_resumido['CPF'].apply(self._formatar_cpf_padrao)
-            self.log(f"✓ Cadastro lido e filtrado por CLF: {len(df_resumido)} registros.")
-        except Exception as e:
-            raise ValueError(f"Erro ao ler ou processar o Arquivo de Cadastro Geral: {e}")
+    def _ler_codigos_folha(self, arquivo_csv: str) -> pd.DataFrame:
+        return pd.read_csv(arquivo_csv, sep=',', names=self.COLUNAS_FOLHA, header=None, dtype=str)
 
-        # --- 3. LEITURA DA LISTA DOS ADVOGADOS ---
+    @staticmethod
+    def _resultado(futuro, tempos: dict, etapa: str, mensagem_erro: str):
+        """Resultado de uma leitura em paralelo (ver _cronometrar), registrando a sua duração."""
         try:
-            df_adv = pd.read_excel(arquivo_advogados, usecols=['CPF x1'])
-            df_adv.dropna(subset=['CPF x1'], inplace=True)
-            df_adv['CPF_PADRAO'] = df_adv['CPF x1'].apply(self._formatar_cpf_padrao)
-            self.log(f"✓ Lista de advogados lida: {len(df_adv)} CPFs.")
+            resultado, segundos = futuro.result()
         except Exception as e:
-            raise ValueError(f"Erro ao ler ou processar a Lista dos Advogados: {e}")
+            raise ValueError(f"{mensagem_erro}: {e}")
+        tempos[etapa] = segundos
+        return resultado
 
-        # --- 4. CRUZAMENTO INICIAL E GERAÇÃO DE INAPTOS ---
+    def _cruzar_cadastro_e_advogados(self, df_resumido: pd.DataFrame, df_adv: pd.DataFrame,
+                                     caminho_base_saida: str) -> pd.DataFrame:
+        """Cruza as duas listas, grava INAPTOS.xlsx e retorna os servidores encontrados no cadastro."""
         df_merged = pd.merge(df_resumido, df_adv, on='CPF_PADRAO', how='right', indicator=True)
         df_aptos_inicial = df_merged[df_merged['_merge'] == 'both'].copy()
 
@@ -97,31 +112,134 @@ class AcordoPrestadoresProcessor:
             self.log(f"✓ Arquivo 'INAPTOS.xlsx' salvo com {len(df_inaptos)} servidores.")
         else:
             self.log("Aviso: Não foi possível gerar 'INAPTOS.xlsx' por falta de colunas necessárias.")
+        return df_aptos_inicial
+
+    def processar_acordo_prestadores(self,
+                                     arquivo_cadastro: str,
+                                     arquivo_advogados: str,
+                                     arquivo_116: str,
+                                     arquivo_898_csv: str,
+                                     caminho_base_saida: str,
+                                     contexto: ContextoProgresso = None):
+        """
+        Orquestra todo o processo de geração do 'Acordo de Prestadores'.
+
+        As quatro entradas são lidas ao mesmo tempo: as planilhas (cadastro geral e advogados),
+        cuja interpretação é limitada pela CPU, em processos separados, e os CSVs da folha em
+        threads. Cada cruzamento começa assim que as suas entradas ficam prontas (os códigos
+        116/898 enquanto o cadastro ainda é lido) e, ao final, o tempo de cada etapa vai para o log.
+
+        Args:
+            arquivo_cadastro (str): Caminho para o arquivo Excel de cadastro geral.
+            arquivo_advogados (str): Caminho para a lista de advogados (Excel).
+            arquivo_116 (str): Caminho para o arquivo CSV do código 116.
+            arquivo_898_csv (str): Caminho para o arquivo CSV do código 898.
+            caminho_base_saida (str): Pasta onde todos os arquivos de saída serão salvos.
+            contexto (ContextoProgresso, optional): Recebe a etapa atual e permite cancelar entre as etapas.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        inicio = time.perf_counter()
+        tempos = {}
+        self.log("----- INICIANDO PROCESSO COMPLETO DE ACORDO DE PRESTADORES -----")
+        os.makedirs(caminho_base_saida, exist_ok=True)  # Garante que a pasta de destino exista
 
-        # --- 5. PROCESSAMENTO DOS CÓDIGOS DA FOLHA ---
-        colunas_folha = ['MATRICULA', 'NOME', 'CODIGO', 'VALOR', 'REFERENCIA', 'PRAZO', 'ORGAO', 'CLF', 'SIMBOLO',
-                         'SITUACAO', 'SAIDA', 'DATA_AFAST', 'GRUPO', 'REGIME_PREV']
+        # --- 2. LEITURA DAS ENTRADAS, EM PARALELO ---
+        contexto.etapa("Lendo cadastro, advogados e códigos 116/898")
+        threads = ThreadPoolExecutor(max_workers=3)
+        processos = None
         try:
-            df_116 = pd.read_csv(arquivo_116, sep=',', names=colunas_folha, header=None, dtype=str)
-            df_898 = pd.read_csv(arquivo_898_csv, sep=',', names=colunas_folha, header=None, dtype=str)
-            df_codigos_folha = pd.concat([df_116, df_898], ignore_index=True)
-            df_codigos_folha.to_excel(os.path.join(caminho_base_saida, 'CODIGOS_FOLHA.xlsx'), index=False)
-            self.log(f"✓ Arquivo 'CODIGOS_FOLHA.xlsx' salvo com {len(df_codigos_folha)} linhas.")
-        except Exception as e:
-            raise ValueError(f"Erro ao ler ou concatenar os arquivos de Código 116/898: {e}")
+            f_116 = threads.submit(_cronometrar, self._ler_codigos_folha, arquivo_116)
+            f_898 = threads.submit(_cronometrar, self._ler_codigos_folha, arquivo_898_csv)
+            # Com um único núcleo (ou em um processo daemon), criar processos só acrescentaria o custo de iniciá-los
+            if (os.cpu_count() or 1) > 1 and not multiprocessing.current_process().daemon:
+                try:
+                    processos = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn'))
+                    f_cadastro = processos.submit(_ler_no_processo, '_ler_cadastro', arquivo_cadastro)
+                    f_adv = processos.submit(_ler_no_processo, '_ler_advogados', arquivo_advogados)
+                except (BrokenProcessPool, OSError) as e:
+                    self.log(f"⚠️ AVISO: Não foi possível ler as planilhas em processos separados ({e}); usando threads.")
+                    processos = None
+            if processos is None:
+                f_cadastro = threads.submit(_cronometrar, self._ler_cadastro, arquivo_cadastro)
+                f_adv = threads.submit(_cronometrar, self._ler_advogados, arquivo_advogados)
 
-        # --- 6. IDENTIFICAÇÃO DE DUPLICADOS (PRIMEIRO FILTRO) ---
-        df_aptos_inicial['MATRICULA'] = df_aptos_inicial['MATRICULA'].apply(self._formatar_matricula)
-        df_codigos_folha['MATRICULA'] = df_codigos_folha['MATRICULA'].apply(self._formatar_matricula)
+            df_aptos_inicial = matriculas_pagas = f_gravacao = None
+            pendentes = {f_cadastro, f_adv, f_116, f_898}
+            while df_aptos_inicial is None or matriculas_pagas is None:
+                contexto.verificar_cancelamento()
+                wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                pendentes = {futuro for futuro in pendentes if not futuro.done()}
+
+                # --- 3. CÓDIGOS DA FOLHA (assim que os dois CSVs estiverem lidos) ---
+                if matriculas_pagas is None and f_116.done() and f_898.done():
+                    mensagem_erro = "Erro ao ler ou concatenar os arquivos de Código 116/898"
+                    df_116 = self._resultado(f_116, tempos, "Leitura do código 116", mensagem_erro)
+                    df_898 = self._resultado(f_898, tempos, "Leitura do código 898", mensagem_erro)
+                    df_codigos_folha = pd.concat([df_116, df_898], ignore_index=True)
+                    # A gravação (limitada pela CPU) segue em paralelo; os avisos são registrados ao final
+                    avisos_gravacao = []
+                    f_gravacao = threads.submit(_cronometrar, salvar_excel, df_codigos_folha,
+                                                os.path.join(caminho_base_saida, 'CODIGOS_FOLHA.xlsx'),
+                                                log=avisos_gravacao.append)
+                    matriculas_pagas = df_codigos_folha['MATRICULA'].apply(self._formatar_matricula).astype(str).dropna().unique()
+
+                # --- 4. CRUZAMENTO INICIAL E GERAÇÃO DE INAPTOS (assim que as duas planilhas estiverem lidas) ---
+                if df_aptos_inicial is None and f_cadastro.done() and f_adv.done():
+                    df_resumido = self._resultado(f_cadastro, tempos, "Leitura do cadastro geral",
+                                                  "Erro ao ler ou processar o Arquivo de Cadastro Geral")
+                    self.log(f"✓ Cadastro lido e filtrado por CLF: {len(df_resumido)} registros.")
+                    df_adv = self._resultado(f_adv, tempos, "Leitura da lista dos advogados",
+                                             "Erro ao ler ou processar a Lista dos Advogados")
+                    self.log(f"✓ Lista de advogados lida: {len(df_adv)} CPFs.")
+                    contexto.etapa("Cruzando cadastro e advogados")
+                    inicio_etapa = time.perf_counter()
+                    df_aptos_inicial = self._cruzar_cadastro_e_advogados(df_resumido, df_adv, caminho_base_saida)
+                    tempos["Cruzamento e INAPTOS.xlsx"] = time.perf_counter() - inicio_etapa
+
+            # --- 5. SEPARAÇÃO DE DUPLICADOS, AFASTADOS E APTOS FINAIS ---
+            contexto.verificar_cancelamento()
+            contexto.etapa("Separando duplicados e afastados")
+            inicio_etapa = time.perf_counter()
+            df_aptos_final = self._separar_duplicados_e_afastados(df_aptos_inicial, matriculas_pagas, caminho_base_saida)
+            tempos["Duplicados, exonerados e aptos"] = time.perf_counter() - inicio_etapa
+
+            # --- 6. GERAÇÃO DO ARQUIVO DE IMPLANTAÇÃO ---
+            contexto.verificar_cancelamento()
+            contexto.etapa("Gerando arquivo de implantação")
+            inicio_etapa = time.perf_counter()
+            self._gerar_implantacao(df_aptos_final, caminho_base_saida)
+            tempos["Arquivo de implantação"] = time.perf_counter() - inicio_etapa
 
-        # Garante que as matriculas são strings antes de usar unique
-        matriculas_pagas = df_codigos_folha['MATRICULA'].astype(str).dropna().unique()
+            contexto.etapa("Gravando CODIGOS_FOLHA.xlsx")
+            arquivos_codigos = self._resultado(f_gravacao, tempos, "Gravação de CODIGOS_FOLHA.xlsx",
+                                               "Erro ao gravar os códigos 116/898")
+            for aviso in avisos_gravacao:
+                self.log(aviso)
+            nomes_codigos = ", ".join(f"'{os.path.basename(caminho)}'" for caminho in arquivos_codigos)
+            self.log(f"✓ Arquivo(s) {nomes_codigos} salvo(s) com {len(df_codigos_folha)} linhas.")
+        finally:
+            # Em caso de erro ou cancelamento, não espera as leituras que ainda estão em andamento
+            threads.shutdown(wait=False, cancel_futures=True)
+            if processos is not None:
+                processos.shutdown(wait=False, cancel_futures=True)
+
+        self.log("\n⏱️ Tempo por etapa (as leituras ocorrem ao mesmo tempo):")
+        for etapa, segundos in tempos.items():
+            self.log(f"   - {etapa}: {segundos:.2f} s")
+        self.log(f"   Total: {time.perf_counter() - inicio:.2f} s")
+
+        self.log("\n----- PROCESSO DE ACORDO DE PRESTADORES CONCLUÍDO -----")
+        return "Processo de Acordo de Prestadores concluído com sucesso!"
+
+    def _separar_duplicados_e_afastados(self, df_aptos_inicial: pd.DataFrame, matriculas_pagas,
+                                        caminho_base_saida: str) -> pd.DataFrame:
+        """Grava DUPLICADOS, EXONERADOS e APTOS e retorna os aptos finais."""
+        df_aptos_inicial['MATRICULA'] = df_aptos_inicial['MATRICULA'].apply(self._formatar_matricula)
 
         df_duplicados = df_aptos_inicial[df_aptos_inicial['MATRICULA'].isin(matriculas_pagas)].copy()
         df_duplicados.to_excel(os.path.join(caminho_base_saida, 'DUPLICADOS.xlsx'), index=False)
         self.log(f"✓ Arquivo 'DUPLICADOS.xlsx' salvo com {len(df_duplicados)} servidores.")
 
-        # --- 7. SEPARAÇÃO DE AFASTADOS E GERAÇÃO DE APTOS FINAIS ---
         df_nao_duplicados = df_aptos_inicial[~df_aptos_inicial['MATRICULA'].isin(matriculas_pagas)].copy()
 
         # Garante que 'SITUACAO' existe antes de filtrar
@@ -139,8 +257,9 @@ class AcordoPrestadoresProcessor:
             df_aptos_final = df_nao_duplicados.copy()  # Se não tem situação, todos são considerados aptos finais por padrão.
             df_aptos_final.to_excel(os.path.join(caminho_base_saida, 'APTOS.xlsx'), index=False)
             self.log(f"✓ Arquivo 'APTOS.xlsx' salvo com {len(df_aptos_final)} servidores (sem filtro de situação).")
+        return df_aptos_final
 
-        # --- 8. GERAÇÃO DO ARQUIVO DE IMPLANTAÇÃO ---
+    def _gerar_implantacao(self, df_aptos_final: pd.DataFrame, caminho_base_saida: str):
         if not df_aptos_final.empty:
             # Garante que 'MATRICULA' exista
             if 'MATRICULA' in df_aptos_final.columns:
@@ -157,7 +276,4 @@ class AcordoPrestadoresProcessor:
                 self.log("Aviso: Coluna 'MATRICULA' não encontrada para gerar o arquivo de implantação.")
                 self.log("✓ Nenhum arquivo de implantação gerado por falta de matrículas.")
         else:
-            self.log("✓ Nenhum servidor na lista final para gerar arquivo de implantação.")
-
-        self.log("\n----- PROCESSO DE ACORDO DE PRESTADORES CONCLUÍDO -----")
-        return "Processo de Acordo de Prestadores concluído com sucesso!"
\ No newline at end of file
+            self.log("✓ Nenhum servidor na lista final para gerar arquivo de implantação.")
\ No newline at end of file
@@ -1,12 +1,17 @@
 import pandas as pd
 import numpy as np
 
+from app.logic.progresso import CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel
 
-def analisar_arquivos(arquivo_inf, arquivo_folha):
+
+def analisar_arquivos(arquivo_inf, arquivo_folha, contexto=None):
     """
     Processa os arquivos de informações e da folha, cruza os dados
     e retorna um DataFrame com uma coluna de teste 'SUCESSO'/'FALHOU'.
+    O `contexto` opcional (ContextoProgresso) recebe as etapas e permite cancelar entre elas.
     """
+    contexto = contexto or CONTEXTO_NULO
     try:
         # --- Leitura e Processamento Base ---
         cabecalho_dados = ['MATRICULA', 'NOME', 'CODIGO', 'VALOR', 'REFERENCIA', 'PRAZO', 'ORGAO', 'CLF', 'SIMBOLO',
@@ -15,10 +20,15 @@ def analisar_arquivos(arquivo_inf, arquivo_folha):
         # Força as chaves de união a serem do tipo string para um merge seguro
         tipos_de_dados_chave = {'MATRICULA': str, 'CODIGO': str}
 
-        df_transp = pd.read_excel(arquivo_inf, dtype=tipos_de_dados_chave)
+        contexto.etapa("Lendo arquivo de informações")
+        df_transp = ler_excel(arquivo_inf, dtype=tipos_de_dados_chave)
+        contexto.verificar_cancelamento()
+        contexto.etapa("Lendo arquivo da folha")
         df_dados = pd.read_csv(arquivo_folha, header=None, names=cabecalho_dados, sep=',', dtype=tipos_de_dados_chave)
 
         # --- Cruzamento dos Dados ---
+        contexto.verificar_cancelamento()
+        contexto.etapa("Cruzando os dados")
         df_final = pd.merge(
             df_transp,
             df_dados,
@@ -71,4 +81,18 @@ def analisar_arquivos(arquivo_inf, arquivo_folha):
     except ValueError as e:
         return f"Erro de valor nos dados. Verifique as colunas e tipos. Detalhe: {e}"
     except Exception as e:
-        return f"Ocorreu um erro inesperado na análise: {e}"
\ No newline at end of file
+        return f"Ocorreu um erro inesperado na análise: {e}"
+
+
+def analisar_arquivos_por_teste(arquivo_inf, arquivo_folha, contexto=None):
+    """
+    Executa analisar_arquivos() e já separa o resultado por teste, no formato usado pelas abas
+    da tela: {'Sucesso': DataFrame, 'Falhou': DataFrame}. Em caso de erro, retorna a mensagem.
+    """
+    resultado = analisar_arquivos(arquivo_inf, arquivo_folha, contexto=contexto)
+    if not isinstance(resultado, pd.DataFrame):
+        return resultado
+    return {
+        "Sucesso": resultado[resultado['TESTE'] == 'SUCESSO'],
+        "Falhou": resultado[resultado['TESTE'] == 'FALHOU'],
+    }
\ No newline at end of file
@@ -0,0 +1,81 @@
+# app/logic/cabecalho_planilha.py
+"""
+Inspeção rápida de planilhas: lê apenas o cabeçalho e algumas linhas de amostra, sem carregar
+o arquivo inteiro.
+
+Arquivos .xlsx/.xlsm são abertos pelo openpyxl em modo somente leitura (as linhas são lidas
+do XML sob demanda e a leitura para após a amostra); a quantidade de linhas vem da dimensão
+gravada na própria planilha. Serve para validar as colunas de um arquivo assim que ele é
+adicionado, antes da leitura completa. Outros formatos (.xls) caem na leitura do pandas
+limitada às linhas da amostra.
+"""
+import os
+import pandas as pd
+
+from app.logic.leitor_excel import ler_excel
+from app.logic.reconciliacao_esquema import tipo_da_coluna
+
+LINHAS_AMOSTRA = 50
+
+
+def _nome_coluna(valor, posicao: int):
+    # Mesmo nome que o pandas dá às colunas sem cabeçalho
+    return f"Unnamed: {posicao}" if valor is None else valor
+
+
+def ler_cabecalho(caminho: str, aba=0, linhas_amostra: int = LINHAS_AMOSTRA) -> dict:
+    """
+    Lê o cabeçalho e uma amostra de uma aba da planilha.
+
+    Args:
+        caminho (str): Caminho da planilha.
+        aba (int | str): Índice ou nome da aba (padrão: a primeira).
+        linhas_amostra (int): Quantas linhas de dados ler além do cabeçalho.
+
+    Returns:
+        dict: 'colunas' (lista), 'linhas_estimadas' (linhas de dados segundo a dimensão da
+              planilha, ou None se ela não informar), 'tipos' ({coluna: tipo lógico, ver
+              reconciliacao_esquema}), 'amostra' (DataFrame) e 'aba' (nome da aba lida).
+    """
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Arquivo não encontrado: {caminho}")
+
+    if not str(caminho).lower().endswith(('.xlsx', '.xlsm')):
+        amostra = ler_excel(caminho, sheet_name=aba, nrows=linhas_amostra)
+        return _resultado(list(amostra.columns), amostra, None, aba)
+
+    from openpyxl import load_workbook
+    pasta = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = pasta[aba] if isinstance(aba, str) else pasta.worksheets[aba]
+        linhas = planilha.iter_rows(min_row=1, max_row=linhas_amostra + 1, values_only=True)
+        cabecalho = list(next(linhas, ()))
+        while cabecalho and cabecalho[-1] is None:
+            cabecalho.pop()
+        colunas = [_nome_coluna(valor, posicao) for posicao, valor in enumerate(cabecalho)]
+        dados = [list(linha[:len(colunas)]) + [None] * (len(colunas) - len(linha)) for linha in linhas]
+        # A dimensão pode incluir linhas vazias formatadas no fim da planilha: é uma estimativa
+        linhas_estimadas = max(planilha.max_row - 1, 0) if planilha.max_row else None
+        nome_aba = planilha.title
+    finally:
+        pasta.close()
+
+    amostra = pd.DataFrame(dados, columns=colunas)
+    if not colunas:
+        linhas_estimadas = 0
+    return _resultado(colunas, amostra, linhas_estimadas, nome_aba)
+
+
+def _resultado(colunas: list, amostra: pd.DataFrame, linhas_estimadas, aba) -> dict:
+    tipos = {coluna: tipo_da_coluna(amostra[coluna]) for coluna in amostra.columns
+             if isinstance(amostra[coluna], pd.Series)}
+    return {'colunas': colunas, 'linhas_estimadas': linhas_estimadas, 'tipos': tipos,
+            'amostra': amostra, 'aba': aba}
+
+
+def colunas_faltantes(colunas, obrigatorias, ignorar_caixa: bool = False) -> list:
+    """Colunas obrigatórias ausentes em `colunas` (opcionalmente sem diferenciar maiúsculas e espaços)."""
+    if not ignorar_caixa:
+        return [coluna for coluna in obrigatorias if coluna not in colunas]
+    presentes = {str(coluna).strip().lower() for coluna in colunas}
+    return [coluna for coluna in obrigatorias if coluna.strip().lower() not in presentes]
@@ -1,5 +1,10 @@
 import pandas as pd
-import os
+import numpy as np
+
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel
+from app.logic.cabecalho_planilha import ler_cabecalho, colunas_faltantes
+from app.logic.tabela_tarifas import TabelaTarifas, CAMINHO_PADRAO
 
 class CalcAcoProcessor:
     """
@@ -7,32 +12,21 @@ class CalcAcoProcessor:
     arquivo Excel de tarifas.
     """
 
-    def __init__(self, logger_callback=None):
+    FATOR_MAJORADA = 1.3
+
+    def __init__(self, logger_callback=None, caminho_dados: str = None):
         self.log = logger_callback if logger_callback else self._default_logger
-        self.df_dados = None
-        self._carregar_dados()
+        # Compartilhada entre os processadores e recarregada quando a planilha muda (ver TabelaTarifas)
+        self.tabela = TabelaTarifas.instancia(caminho_dados or CAMINHO_PADRAO, log=lambda mensagem: self.log(mensagem))
+
+    @property
+    def df_dados(self) -> pd.DataFrame:
+        """Tabela de tarifas atualmente carregada (CLF, CODIGO, VALOR)."""
+        return self.tabela.indice.dados
 
     def _default_logger(self, mensagem: str):
         print(mensagem)
 
-    def _carregar_dados(self):
-        try:
-            caminho_arquivo = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), '../../data/dados_ajuda_de_custo.xlsx'))
-
-            if not os.path.exists(caminho_arquivo):
-                self.log(f"⚠️ AVISO: O arquivo de dados não foi encontrado em: {caminho_arquivo}")
-                self.df_dados = pd.DataFrame(columns=['CLF', 'CODIGO', 'VALOR'])
-                return
-
-            self.df_dados = pd.read_excel(caminho_arquivo, dtype=str)
-            self.df_dados['CLF'] = self.df_dados['CLF'].astype(str).str.strip()
-            self.df_dados['CODIGO'] = self.df_dados['CODIGO'].astype(str).str.strip()
-            self.log("✅ Base de dados de ajuda de custo carregada com sucesso.")
-        except Exception as e:
-            self.log(f"🚨 ERRO CRÍTICO ao tentar carregar a base de dados: {e}")
-            self.df_dados = pd.DataFrame(columns=['CLF', 'CODIGO', 'VALOR'])
-
     def _calcular_horas(self, horas_str: str) -> tuple[float, float]:
         horas_str = str(horas_str).strip().replace('.0', '')
         if not horas_str.isdigit():
@@ -40,31 +34,52 @@ class CalcAcoProcessor:
         return (float(horas_str), 0.0) if len(horas_str) <= 3 else (float(horas_str[-3:]), float(horas_str[:-3]))
 
     def buscar_tarifas(self, clf: str, codigo: str = None) -> dict:
-        if self.df_dados is None or self.df_dados.empty:
+        indice = self.tabela.indice  # Uma única versão da tabela durante toda a consulta
+        if indice.dados.empty:
             return {'status': 'erro', 'mensagem': 'Base de dados não carregada.'}
 
         clf_str = str(clf).strip()
         codigo_str = str(codigo).strip() if codigo else None
 
-        resultado_busca = self.df_dados[self.df_dados['CLF'] == clf_str]
-
-        if resultado_busca.empty:
+        if clf_str not in indice.por_clf.index:
             return {'status': 'erro', 'mensagem': f"CLF '{clf_str}' não encontrado."}
+        quantidade, tarifa_normal = indice.por_clf.loc[clf_str, ['QTD', 'TARIFA']]
 
-        if len(resultado_busca) > 1 and codigo_str:
-            resultado_busca = resultado_busca[resultado_busca['CODIGO'] == codigo_str]
-            if resultado_busca.empty:
+        if quantidade > 1 and codigo_str:
+            if (clf_str, codigo_str) not in indice.por_clf_codigo.index:
                 return {'status': 'erro', 'mensagem': f"CLF '{clf_str}' com código '{codigo_str}' não encontrado."}
+            quantidade, tarifa_normal = indice.por_clf_codigo.loc[(clf_str, codigo_str), ['QTD', 'TARIFA']]
 
-        if len(resultado_busca) > 1:
+        if quantidade > 1:
             return {'status': 'ambíguo', 'mensagem': f"CLF '{clf_str}' é ambíguo. Forneça um Código."}
+        if pd.isna(tarifa_normal):
+            return {'status': 'erro', 'mensagem': f"CLF '{clf_str}' possui uma tarifa inválida na base de dados."}
 
-        valor_base_str = resultado_busca['VALOR'].iloc[0].replace(',', '.')
-        tarifa_normal = float(valor_base_str)
-        tarifa_majorada = tarifa_normal * 1.3
+        tarifa_normal = float(tarifa_normal)
+        tarifa_majorada = tarifa_normal * self.FATOR_MAJORADA
 
         return {'status': 'sucesso', 'tarifa_normal': tarifa_normal, 'tarifa_majorada': tarifa_majorada}
 
+    def sugerir(self, prefixo_clf: str, prefixo_codigo: str = "", limite: int = 50) -> list:
+        """
+        Candidatos para o preenchimento automático: linhas da base cujo CLF e código começam
+        com o que já foi digitado.
+
+        Returns:
+            list: Dicts com 'clf', 'codigo', 'tarifa_normal', 'tarifa_majorada' (None se a tarifa
+                  for inválida) e 'ambiguo' (o CLF tem mais de uma linha e exige o código).
+        """
+        candidatos = []
+        for clf, codigo, tarifa, linhas_clf in self.tabela.indice.prefixos.buscar(str(prefixo_clf).strip(), str(prefixo_codigo or "").strip(), limite):
+            valida = not pd.isna(tarifa)
+            candidatos.append({
+                'clf': clf, 'codigo': codigo,
+                'tarifa_normal': float(tarifa) if valida else None,
+                'tarifa_majorada': float(tarifa) * self.FATOR_MAJORADA if valida else None,
+                'ambiguo': linhas_clf > 1,
+            })
+        return candidatos
+
 
     def calcular_tudo(self, clf: str, horas_str: str, codigo: str = None) -> dict:
         resultado_tarifas = self.buscar_tarifas(clf, codigo)
@@ -83,44 +98,94 @@ class CalcAcoProcessor:
         }
 
 
-    def processar_arquivo_importado(self, caminho_arquivo_importado: str) -> dict:
+    def processar_arquivo_importado(self, caminho_arquivo_importado: str, contexto: ContextoProgresso = None) -> dict:
+        contexto = contexto or CONTEXTO_NULO
+        # Garante que o lote use a versão atual da planilha de tarifas (aguarda uma recarga em andamento)
+        self.tabela.verificar_atualizacao(em_segundo_plano=False)
+        contexto.etapa("Lendo arquivo importado")
+        colunas_obrigatorias = ['MATRICULA', 'CLF', 'REFERENCIA']
         try:
-            df_importado = pd.read_excel(caminho_arquivo_importado, dtype=str).fillna('')
+            # Confere as colunas pelo cabeçalho antes de ler o arquivo inteiro
+            if colunas_faltantes(ler_cabecalho(caminho_arquivo_importado, linhas_amostra=0)['colunas'], colunas_obrigatorias):
+                return {'status': 'erro', 'mensagem': f"Colunas obrigatórias (MATRICULA, CLF, REFERENCIA) não encontradas."}
+            df_importado = ler_excel(caminho_arquivo_importado, dtype=str).fillna('')
         except Exception as e:
             return {'status': 'erro', 'mensagem': f"Não foi possível ler o arquivo Excel: {e}"}
 
-        colunas_obrigatorias = ['MATRICULA', 'CLF', 'REFERENCIA']
-        if not all(col in df_importado.columns for col in colunas_obrigatorias):
-            return {'status': 'erro', 'mensagem': f"Colunas obrigatórias (MATRICULA, CLF, REFERENCIA) não encontradas."}
-
-        dados_processados = []; erros_importacao = []
-
-        for index, row in df_importado.iterrows():
-            try:
-                matricula = str(row.get('MATRICULA', '')).strip()
-                clf = str(row.get('CLF', '')).strip()
-                referencia = str(row.get('REFERENCIA', '')).strip()
-                codigo = str(row.get('CODIGO', '')).strip()
-                observacao = str(row.get('OBSERVACAO', '')).strip()
-
-                if not all([matricula, clf, referencia]):
-                    erros_importacao.append(f"Linha {index + 2}: Dados obrigatórios faltando.")
-                    continue
-
-                resultado_calculo = self.calcular_tudo(clf, referencia, codigo)
-
-                if resultado_calculo['status'] == 'sucesso':
-                    linha_processada = {
-                        'Matrícula': matricula, 'CLF': clf, 'Código': codigo,
-                        'Referencia (Horas)': referencia,
-                        'H. Normal': resultado_calculo['h_normal'], 'Tarifa Normal': resultado_calculo['tarifa_normal'],
-                        'H. Majorada': resultado_calculo['h_majorada'], 'Tarifa Majorada': resultado_calculo['tarifa_majorada'],
-                        'Valor Total': resultado_calculo['valor_total'], 'Observação': observacao
-                    }
-                    dados_processados.append(linha_processada)
-                else:
-                    erros_importacao.append(f"Linha {index + 2} (Matrícula {matricula}): {resultado_calculo['mensagem']}")
-            except Exception as e:
-                erros_importacao.append(f"Linha {index + 2}: Erro inesperado - {e}")
-
-        return {'status': 'sucesso', 'dados': dados_processados, 'erros': erros_importacao}
\ No newline at end of file
+        contexto.verificar_cancelamento()
+        contexto.progresso(0, len(df_importado), "Calculando linhas")
+        dados_processados, erros_importacao = self.calcular_lote(df_importado)
+        contexto.progresso(len(df_importado), len(df_importado), "Calculando linhas")
+        return {'status': 'sucesso', 'dados': dados_processados, 'erros': erros_importacao}
+
+    def _resolver_tarifas(self, clf: pd.Series, codigo: pd.Series, indice) -> tuple:
+        """
+        Versão vetorizada de buscar_tarifas: junta todas as linhas aos índices de uma vez.
+
+        Returns:
+            tuple: (tarifas normais, mensagens de erro) alinhadas às linhas; mensagem vazia = sucesso.
+        """
+        if indice.dados.empty:
+            return np.full(len(clf), np.nan), np.full(len(clf), 'Base de dados não carregada.', dtype=object)
+
+        por_clf = indice.por_clf.reindex(clf.to_numpy())
+        por_par = indice.por_clf_codigo.reindex(pd.MultiIndex.from_arrays([clf.to_numpy(), codigo.to_numpy()]))
+        qtd_clf = por_clf['QTD'].fillna(0).to_numpy()
+        qtd_par = por_par['QTD'].fillna(0).to_numpy()
+
+        # Como em buscar_tarifas: o código só desempata CLFs com mais de uma linha na base
+        usa_codigo = (qtd_clf > 1) & (codigo.to_numpy() != '')
+        quantidade = np.where(usa_codigo, qtd_par, qtd_clf)
+        tarifa = np.where(usa_codigo, por_par['TARIFA'].to_numpy(), por_clf['TARIFA'].to_numpy()).astype(float)
+
+        clf_txt = ("CLF '" + clf + "'").to_numpy()
+        erros = np.select(
+            [qtd_clf == 0, usa_codigo & (qtd_par == 0), quantidade > 1, np.isnan(tarifa)],
+            [clf_txt + " não encontrado.",
+             clf_txt + (" com código '" + codigo + "' não encontrado.").to_numpy(),
+             clf_txt + " é ambíguo. Forneça um Código.",
+             clf_txt + " possui uma tarifa inválida na base de dados."],
+            default='')
+        return tarifa, erros
+
+    def calcular_lote(self, df_importado: pd.DataFrame) -> tuple:
+        """
+        Calcula todas as linhas de um arquivo importado de uma só vez (junção com os índices de
+        tarifas e aritmética sobre as colunas), com o mesmo resultado de calcular_tudo linha a linha.
+
+        Returns:
+            tuple: (DataFrame com as linhas calculadas; mensagens de erro, na ordem das linhas)
+        """
+        def coluna(nome):
+            if nome not in df_importado.columns:
+                return pd.Series('', index=df_importado.index, dtype=object)
+            return df_importado[nome].astype(str).str.strip()
+
+        matricula, clf, referencia = coluna('MATRICULA'), coluna('CLF'), coluna('REFERENCIA')
+        codigo, observacao = coluna('CODIGO'), coluna('OBSERVACAO')
+        linhas_excel = (df_importado.index.to_series() + 2).astype(str)
+
+        faltando = ((matricula == '') | (clf == '') | (referencia == '')).to_numpy()
+        tarifa_normal, erros = self._resolver_tarifas(clf, codigo, self.tabela.indice)
+
+        # Horas como em _calcular_horas: até 3 dígitos são horas normais; os anteriores, majoradas
+        horas = referencia.str.replace('.0', '', regex=False)
+        so_digitos = horas.str.isdigit().fillna(False)
+        h_normal = pd.to_numeric(horas.str[-3:].where(so_digitos), errors='coerce').fillna(0.0).to_numpy()
+        h_majorada = pd.to_numeric(horas.str[:-3].where(so_digitos & (horas.str.len() > 3)), errors='coerce').fillna(0.0).to_numpy()
+        tarifa_majorada = tarifa_normal * self.FATOR_MAJORADA
+        valor_total = h_normal * tarifa_normal + h_majorada * tarifa_majorada
+
+        sucesso = ~faltando & (erros == '')
+        dados = pd.DataFrame({
+            'Matrícula': matricula.to_numpy(), 'CLF': clf.to_numpy(), 'Código': codigo.to_numpy(),
+            'Referencia (Horas)': referencia.to_numpy(),
+            'H. Normal': h_normal, 'Tarifa Normal': tarifa_normal,
+            'H. Majorada': h_majorada, 'Tarifa Majorada': tarifa_majorada,
+            'Valor Total': valor_total, 'Observação': observacao.to_numpy()
+        })[sucesso].reset_index(drop=True)
+
+        mensagens = np.where(
+            faltando, ("Linha " + linhas_excel + ": Dados obrigatórios faltando.").to_numpy(),
+            np.where(erros != '', ("Linha " + linhas_excel + " (Matrícula " + matricula + "): ").to_numpy() + erros, ''))
+        return dados, [mensagem for mensagem in mensagens if mensagem]
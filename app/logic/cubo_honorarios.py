@@ -0,0 +1,175 @@
+# app/logic/cubo_honorarios.py
+"""
+Cubo de honorários: os totais da folha pré-agregados por competência.
+
+Cada arquivo processado vira uma tabela pequena com a soma de VALOR e a quantidade de linhas
+por CODIGO × GRUPO × COD_ORGAO × CLF × COMPETENCIA, gravada em Parquet em data/honorarios_cubo
+(um arquivo por origem e competência, identificada pelo caminho completo, e não só pelo nome:
+folhas de mesmo nome em pastas diferentes têm cubos separados; processá-la de novo substitui o
+anterior). Como todas as
+colunas usadas em FILTROS_HONORARIOS são dimensões do cubo, qualquer regra pode ser somada
+sobre ele (somar_por_filtro com SOMA no lugar de VALOR) sem voltar aos dados brutos: comparar
+meses ou refazer um relatório leva milissegundos.
+"""
+import os
+import re
+import hashlib
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.honorarios_processor import somar_por_filtro, selecionar_por_filtro, FILTROS_COMPILADOS
+
+PASTA_PADRAO = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/honorarios_cubo'))
+
+COLUNA_COMPETENCIA = 'COMPETENCIA'  # "AAAA-MM"
+DIMENSOES_NUMERICAS = ['CODIGO', 'COD_ORGAO', 'CLF']
+DIMENSOES = ['CODIGO', 'GRUPO', 'COD_ORGAO', 'CLF', COLUNA_COMPETENCIA]
+COLUNAS_ORIGEM = ['CODIGO', 'GRUPO', 'COD_ORGAO', 'CLF', 'VALOR']  # Colunas lidas dos dados brutos
+
+# Agregados parciais acumulados antes de serem combinados (limita a memória entre blocos)
+BLOCOS_POR_COMBINACAO = 10
+
+# Ex: folha_2024-05.txt, FOLHA 202405.csv, honorarios_05_2024.xlsx
+_PADROES_COMPETENCIA = [
+    (re.compile(r"(?<!\d)(20\d{2})[-_. ]?(0[1-9]|1[0-2])(?!\d)"), lambda m: (m.group(1), m.group(2))),
+    (re.compile(r"(?<!\d)(0[1-9]|1[0-2])[-_. ]?(20\d{2})(?!\d)"), lambda m: (m.group(2), m.group(1))),
+]
+
+
+def validar_competencia(texto: str) -> str:
+    """Normaliza "AAAA-MM", "AAAAMM" ou "MM/AAAA" para "AAAA-MM"."""
+    texto = str(texto).strip()
+    for formato in ("%Y-%m", "%Y%m", "%m/%Y", "%m-%Y"):
+        try:
+            return datetime.datetime.strptime(texto, formato).strftime("%Y-%m")
+        except ValueError:
+            continue
+    raise ValueError(f"Competência inválida: '{texto}'. Use o formato AAAA-MM.")
+
+
+def competencia_do_arquivo(caminho: str) -> str:
+    """Competência indicada no nome do arquivo ou, se não houver, o mês da última modificação dele."""
+    nome = os.path.basename(caminho)
+    for padrao, partes in _PADROES_COMPETENCIA:
+        encontrado = padrao.search(nome)
+        if encontrado:
+            ano, mes = partes(encontrado)
+            return f"{ano}-{mes}"
+    return datetime.datetime.fromtimestamp(os.path.getmtime(caminho)).strftime("%Y-%m")
+
+
+def _agregar(df: pd.DataFrame) -> pd.DataFrame:
+    # dropna=False: linhas com dimensões vazias continuam valendo para regras como "not_in"
+    return df.groupby(DIMENSOES, dropna=False, sort=False, observed=True).agg(
+        SOMA=('SOMA', 'sum'), QTD=('QTD', 'sum')).reset_index()
+
+
+def agregar_blocos(blocos, competencia: str, contexto: ContextoProgresso = None) -> pd.DataFrame:
+    """
+    Agrega os blocos de dados brutos (com COLUNAS_ORIGEM) no cubo de uma competência.
+
+    Returns:
+        pd.DataFrame: DIMENSOES + SOMA (de VALOR, em centavos) e QTD (linhas).
+    """
+    contexto = contexto or CONTEXTO_NULO
+    parciais = []
+    for bloco in blocos:
+        contexto.verificar_cancelamento()
+        parcial = pd.DataFrame({coluna: pd.to_numeric(bloco[coluna], errors='coerce') for coluna in DIMENSOES_NUMERICAS})
+        parcial['GRUPO'] = bloco['GRUPO'].astype('string')
+        parcial[COLUNA_COMPETENCIA] = competencia
+        parcial['SOMA'] = pd.to_numeric(bloco['VALOR'], errors='coerce').fillna(0).astype(float)
+        parcial['QTD'] = 1
+        parciais.append(_agregar(parcial))
+        if len(parciais) >= BLOCOS_POR_COMBINACAO:
+            parciais = [_agregar(pd.concat(parciais, ignore_index=True))]
+    if not parciais:
+        return _cubo_vazio()
+    return _agregar(pd.concat(parciais, ignore_index=True))
+
+
+def _cubo_vazio() -> pd.DataFrame:
+    return pd.DataFrame(columns=DIMENSOES + ['SOMA', 'QTD'])
+
+
+def somar_cubo(cubo: pd.DataFrame, filtros: dict = FILTROS_COMPILADOS) -> dict:
+    """Totais de cada regra (em centavos) sobre um cubo, como somar_por_filtro faz com os dados brutos."""
+    return somar_por_filtro(cubo.rename(columns={'SOMA': 'VALOR'}), filtros)
+
+
+class CuboHonorarios:
+    """Cubos gravados em uma pasta, um arquivo por origem processada."""
+
+    def __init__(self, pasta: str = PASTA_PADRAO):
+        self.pasta = pasta
+        self._lidos = {}  # caminho -> (data de modificação, DataFrame)
+
+    @staticmethod
+    def _base(nome_origem: str) -> str:
+        return re.sub(r"[^\w.-]+", "_", os.path.splitext(os.path.basename(nome_origem))[0])
+
+    def _caminho(self, nome_origem: str, competencia: str) -> str:
+        # O hash do caminho completo distingue origens de mesmo nome em pastas diferentes
+        origem = os.path.normcase(os.path.abspath(nome_origem))
+        hash_origem = hashlib.sha1(origem.encode('utf-8')).hexdigest()[:10]
+        return os.path.join(self.pasta, f"{competencia}__{self._base(nome_origem)}__{hash_origem}.parquet")
+
+    def gravar(self, nome_origem: str, cubo: pd.DataFrame) -> str:
+        """Grava o cubo de uma origem (substituindo o anterior da mesma origem e competência)."""
+        os.makedirs(self.pasta, exist_ok=True)
+        competencias = cubo[COLUNA_COMPETENCIA].dropna().unique()
+        competencia = competencias[0] if len(competencias) else "sem_competencia"
+        caminho = self._caminho(nome_origem, competencia)
+        temporario = caminho + ".tmp"
+        cubo.to_parquet(temporario, index=False)
+        os.replace(temporario, caminho)
+        # Cubo gravado antes de o caminho fazer parte do nome (só pelo nome do arquivo): seria somado em dobro
+        antigo = os.path.join(self.pasta, f"{competencia}__{self._base(nome_origem)}.parquet")
+        if os.path.exists(antigo):
+            os.remove(antigo)
+        return caminho
+
+    def arquivos(self) -> list:
+        if not os.path.isdir(self.pasta):
+            return []
+        return sorted(os.path.join(self.pasta, nome) for nome in os.listdir(self.pasta) if nome.endswith('.parquet'))
+
+    def competencias(self) -> list:
+        """Competências disponíveis, em ordem."""
+        return sorted({os.path.basename(caminho).split('__', 1)[0] for caminho in self.arquivos()})
+
+    def _ler(self, caminho: str) -> pd.DataFrame:
+        modificado = os.path.getmtime(caminho)
+        if self._lidos.get(caminho, (None,))[0] != modificado:
+            self._lidos[caminho] = (modificado, pd.read_parquet(caminho))
+        return self._lidos[caminho][1]
+
+    def carregar(self, competencias: list = None) -> pd.DataFrame:
+        """
+        Cubo das competências pedidas (todas, se None). As origens da mesma competência são apenas
+        empilhadas: as somas das regras não mudam, e combiná-las custaria mais que somá-las.
+        """
+        selecionadas = set(competencias) if competencias else None
+        cubos = [self._ler(caminho) for caminho in self.arquivos()
+                 if selecionadas is None or os.path.basename(caminho).split('__', 1)[0] in selecionadas]
+        if not cubos:
+            return _cubo_vazio()
+        return pd.concat(cubos, ignore_index=True)
+
+    def totais_por_competencia(self, competencias: list = None, filtros: dict = FILTROS_COMPILADOS) -> pd.DataFrame:
+        """
+        Totais de cada regra por competência, direto do cubo: as seleções das regras são
+        calculadas uma vez sobre o cubo inteiro e somadas por competência com np.bincount.
+
+        Returns:
+            pd.DataFrame: Uma linha por competência (índice, em ordem) e uma coluna por regra, em centavos.
+        """
+        cubo = self.carregar(competencias)
+        codigos, nomes = pd.factorize(cubo[COLUNA_COMPETENCIA], sort=True)
+        soma = pd.to_numeric(cubo['SOMA']).to_numpy(dtype=float)
+        totais = {nome: np.bincount(codigos, weights=soma * selecao, minlength=len(nomes))
+                  for nome, selecao in selecionar_por_filtro(cubo, filtros).items()}
+        return pd.DataFrame(totais, index=pd.Index(nomes, name=COLUNA_COMPETENCIA), columns=list(filtros))
@@ -3,6 +3,8 @@ from datetime import datetime
 import os
 from io import StringIO
 
+from app.logic.escrita_em_fluxo import salvar_excel
+
 
 class DataManager:
     """
@@ -35,6 +37,12 @@ class DataManager:
         """Limpa o DataFrame acumulado."""
         self.df_acumulado = pd.DataFrame(columns=self.columns)
 ##
+    def iterar_blocos(self, linhas_por_bloco: int = 200_000):
+        """Percorre o DataFrame acumulado em fatias, sem copiá-lo (dados que chegarem durante a leitura ficam de fora)."""
+        df = self.df_acumulado
+        for inicio in range(0, len(df), linhas_por_bloco):
+            yield df.iloc[inicio:inicio + linhas_por_bloco]
+
     def esta_vazio(self) -> bool:
         """Verifica se o DataFrame acumulado está vazio."""
         return self.df_acumulado.empty
@@ -47,23 +55,30 @@ class DataManager:
             raise ValueError("Não há dados para salvar em CSV.")
         self.df_acumulado.to_csv(filepath, index=False, encoding='utf-8-sig')
 
-    def salvar_para_xlsx(self, filepath: str):
-        """Salva o DataFrame acumulado da instância em um arquivo XLSX."""
+    def salvar_para_xlsx(self, filepath: str, ao_exceder: str = 'arquivos') -> list:
+        """
+        Salva o DataFrame acumulado da instância em um arquivo XLSX. Acima do limite de linhas
+        do Excel, a saída é dividida ou convertida conforme `ao_exceder` (ver salvar_excel).
+
+        Returns:
+            list: Caminhos dos arquivos gravados.
+        """
         if self.df_acumulado.empty:
             raise ValueError("Não há dados para salvar em XLSX.")
-        self.df_acumulado.to_excel(filepath, index=False)
+        return salvar_excel(self.df_acumulado, filepath, ao_exceder=ao_exceder)
 
     # --- Métodos de Utilidade Estáticos (podem ser chamados de qualquer lugar) ---
 
     @staticmethod
-    def save_df_to_xlsx(df: pd.DataFrame, filepath: str):
+    def save_df_to_xlsx(df: pd.DataFrame, filepath: str, ao_exceder: str = 'arquivos') -> list:
         """
-        Salva um DataFrame qualquer em um arquivo XLSX.
+        Salva um DataFrame qualquer em um arquivo XLSX (dividido ou convertido acima do limite
+        de linhas do Excel, como em salvar_para_xlsx).
         Método estático para ser usado como uma função de utilidade.
         """
         if not isinstance(df, pd.DataFrame) or df.empty:
             raise ValueError("O DataFrame fornecido está vazio ou é inválido.")
-        df.to_excel(filepath, index=False)
+        return salvar_excel(df, filepath, ao_exceder=ao_exceder)
 
     @staticmethod
     def generate_report_filename(prefix: str, extension: str) -> str:
@@ -0,0 +1,266 @@
+# app/logic/escrita_em_fluxo.py
+"""
+Escritores que gravam uma tabela em partes (um DataFrame por vez), sem manter o conteúdo
+já gravado em memória. Usados na consolidação em fluxo do Juntar Arquivos.
+
+Todos recebem as colunas na criação; cada parte é alinhada a elas antes de ser gravada.
+
+Também reúne a gravação de DataFrames em XLSX que respeita o limite de linhas do Excel
+(salvar_excel), usada pelos processadores e pelo DataManager.
+"""
+import os
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+FORMATOS_SAIDA = {'xlsx': '.xlsx', 'csv': '.csv', 'parquet': '.parquet'}
+
+# Máximo de linhas de uma aba do Excel, incluindo a linha de cabeçalho
+LIMITE_LINHAS_EXCEL = 1_048_576
+
+# O que fazer quando um DataFrame não cabe em uma aba (ver salvar_excel)
+MODOS_EXCESSO = ('arquivos', 'abas', 'csv', 'parquet')
+
+
+def caminho_parte(caminho: str, numero: int) -> str:
+    """Ex: CODIGOS_FOLHA.xlsx -> CODIGOS_FOLHA_parte2.xlsx"""
+    base, extensao = os.path.splitext(caminho)
+    return f"{base}_parte{numero}{extensao}"
+
+
+class EscritorTabular:
+    """Interface comum: escrever(df) quantas vezes forem necessárias e, ao final, fechar()."""
+
+    def __init__(self, caminho: str, colunas: list):
+        self.caminho = caminho
+        self.caminhos = [caminho]  # Arquivos efetivamente gravados (mais de um se a saída for dividida)
+        self.colunas = list(colunas)
+        self.linhas_escritas = 0
+
+    def escrever(self, df):
+        df = df.reindex(columns=self.colunas)
+        if len(df):
+            self._escrever(df)
+            self.linhas_escritas += len(df)
+
+    def _escrever(self, df):
+        raise NotImplementedError
+
+    def fechar(self):
+        """Conclui o arquivo."""
+
+    def descartar(self):
+        """Interrompe a escrita e remove o arquivo incompleto (usado em caso de erro ou cancelamento)."""
+        try:
+            self.fechar()
+        except Exception:
+            pass
+        for caminho in self.caminhos:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+
+
+class EscritorXlsx(EscritorTabular):
+    """
+    XLSX no modo write-only do openpyxl: as linhas vão direto para o arquivo, sem montar a
+    planilha em memória. Ao atingir o limite de linhas do Excel, o arquivo é concluído e a
+    gravação continua em um novo (arquivo_parte1.xlsx, arquivo_parte2.xlsx...).
+    """
+
+    def __init__(self, caminho: str, colunas: list, nome_aba: str = "Sheet1",
+                 linhas_por_arquivo: int = LIMITE_LINHAS_EXCEL - 1):
+        super().__init__(caminho, colunas)
+        self.nome_aba = nome_aba
+        self.linhas_por_arquivo = linhas_por_arquivo
+        self._abrir_pasta()
+
+    def _abrir_pasta(self):
+        from openpyxl import Workbook
+        self._pasta = Workbook(write_only=True)
+        self._aba = self._pasta.create_sheet(self.nome_aba)
+        self._aba.append([str(c) for c in self.colunas])
+        self._linhas_na_pasta = 0
+
+    def _nova_parte(self):
+        self._pasta.save(self.caminhos[-1])
+        if len(self.caminhos) == 1:
+            os.replace(self.caminho, caminho_parte(self.caminho, 1))
+            self.caminhos = [caminho_parte(self.caminho, 1)]
+        self.caminhos.append(caminho_parte(self.caminho, len(self.caminhos) + 1))
+        self._abrir_pasta()
+
+    def _escrever(self, df):
+        valores = df.astype(object).where(df.notna(), None)
+        for linha in valores.itertuples(index=False, name=None):
+            if self._linhas_na_pasta == self.linhas_por_arquivo:
+                self._nova_parte()
+            self._aba.append(linha)
+            self._linhas_na_pasta += 1
+
+    def fechar(self):
+        if self._pasta is not None:
+            self._pasta.save(self.caminhos[-1])
+            self._pasta = None
+
+
+class EscritorCsv(EscritorTabular):
+    """CSV no mesmo padrão do DataManager (separador vírgula, UTF-8 com BOM para o Excel)."""
+
+    def __init__(self, caminho: str, colunas: list):
+        super().__init__(caminho, colunas)
+        self._arquivo = open(caminho, 'w', encoding='utf-8-sig', newline='')
+        self._cabecalho_pendente = True
+
+    def _escrever(self, df):
+        df.to_csv(self._arquivo, index=False, header=self._cabecalho_pendente)
+        self._cabecalho_pendente = False
+
+    def fechar(self):
+        if self._arquivo is not None:
+            if self._cabecalho_pendente:
+                self._arquivo.write(",".join(str(c) for c in self.colunas) + "\n")
+            self._arquivo.close()
+            self._arquivo = None
+
+
+class EscritorParquet(EscritorTabular):
+    """
+    Parquet gravado em row groups pelo pyarrow. As planilhas de origem podem trazer a mesma
+    coluna com tipos diferentes, então todas as colunas são gravadas como texto.
+    """
+
+    def __init__(self, caminho: str, colunas: list):
+        super().__init__(caminho, colunas)
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._esquema = pa.schema([(str(c), pa.string()) for c in self.colunas])
+        self._escritor = pq.ParquetWriter(caminho, self._esquema)
+
+    def _escrever(self, df):
+        texto = df.astype('string')
+        texto.columns = [str(c) for c in texto.columns]
+        self._escritor.write_table(self._pa.Table.from_pandas(texto, schema=self._esquema, preserve_index=False))
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+
+def criar_escritor(formato: str, caminho: str, colunas: list) -> EscritorTabular:
+    """Cria o escritor do formato pedido ('xlsx', 'csv' ou 'parquet')."""
+    escritores = {'xlsx': EscritorXlsx, 'csv': EscritorCsv, 'parquet': EscritorParquet}
+    if formato not in escritores:
+        raise ValueError(f"Formato de saída desconhecido: '{formato}'. Use um de: {', '.join(FORMATOS_SAIDA)}.")
+    return escritores[formato](caminho, colunas)
+
+
+def _gravar_excel(df, caminho: str) -> str:
+    escritor = EscritorXlsx(caminho, df.columns)
+    try:
+        escritor.escrever(df)
+        escritor.fechar()
+    except BaseException:
+        escritor.descartar()
+        raise
+    return caminho
+
+
+def _gravar_parte_arrow(caminho_arrow: str, numero: int, caminho: str) -> str:
+    """Grava uma parte lendo o seu lote do arquivo Arrow por memory map (executado nos processos de trabalho)."""
+    import pyarrow as pa
+    with pa.memory_map(caminho_arrow) as fonte:
+        parte = pa.ipc.open_file(fonte).get_batch(numero).to_pandas()
+    return _gravar_excel(parte, caminho)
+
+
+def _gravar_fonte_arrow(partes: list) -> str:
+    """
+    Grava as partes, uma por lote, em um arquivo Arrow temporário lido pelos processos de trabalho.
+    Retorna None se o pyarrow não estiver instalado ou se alguma coluna misturar tipos (o Arrow a
+    converteria para texto, mudando as células da planilha).
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    descritor, caminho_arrow = tempfile.mkstemp(prefix="partes_", suffix=".arrow")
+    os.close(descritor)
+    try:
+        esquema = pa.Schema.from_pandas(partes[0], preserve_index=False)
+        with pa.OSFile(caminho_arrow, 'wb') as destino, pa.ipc.new_file(destino, esquema) as escritor:
+            for parte in partes:
+                escritor.write_batch(pa.RecordBatch.from_pandas(parte, schema=esquema, preserve_index=False))
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        os.remove(caminho_arrow)
+        return None
+    except BaseException:
+        os.remove(caminho_arrow)
+        raise
+    return caminho_arrow
+
+
+def salvar_excel(df, caminho: str, ao_exceder: str = 'arquivos', max_processos: int = None,
+                 log=print) -> list:
+    """
+    Salva um DataFrame em XLSX. Se ele não couber em uma aba do Excel (LIMITE_LINHAS_EXCEL),
+    isso é detectado antes de montar a planilha e a saída é ajustada conforme `ao_exceder`:
+      - 'arquivos': divide em arquivo_parte1.xlsx, arquivo_parte2.xlsx..., gravados ao mesmo
+        tempo em processos separados (a gravação do openpyxl é limitada pela CPU). Os processos
+        não recebem as partes por pickle: cada um lê o seu lote de um único arquivo Arrow;
+      - 'abas': um único arquivo, com uma aba por parte (gravadas em sequência);
+      - 'csv' ou 'parquet': grava o DataFrame inteiro nesse formato, com o mesmo nome.
+
+    Args:
+        max_processos (int, optional): Partes gravadas ao mesmo tempo; padrão: uma por núcleo.
+        log (callable): Recebe o aviso de que a saída foi dividida ou convertida.
+
+    Returns:
+        list: Caminhos dos arquivos gravados.
+    """
+    linhas_por_parte = LIMITE_LINHAS_EXCEL - 1
+    if len(df) <= linhas_por_parte:
+        df.to_excel(caminho, index=False)
+        return [caminho]
+    if ao_exceder not in MODOS_EXCESSO:
+        raise ValueError(f"Opção desconhecida: '{ao_exceder}'. Use uma de: {', '.join(MODOS_EXCESSO)}.")
+
+    quantidade_partes = -(-len(df) // linhas_por_parte)
+    nome = os.path.basename(caminho)
+    if ao_exceder in ('csv', 'parquet'):
+        caminho_convertido = os.path.splitext(caminho)[0] + FORMATOS_SAIDA[ao_exceder]
+        log(f"⚠️ {nome}: {len(df)} linhas excedem o limite do Excel; salvando em {ao_exceder.upper()}.")
+        if ao_exceder == 'csv':
+            df.to_csv(caminho_convertido, index=False, encoding='utf-8-sig')
+        else:
+            escritor = EscritorParquet(caminho_convertido, df.columns)
+            escritor.escrever(df)
+            escritor.fechar()
+        return [caminho_convertido]
+
+    partes = [df.iloc[inicio:inicio + linhas_por_parte] for inicio in range(0, len(df), linhas_por_parte)]
+    if ao_exceder == 'abas':
+        log(f"⚠️ {nome}: {len(df)} linhas excedem o limite do Excel; dividindo em {quantidade_partes} abas.")
+        with pd.ExcelWriter(caminho) as writer:
+            for numero, parte in enumerate(partes, start=1):
+                parte.to_excel(writer, sheet_name=f"Parte{numero}", index=False)
+        return [caminho]
+
+    log(f"⚠️ {nome}: {len(df)} linhas excedem o limite do Excel; dividindo em {quantidade_partes} arquivos.")
+    caminhos = [caminho_parte(caminho, numero) for numero in range(1, quantidade_partes + 1)]
+    processos = min(max_processos or os.cpu_count() or 1, quantidade_partes)
+    caminho_arrow = _gravar_fonte_arrow(partes) if processos > 1 else None
+    if caminho_arrow is not None:
+        try:
+            with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+                return list(executor.map(_gravar_parte_arrow, [caminho_arrow] * quantidade_partes,
+                                         range(quantidade_partes), caminhos))
+        except (BrokenProcessPool, OSError) as e:
+            log(f"⚠️ AVISO: Não foi possível gravar as partes em paralelo ({e}); gravando em sequência.")
+        finally:
+            os.remove(caminho_arrow)
+    return [_gravar_excel(parte, caminho_da_parte) for parte, caminho_da_parte in zip(partes, caminhos)]
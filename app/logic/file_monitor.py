@@ -2,7 +2,6 @@
 import os
 import shutil
 import time
-from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 # Importa a classe DataManager da mesma camada logic
@@ -153,6 +152,7 @@ class FileMonitor:
             self.log,
             self.arquivo_processado_callback
         )
+        from watchdog.observers import Observer  # Carrega o backend do sistema de arquivos só ao iniciar
         self.observer = Observer()
         # Agenda o handler para monitorar a pasta de origem (não recursivamente)
         self.observer.schedule(self.handler, path=pasta_origem, recursive=False)
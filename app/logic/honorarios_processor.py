@@ -1,12 +1,19 @@
 # app/logic/honorarios_processor.py
 import pandas as pd
+import numpy as np
+import numbers
 import locale
-from num2words import num2words
-from fpdf import FPDF
 import datetime
 import os
 import sys
 import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel
+from app.logic.data_manager import DataManager
 
 # As regras de negócio (filtros) são mantidas como constantes
 FILTROS_HONORARIOS = {
@@ -31,6 +38,180 @@ FILTROS_HONORARIOS = {
     }
 }
 
+# Operadores das regras; as demais chaves de uma regra são comparações de igualdade com a coluna
+_OPERADORES = {
+    'igual': lambda coluna, valor: coluna == valor,
+    'isin': lambda coluna, valores: coluna.isin(valores),
+    'not_in': lambda coluna, valores: ~coluna.isin(valores),
+    'range': lambda coluna, valores: coluna.between(valores[0], valores[1]),
+}
+
+
+def compilar_filtros(filtros: dict = FILTROS_HONORARIOS) -> dict:
+    """
+    Converte as regras para {nome: [(coluna, operador, valores), ...]} e valida os operadores.
+    Condições repetidas entre regras (ex: CODIGO 898) têm a mesma forma e são avaliadas uma vez.
+    """
+    compilados = {}
+    for nome, regra in filtros.items():
+        condicoes = []
+        for chave, valor in regra.items():
+            if isinstance(valor, dict):
+                if chave not in _OPERADORES:
+                    raise ValueError(f"Operador desconhecido na regra '{nome}': '{chave}'.")
+                valores = valor['valores']
+                condicoes.append((valor['coluna'], chave, tuple(valores) if isinstance(valores, list) else valores))
+            else:
+                condicoes.append((chave, 'igual', valor))
+        compilados[nome] = condicoes
+    return compilados
+
+
+FILTROS_COMPILADOS = compilar_filtros()
+
+# Folha em TXT/CSV (como a salva pelo Monitor de Arquivos): sem cabeçalho, nestas colunas. O
+# código do órgão, que as regras chamam de COD_ORGAO, vem na coluna ORGAO.
+COLUNAS_FOLHA_TXT = ['MATRICULA', 'NOME', 'CODIGO', 'VALOR', 'REFERENCIA', 'PRAZO', 'ORGAO', 'CLF', 'SIMBOLO',
+                     'SITUACAO', 'SAIDA', 'DATA_AFAST', 'GRUPO', 'REGIME']
+SINONIMOS_COLUNAS = {'ORGAO': 'COD_ORGAO'}
+EXTENSOES_TEXTO = ('.txt', '.csv')
+EXTENSOES_LOTE = ('.xlsx', '.xls') + EXTENSOES_TEXTO
+LINHAS_POR_BLOCO = 200_000
+
+
+def _valores_numericos(valores) -> bool:
+    valores = valores if isinstance(valores, tuple) else (valores,)
+    return all(isinstance(v, numbers.Number) and not isinstance(v, bool) for v in valores)
+
+
+def selecionar_por_filtro(df: pd.DataFrame, filtros: dict = FILTROS_COMPILADOS) -> dict:
+    """
+    Linhas de cada regra, em uma única passada pelo df.
+
+    As colunas usadas nas regras são convertidas uma vez (para número, quando as regras as
+    comparam com números) e cada condição distinta vira uma máscara booleana calculada uma única
+    vez; a seleção de cada regra é a combinação das suas máscaras. Nenhuma cópia do df é feita.
+
+    Returns:
+        dict: {nome da regra: máscara booleana (numpy) alinhada às linhas do df}.
+    """
+    por_coluna = {}
+    for condicoes in filtros.values():
+        for coluna, _, valores in condicoes:
+            por_coluna.setdefault(coluna, []).append(valores)
+    colunas = {coluna: pd.to_numeric(df[coluna], errors='coerce') if all(map(_valores_numericos, valores)) else df[coluna]
+               for coluna, valores in por_coluna.items()}
+
+    mascaras, selecoes = {}, {}
+    for nome, condicoes in filtros.items():
+        selecao = np.ones(len(df), dtype=bool)
+        for condicao in condicoes:
+            if condicao not in mascaras:
+                coluna, operador, valores = condicao
+                mascaras[condicao] = _OPERADORES[operador](colunas[coluna], valores).to_numpy(dtype=bool, na_value=False)
+            selecao &= mascaras[condicao]
+        selecoes[nome] = selecao
+    return selecoes
+
+
+def somar_por_filtro(df: pd.DataFrame, filtros: dict = FILTROS_COMPILADOS) -> dict:
+    """
+    Soma a coluna VALOR (em centavos) das linhas de cada regra (ver selecionar_por_filtro): o
+    total de cada regra é o produto escalar de VALOR pela sua seleção.
+
+    Returns:
+        dict: {nome da regra: soma de VALOR em centavos}.
+    """
+    valor = pd.to_numeric(df['VALOR'], errors='coerce').fillna(0).to_numpy(dtype=float)
+    return {nome: float(valor @ selecao) for nome, selecao in selecionar_por_filtro(df, filtros).items()}
+
+
+def colunas_dos_filtros(filtros: dict = FILTROS_COMPILADOS) -> list:
+    """Colunas necessárias para somar as regras: as usadas nas condições e VALOR."""
+    colunas = dict.fromkeys(coluna for condicoes in filtros.values() for coluna, _, _ in condicoes)
+    colunas['VALOR'] = None
+    return list(colunas)
+
+
+def _padronizar_colunas(df: pd.DataFrame) -> pd.DataFrame:
+    sinonimos = {origem: destino for origem, destino in SINONIMOS_COLUNAS.items()
+                 if origem in df.columns and destino not in df.columns}
+    return df.rename(columns=sinonimos) if sinonimos else df
+
+
+def ler_folha_em_blocos(caminho: str, colunas: list, linhas_por_bloco: int = LINHAS_POR_BLOCO,
+                        contexto: ContextoProgresso = None):
+    """
+    Lê uma folha em TXT/CSV em blocos, apenas com as colunas pedidas (nomes das regras).
+
+    O arquivo pode vir sem cabeçalho (COLUNAS_FOLHA_TXT, como o TXT da folha) ou com ele (como
+    o CSV salvo pelo Monitor de Arquivos). Só um bloco fica em memória por vez.
+
+    Yields:
+        pd.DataFrame: Cada bloco (os tipos são os inferidos pelo pandas; somar_por_filtro os converte).
+    """
+    contexto = contexto or CONTEXTO_NULO
+    with open(caminho, 'r', encoding='utf-8-sig', errors='replace') as arquivo:
+        primeira_linha = arquivo.readline().strip().split(',')
+    com_cabecalho = 'VALOR' in primeira_linha
+    disponiveis = primeira_linha if com_cabecalho else COLUNAS_FOLHA_TXT
+    nomes_no_arquivo = {destino: origem for origem, destino in SINONIMOS_COLUNAS.items() if origem in disponiveis}
+    usadas = [coluna if coluna in disponiveis else nomes_no_arquivo.get(coluna, coluna) for coluna in colunas]
+    faltantes = [coluna for coluna, usada in zip(colunas, usadas) if usada not in disponiveis]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias não encontradas no arquivo: {', '.join(faltantes)}")
+
+    tamanho = os.path.getsize(caminho) or 1
+    with open(caminho, 'rb') as arquivo:
+        leitor = pd.read_csv(arquivo, sep=',', header=0 if com_cabecalho else None,
+                             names=None if com_cabecalho else COLUNAS_FOLHA_TXT, usecols=usadas,
+                             encoding='utf-8-sig', encoding_errors='replace', chunksize=linhas_por_bloco)
+        for bloco in leitor:
+            contexto.progresso(min(arquivo.tell(), tamanho), tamanho, "Somando a folha")
+            yield _padronizar_colunas(bloco)
+
+
+def somar_em_blocos(blocos, filtros: dict = FILTROS_COMPILADOS, contexto: ContextoProgresso = None) -> tuple:
+    """
+    Acumula somar_por_filtro bloco a bloco.
+
+    Returns:
+        tuple: ({nome da regra: soma de VALOR em centavos}, linhas lidas).
+    """
+    contexto = contexto or CONTEXTO_NULO
+    totais, linhas = dict.fromkeys(filtros, 0.0), 0
+    for bloco in blocos:
+        contexto.verificar_cancelamento()
+        for nome, total in somar_por_filtro(bloco, filtros).items():
+            totais[nome] += total
+        linhas += len(bloco)
+    return totais, linhas
+
+
+def listar_origens(pasta: str) -> list:
+    """Planilhas e folhas TXT/CSV de uma pasta (sem subpastas), em ordem alfabética."""
+    return sorted(os.path.join(pasta, nome) for nome in os.listdir(pasta)
+                  if nome.lower().endswith(EXTENSOES_LOTE) and not nome.startswith('~$')
+                  and os.path.isfile(os.path.join(pasta, nome)))
+
+
+def _somar_arquivo(caminho: str, guardar_no_cubo: bool) -> dict:
+    """Totais de um arquivo do lote (executado nos processos de trabalho, sem log)."""
+    processor = HonorariosProcessor(logger_callback=lambda _mensagem: None)
+    if guardar_no_cubo:
+        from app.logic.cubo_honorarios import somar_cubo
+        return somar_cubo(processor.agregar_no_cubo(caminho)[0])
+    return processor.somar_origem(caminho)
+
+
+def _encerrar_processos(executor: ProcessPoolExecutor):
+    """Descarta os arquivos ainda na fila e termina os processos do lote sem esperar os que estão somando."""
+    processos = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for processo in processos:
+        if processo.is_alive():
+            processo.terminate()
+
 
 class HonorariosProcessor:
     """
@@ -58,6 +239,7 @@ class HonorariosProcessor:
         valor_arredondado = round(valor, 2)
         reais = int(valor_arredondado)
         centavos = int(round((valor_arredondado - reais) * 100))
+        from num2words import num2words  # Importado sob demanda: só é usado ao gerar o relatório
         texto_reais = num2words(reais, lang='pt_BR') if reais > 0 else ""
         texto_centavos = num2words(centavos, lang='pt_BR') if centavos > 0 else ""
         partes = []
@@ -65,12 +247,14 @@ class HonorariosProcessor:
         if centavos > 0: partes.append(f"{texto_centavos} {'centavos' if centavos > 1 else 'centavo'}")
         return " e ".join(partes) if partes else "Zero reais"
 
-    def _gerar_pdf_relatorio(self, conteudo_texto: str, caminho_arquivo: str):
+    def _gerar_pdf_relatorio(self, conteudo_texto: str, caminho_arquivo: str, titulo: str = "Relatório de Honorários",
+                             abrir: bool = True):
         try:
+            from fpdf import FPDF  # Importado sob demanda para não pesar na abertura da tela
             pdf = FPDF()
             pdf.add_page()
             pdf.set_font("Helvetica", 'B', 16)
-            pdf.cell(w=0, h=10, text="Relatório de Honorários", new_x="LMARGIN", new_y="NEXT", align='C')
+            pdf.cell(w=0, h=10, text=titulo, new_x="LMARGIN", new_y="NEXT", align='C')
             pdf.ln(5)
             data_geracao = datetime.datetime.now().strftime("%d/%m/%Y às %H:%M:%S")
             pdf.set_font("Helvetica", '', 10)
@@ -82,7 +266,8 @@ class HonorariosProcessor:
             pdf.multi_cell(w=0, h=7, text=texto_compativel)
             pdf.output(caminho_arquivo)
             self.log(f"PDF gerado em: {caminho_arquivo}")
-            self._abrir_arquivo_no_os(caminho_arquivo)
+            if abrir:
+                self._abrir_arquivo_no_os(caminho_arquivo)
         except Exception as e:
             self.log(f"Erro ao gerar o PDF: {e}")
             raise
@@ -98,46 +283,263 @@ class HonorariosProcessor:
         except Exception as e:
             self.log(f"Aviso: PDF salvo, mas não pôde ser aberto automaticamente. Erro: {e}")
 
-    def processar_honorarios_e_gerar_pdf(self, caminho_arquivo_excel: str, pasta_destino_pdf: str):
-        if not caminho_arquivo_excel or not os.path.exists(caminho_arquivo_excel):
-            raise FileNotFoundError(f"Arquivo Excel não encontrado: {caminho_arquivo_excel}")
+    def blocos_da_origem(self, origem, colunas: list, contexto: ContextoProgresso = None):
+        """
+        Dados de uma origem em blocos, apenas com as colunas pedidas (nomes das regras).
 
-        os.makedirs(pasta_destino_pdf, exist_ok=True)
-        self.log(f"Lendo arquivo Excel: {os.path.basename(caminho_arquivo_excel)}")
+        Args:
+            origem: Planilha Excel (um único bloco), folha em TXT/CSV (lida em blocos, com memória
+                    constante) ou o DataManager do Monitor de Arquivos (percorrido em fatias).
+        """
+        contexto = contexto or CONTEXTO_NULO
+        if isinstance(origem, DataManager):
+            self.log("Lendo os dados acumulados do Monitor de Arquivos")
+            contexto.etapa("Somando os dados acumulados")
+            for bloco in origem.iterar_blocos(LINHAS_POR_BLOCO):
+                yield _padronizar_colunas(bloco)
+            return
+
+        if not origem or not os.path.exists(origem):
+            raise FileNotFoundError(f"Arquivo não encontrado: {origem}")
+
+        if str(origem).lower().endswith(EXTENSOES_TEXTO):
+            self.log(f"Lendo a folha em blocos: {os.path.basename(origem)}")
+            contexto.etapa("Somando a folha")
+            try:
+                yield from ler_folha_em_blocos(origem, colunas, contexto=contexto)
+            except (ValueError, UnicodeError, pd.errors.ParserError) as e:
+                raise IOError(f"Erro ao ler a folha: {e}")
+            return
+
+        self.log(f"Lendo arquivo Excel: {os.path.basename(origem)}")
+        contexto.etapa("Lendo arquivo Excel")
+        necessarias = set(colunas) | {nome for nome, destino in SINONIMOS_COLUNAS.items() if destino in colunas}
         try:
-            df = pd.read_excel(caminho_arquivo_excel)
+            df = _padronizar_colunas(ler_excel(origem, usecols=lambda coluna: coluna in necessarias))
         except Exception as e:
             raise IOError(f"Erro ao ler o arquivo Excel: {e}")
+        contexto.etapa("Aplicando filtros")
+        yield df
+
+    def somar_origem(self, origem, contexto: ContextoProgresso = None) -> dict:
+        """
+        Soma VALOR (em centavos) por regra de FILTROS_HONORARIOS, lendo a origem uma única vez
+        (ver blocos_da_origem).
+
+        Returns:
+            dict: {nome da regra: soma de VALOR em centavos}.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        totais, linhas = somar_em_blocos(self.blocos_da_origem(origem, colunas_dos_filtros(), contexto), contexto=contexto)
+        self.log(f"{linhas} linhas somadas.")
+        return totais
 
+    def agregar_no_cubo(self, origem: str, competencia: str = None, contexto: ContextoProgresso = None,
+                        cubo=None) -> tuple:
+        """
+        Agrega uma planilha ou folha TXT/CSV no cubo de honorários (ver cubo_honorarios) e o grava.
+
+        Args:
+            competencia (str, optional): "AAAA-MM"; padrão: a indicada no nome do arquivo.
+            cubo (CuboHonorarios, optional): Onde gravar; padrão: a pasta data/honorarios_cubo.
+
+        Returns:
+            tuple: (DataFrame do cubo desta origem, caminho do arquivo gravado).
+        """
+        from app.logic.cubo_honorarios import (CuboHonorarios, COLUNAS_ORIGEM, agregar_blocos,
+                                               competencia_do_arquivo, validar_competencia)
+        contexto = contexto or CONTEXTO_NULO
+        if not origem or not os.path.exists(origem):
+            raise FileNotFoundError(f"Arquivo não encontrado: {origem}")
+        competencia = validar_competencia(competencia) if competencia else competencia_do_arquivo(origem)
+        self.log(f"Competência: {competencia}")
+        df_cubo = agregar_blocos(self.blocos_da_origem(origem, COLUNAS_ORIGEM, contexto), competencia, contexto)
+        caminho = (cubo or CuboHonorarios()).gravar(origem, df_cubo)
+        self.log(f"Cubo gravado: {os.path.basename(caminho)} ({len(df_cubo)} combinações, "
+                 f"{int(df_cubo['QTD'].sum())} linhas)")
+        return df_cubo, caminho
+
+    def _texto_totais(self, totais: dict) -> str:
         resultados_finais = []
-        for nome_filtro, condicoes in FILTROS_HONORARIOS.items():
-            df_filtrado = df.copy()
-            # Aplica os filtros sequencialmente
-            for chave, valor in condicoes.items():
-                if chave in ['CODIGO', 'GRUPO', 'COD_ORGAO']:
-                    df_filtrado = df_filtrado[df_filtrado[chave] == valor]
-                elif chave == 'isin':
-                    df_filtrado = df_filtrado[df_filtrado[valor['coluna']].isin(valor['valores'])]
-                elif chave == 'not_in':
-                    df_filtrado = df_filtrado[~df_filtrado[valor['coluna']].isin(valor['valores'])]
-                elif chave == 'range':
-                    col_range = valor['coluna']
-                    df_filtrado[col_range] = pd.to_numeric(df_filtrado[col_range], errors='coerce')
-                    df_filtrado = df_filtrado[df_filtrado[col_range].between(valor['valores'][0], valor['valores'][1])]
-
-            # Calcula o valor final
-            valor_final = pd.to_numeric(df_filtrado['VALOR'], errors='coerce').fillna(0).sum() / 100
+        for nome_filtro, total in totais.items():
+            valor_final = total / 100
             valor_extenso = self._formatar_valor_por_extenso(valor_final).capitalize()
             valor_formatado = locale.currency(valor_final, grouping=True)
 
             resultados_finais.append(f"--- {nome_filtro.upper()} ---\n"
                                      f"Valor Total: {valor_formatado}\n"
                                      f"Valor por Extenso: {valor_extenso}")
+        return "\n\n".join(resultados_finais)
 
-        mensagem_final = "\n\n".join(resultados_finais)
+    def _salvar_pdf(self, texto: str, pasta_destino_pdf: str, prefixo: str, titulo: str = "Relatório de Honorários",
+                    abrir: bool = True) -> str:
         data_hora_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        nome_arquivo_pdf = f"relatorio_honorarios_{data_hora_str}.pdf"
-        caminho_completo_pdf = os.path.join(pasta_destino_pdf, nome_arquivo_pdf)
+        nome_arquivo_pdf = f"{prefixo}_{data_hora_str}.pdf"
+        self._gerar_pdf_relatorio(texto, os.path.join(pasta_destino_pdf, nome_arquivo_pdf), titulo, abrir)
+        return nome_arquivo_pdf
+
+    def processar_honorarios_e_gerar_pdf(self, origem, pasta_destino_pdf: str, contexto: ContextoProgresso = None,
+                                         competencia: str = None, guardar_no_cubo: bool = False):
+        """
+        Gera o relatório de honorários de uma planilha, folha TXT/CSV ou DataManager (ver blocos_da_origem).
+
+        Args:
+            guardar_no_cubo (bool): Para arquivos, agrega-os no cubo de honorários (na competência
+                                    informada ou na do nome do arquivo) e calcula os totais a partir
+                                    dele, para que relatórios comparativos não precisem relê-los.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        os.makedirs(pasta_destino_pdf, exist_ok=True)
+        if guardar_no_cubo and not isinstance(origem, DataManager):
+            from app.logic.cubo_honorarios import somar_cubo
+            df_cubo, _ = self.agregar_no_cubo(origem, competencia, contexto)
+            totais = somar_cubo(df_cubo)
+        else:
+            totais = self.somar_origem(origem, contexto)
+
+        contexto.verificar_cancelamento()
+        contexto.etapa("Gerando PDF")
+        nome_arquivo_pdf = self._salvar_pdf(self._texto_totais(totais), pasta_destino_pdf, "relatorio_honorarios")
+        return f"Relatório gerado com sucesso: {nome_arquivo_pdf}"
+
+    def gerar_relatorio_comparativo(self, pasta_destino_pdf: str, competencias: list = None, cubo=None,
+                                    contexto: ContextoProgresso = None) -> str:
+        """
+        Relatório de várias competências a partir do cubo de honorários (sem reler os arquivos):
+        o total de cada categoria por competência e a variação em relação à competência anterior.
+        """
+        from app.logic.cubo_honorarios import CuboHonorarios
+        contexto = contexto or CONTEXTO_NULO
+        contexto.etapa("Somando o cubo")
+        totais = (cubo or CuboHonorarios()).totais_por_competencia(competencias)
+        if totais.empty:
+            raise ValueError("Nenhuma competência encontrada no cubo de honorários.")
+        totais = totais / 100
+        totais['TOTAL GERAL'] = totais.sum(axis=1)
+
+        secoes = []
+        for categoria in totais.columns:
+            linhas, anterior = [f"--- {categoria.upper()} ---"], None
+            for competencia, valor in totais[categoria].items():
+                linha = f"{competencia}: {locale.currency(valor, grouping=True)}"
+                if anterior is not None:
+                    diferenca = valor - anterior
+                    percentual = f" ({diferenca / anterior:+.1%})" if anterior else ""
+                    linha += f"  |  Variação: {'+' if diferenca >= 0 else '-'}{locale.currency(abs(diferenca), grouping=True)}{percentual}"
+                linhas.append(linha)
+                anterior = valor
+            secoes.append("\n".join(linhas))
+
+        contexto.verificar_cancelamento()
+        contexto.etapa("Gerando PDF")
+        os.makedirs(pasta_destino_pdf, exist_ok=True)
+        titulo = f"Honorários por Competência ({totais.index[0]} a {totais.index[-1]})"
+        nome_arquivo_pdf = self._salvar_pdf("\n\n".join(secoes), pasta_destino_pdf, "relatorio_honorarios_comparativo", titulo)
+        return f"Relatório gerado com sucesso: {nome_arquivo_pdf}"
+
+    def somar_lote(self, origens: list, max_processos: int = None, guardar_no_cubo: bool = False,
+                   contexto: ContextoProgresso = None) -> list:
+        """
+        Totais de vários arquivos, somados ao mesmo tempo em processos separados (um arquivo por
+        processo). Um arquivo com erro não interrompe o lote.
+
+        Args:
+            max_processos (int, optional): Arquivos somados ao mesmo tempo; padrão: um por núcleo.
+            guardar_no_cubo (bool): Agrega também cada arquivo no cubo (competência pelo nome do arquivo).
+
+        Returns:
+            list: (caminho, totais em centavos ou None, mensagem de erro ou None), na ordem de `origens`.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        total = len(origens)
+        resultados = [None] * total
+        contexto.etapa("Somando arquivos")
+        processos = min(max_processos or os.cpu_count() or 1, total)
+        if processos > 1:
+            self.log(f"Somando {total} arquivos em {processos} processos simultâneos...")
+            try:
+                executor = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+                try:
+                    futuros = {executor.submit(_somar_arquivo, caminho, guardar_no_cubo): i for i, caminho in enumerate(origens)}
+                    pendentes, concluidos = set(futuros), 0
+                    while pendentes:
+                        # Espera em intervalos curtos para atender ao cancelamento mesmo com todos os arquivos em andamento
+                        contexto.verificar_cancelamento()
+                        prontos, pendentes = wait(pendentes, timeout=0.2, return_when=FIRST_COMPLETED)
+                        for futuro in prontos:
+                            i = futuros[futuro]
+                            resultados[i] = self._resultado_do_lote(origens[i], futuro.result)
+                            concluidos += 1
+                            contexto.progresso(concluidos, total, "Somando arquivos")
+                except BaseException:
+                    _encerrar_processos(executor)
+                    raise
+                executor.shutdown()
+                return resultados
+            except (BrokenProcessPool, OSError) as e:
+                self.log(f"⚠️ AVISO: Não foi possível somar os arquivos em paralelo ({e}); somando em sequência.")
+
+        for i, caminho in enumerate(origens):
+            contexto.verificar_cancelamento()
+            contexto.progresso(i, total, "Somando arquivos")
+            resultados[i] = self._resultado_do_lote(caminho, lambda: _somar_arquivo(caminho, guardar_no_cubo))
+        contexto.progresso(total, total, "Somando arquivos")
+        return resultados
+
+    def _resultado_do_lote(self, caminho: str, obter_totais) -> tuple:
+        try:
+            totais = obter_totais()
+        except BrokenProcessPool:
+            raise
+        except Exception as e:
+            self.log(f"⚠️ Erro ao somar {os.path.basename(caminho)}: {e}. O arquivo será ignorado.")
+            return caminho, None, str(e)
+        self.log(f"Arquivo somado: {os.path.basename(caminho)}")
+        return caminho, totais, None
+
+    def processar_lote_e_gerar_relatorio(self, origens, pasta_destino: str, max_processos: int = None,
+                                         guardar_no_cubo: bool = False, contexto: ContextoProgresso = None) -> str:
+        """
+        Relatório de honorários de vários arquivos em uma única execução: um PDF com uma seção por
+        arquivo e o total geral, e um CSV com os totais de cada arquivo (uma linha por arquivo, em
+        reais). Nenhum visualizador é aberto.
+
+        Args:
+            origens (list | str): Lista de arquivos ou uma pasta (ver listar_origens).
+        """
+        contexto = contexto or CONTEXTO_NULO
+        if isinstance(origens, str):
+            origens = listar_origens(origens)
+        if not origens:
+            raise ValueError("Nenhum arquivo de honorários para processar.")
+        os.makedirs(pasta_destino, exist_ok=True)
+
+        resultados = self.somar_lote(origens, max_processos, guardar_no_cubo, contexto)
+        contexto.verificar_cancelamento()
+        contexto.etapa("Gerando PDF e CSV")
+        categorias = list(FILTROS_COMPILADOS)
+        linhas_csv, secoes, total_geral = [], [], dict.fromkeys(categorias, 0.0)
+        for caminho, totais, erro in resultados:
+            nome = os.path.basename(caminho)
+            if totais is None:
+                secoes.append(f"=== {nome} ===\nERRO: {erro}")
+                linhas_csv.append({'ARQUIVO': nome, 'ERRO': erro})
+                continue
+            for categoria in categorias:
+                total_geral[categoria] += totais[categoria]
+            secoes.append(f"=== {nome} ===\n" + "\n".join(
+                f"{categoria}: {locale.currency(totais[categoria] / 100, grouping=True)}" for categoria in categorias))
+            linhas_csv.append({'ARQUIVO': nome, **{categoria: totais[categoria] / 100 for categoria in categorias},
+                               'TOTAL': sum(totais.values()) / 100, 'ERRO': ''})
+        sucesso = sum(1 for _, totais, _ in resultados if totais is not None)
+        secoes.append(f"=== TOTAL GERAL ({sucesso} de {len(resultados)} arquivos) ===\n\n"
+                      + self._texto_totais(total_geral))
 
-        self._gerar_pdf_relatorio(mensagem_final, caminho_completo_pdf)
-        return f"Relatório gerado com sucesso: {nome_arquivo_pdf}"
\ No newline at end of file
+        nome_arquivo_pdf = self._salvar_pdf("\n\n".join(secoes), pasta_destino, "relatorio_honorarios_lote",
+                                            "Relatório de Honorários - Lote", abrir=False)
+        caminho_csv = os.path.join(pasta_destino, nome_arquivo_pdf[:-len(".pdf")] + ".csv")
+        pd.DataFrame(linhas_csv, columns=['ARQUIVO'] + categorias + ['TOTAL', 'ERRO']).to_csv(
+            caminho_csv, index=False, encoding='utf-8-sig')
+        self.log(f"Resumo CSV gerado em: {caminho_csv}")
+        return (f"Lote concluído ({sucesso} de {len(resultados)} arquivos): "
+                f"{nome_arquivo_pdf} e {os.path.basename(caminho_csv)}")
\ No newline at end of file
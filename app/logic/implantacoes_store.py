@@ -0,0 +1,118 @@
+# app/logic/implantacoes_store.py
+import pandas as pd
+from datetime import datetime
+
+from app.logic.leitor_excel import ler_excel
+from app.logic.cabecalho_planilha import ler_cabecalho, colunas_faltantes
+
+
+class ImplantacoesStore:
+    """
+    Armazena as implantações em colunas tipadas (texto, Valor numérico e Data como data),
+    servindo de fonte única de dados para a tabela da tela de Implantações.
+    """
+
+    COLUNAS_ARQUIVO = ['Operacao', 'Matricula', 'Codigo', 'Valor', 'Referencia', 'Prazo', 'Observacao']
+    COLUNAS = COLUNAS_ARQUIVO + ['Data']
+    COLUNAS_TEXTO = ['Operacao', 'Matricula', 'Codigo', 'Referencia', 'Prazo', 'Observacao']
+
+    def __init__(self):
+        self.df = self._df_vazio()
+
+    @classmethod
+    def _df_vazio(cls) -> pd.DataFrame:
+        df = pd.DataFrame({col: pd.Series(dtype='string') for col in cls.COLUNAS_TEXTO})
+        df['Valor'] = pd.Series(dtype='float64')
+        df['Data'] = pd.Series(dtype='datetime64[ns]')
+        return df[cls.COLUNAS]
+
+    @staticmethod
+    def _normalizar_numero(texto: pd.Series) -> pd.Series:
+        """
+        Passa números no formato brasileiro ('1.234,56') para o formato do float ('1234.56').
+        Só textos com vírgula têm os pontos tratados como separador de milhar, para que '15.5' continue valendo 15,5.
+        """
+        texto = texto.astype(str).str.strip()
+        com_virgula = texto.str.contains(',', regex=False)
+        return texto.mask(com_virgula, texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+
+    @classmethod
+    def converter_valor(cls, valor) -> float:
+        """Converte um valor digitado ('1.234,56', '15,5', '') para float; inválidos viram 0."""
+        convertido = pd.to_numeric(cls._normalizar_numero(pd.Series([valor])), errors='coerce').iloc[0]
+        return 0.0 if pd.isna(convertido) else float(convertido)
+
+    @classmethod
+    def _tipar(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Aplica os tipos do armazenamento a um DataFrame com as colunas esperadas."""
+        df = df.copy()
+        for col in cls.COLUNAS_TEXTO:
+            df[col] = df[col].fillna('').astype(str).str.strip().astype('string')
+        if not pd.api.types.is_float_dtype(df['Valor']):
+            df['Valor'] = pd.to_numeric(cls._normalizar_numero(df['Valor']), errors='coerce')
+        df['Valor'] = df['Valor'].fillna(0.0).astype('float64')
+        df['Data'] = pd.to_datetime(df['Data'], dayfirst=True, errors='coerce').astype('datetime64[ns]')
+        return df[cls.COLUNAS].reset_index(drop=True)
+
+    # --- Leitura e escrita em lote ---
+
+    @classmethod
+    def ler_arquivo(cls, caminho: str) -> pd.DataFrame:
+        """
+        Lê um arquivo Excel de implantações e o converte para o formato tipado.
+
+        Raises:
+            ValueError: Se alguma coluna obrigatória estiver ausente.
+        """
+        # Confere as colunas pelo cabeçalho antes de ler o arquivo inteiro
+        faltando = colunas_faltantes(ler_cabecalho(caminho, linhas_amostra=0)['colunas'], cls.COLUNAS_ARQUIVO,
+                                     ignorar_caixa=True)
+        if faltando:
+            raise ValueError(f"O arquivo não contém as seguintes colunas obrigatórias: {', '.join(faltando)}")
+
+        df = ler_excel(caminho, dtype=str)
+        mapa_colunas = {str(col).strip().lower(): col for col in df.columns}
+        df = df.rename(columns={mapa_colunas[col.lower()]: col for col in cls.COLUNAS_ARQUIVO})
+        df = df[cls.COLUNAS_ARQUIVO]
+        df['Data'] = pd.Timestamp(datetime.now().date())
+        return cls._tipar(df)
+
+    def importar(self, df_novo: pd.DataFrame, substituir: bool = False) -> int:
+        """Acrescenta (ou substitui por) um lote já tipado em uma única operação. Retorna as linhas adicionadas."""
+        if substituir or self.df.empty:
+            self.df = df_novo.reset_index(drop=True)
+        else:
+            self.df = pd.concat([self.df, df_novo], ignore_index=True)
+        return len(df_novo)
+
+    def exportar_excel(self, caminho: str):
+        """Escreve o armazenamento diretamente em Excel, mantendo Valor numérico e Data como data."""
+        with pd.ExcelWriter(caminho, datetime_format='DD/MM/YYYY', date_format='DD/MM/YYYY') as writer:
+            self.df.to_excel(writer, index=False)
+
+    # --- Operações de linha ---
+
+    def _registro_tipado(self, valores: list, data=None) -> pd.DataFrame:
+        registro = dict(zip(self.COLUNAS_ARQUIVO, valores))
+        registro['Valor'] = self.converter_valor(registro.get('Valor', ''))
+        registro['Data'] = data if data is not None else pd.Timestamp(datetime.now().date())
+        return self._tipar(pd.DataFrame([registro], columns=self.COLUNAS))
+
+    def adicionar(self, valores: list):
+        """Adiciona uma implantação a partir dos valores na ordem de COLUNAS_ARQUIVO."""
+        self.importar(self._registro_tipado(valores))
+
+    def atualizar(self, linha: int, valores: list):
+        """Atualiza uma implantação, preservando a data original de inclusão."""
+        registro = self._registro_tipado(valores, data=self.df.at[linha, 'Data'])
+        self.df.iloc[linha] = registro.iloc[0]
+
+    def linha(self, linha: int) -> list:
+        """Retorna os valores de uma linha na ordem de COLUNAS."""
+        return self.df.iloc[linha].tolist()
+
+    def limpar(self):
+        self.df = self._df_vazio()
+
+    def __len__(self):
+        return len(self.df)
@@ -1,8 +1,70 @@
 # app/logic/junta_arquivos_processor.py
 import pandas as pd
 import os
+import multiprocessing
+from collections import deque
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from fpdf import FPDF
+
+from app.logic.progresso import ContextoProgresso, CONTEXTO_NULO
+from app.logic.leitor_excel import ler_excel, nomes_abas, selecionar_abas
+from app.logic.escrita_em_fluxo import criar_escritor, salvar_excel, caminho_parte, FORMATOS_SAIDA
+from app.logic.reconciliacao_esquema import ReconciliadorEsquema, COLUNA_ABA
+from app.logic.cabecalho_planilha import ler_cabecalho
+
+
+def _ler_arquivo_excel(arquivo_path: str, aba: str = None) -> pd.DataFrame:
+    """
+    Lê uma aba de um arquivo Excel (executada nos processos de leitura). Sem `aba`, lê a
+    primeira; com ela, também registra a aba de origem.
+    """
+    df_temp = ler_excel(arquivo_path) if aba is None else ler_excel(arquivo_path, sheet_name=aba)
+    if aba is not None:
+        df_temp[COLUNA_ABA] = aba
+    # Adiciona uma coluna de origem para rastreabilidade, que é muito útil
+    df_temp['ARQUIVO_ORIGEM'] = os.path.basename(arquivo_path)
+    return df_temp
+
+
+def _rotulo(unidade: tuple) -> str:
+    """Nome de uma unidade de leitura (arquivo, aba) para o log e o relatório de esquema."""
+    caminho, aba = unidade
+    return os.path.basename(caminho) if aba is None else f"{os.path.basename(caminho)} [{aba}]"
+
+
+def _reservar_caminho(pasta: str, prefixo: str, extensao: str) -> str:
+    """
+    Cria (vazio) e retorna pasta/prefixo_AAAAMMDD_HHMMSS.ext. Se o nome já existir (outra
+    execução no mesmo segundo), acrescenta _2, _3... em vez de sobrescrever a saída dela.
+    """
+    base = os.path.join(pasta, f"{prefixo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    numero = 1
+    while True:
+        caminho = base + (f"_{numero}" if numero > 1 else "") + extensao
+        if not os.path.exists(caminho_parte(caminho, 1)):
+            try:
+                os.close(os.open(caminho, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return caminho
+            except FileExistsError:
+                pass
+        numero += 1
+
+
+def _remover_reserva(caminho: str):
+    """Remove o arquivo criado por _reservar_caminho, se ele continuar vazio."""
+    if os.path.exists(caminho) and os.path.getsize(caminho) == 0:
+        os.remove(caminho)
+
+
+def _texto_pdf(valor) -> str:
+    """Texto compatível com as fontes padrão do FPDF (latin-1); caracteres fora dele, como '–', viram '?'."""
+    return str(valor).encode('latin-1', 'replace').decode('latin-1')
+
+
+def max_processos_padrao() -> int:
+    """Quantidade padrão de arquivos lidos ao mesmo tempo: um por núcleo, limitado a 8."""
+    return max(1, min(8, os.cpu_count() or 1))
 
 
 class ExcelProcessor:
@@ -11,27 +73,48 @@ class ExcelProcessor:
     relatórios de processamento em PDF.
     """
 
-    def __init__(self, logger_callback=None):
+    def __init__(self, logger_callback=None, max_processos: int = None, abas=None):
         """
         Inicializa o processador.
 
         Args:
             logger_callback (callable, optional): Função para logar mensagens.
                                                   Usa print se for None.
+            max_processos (int, optional): Quantas abas ler ao mesmo tempo, cada uma em um
+                                           processo. Padrão: max_processos_padrao().
+            abas (optional): Abas a consolidar de cada arquivo (ver leitor_excel.selecionar_abas:
+                             nomes, posições ou padrões como "Folha*"). Padrão: só a primeira.
         """
         self.log = logger_callback if logger_callback else print
+        self.max_processos = max_processos
+        self.abas = abas
 
-    def processar_arquivos_excel(self, lista_de_arquivos: list) -> pd.DataFrame:
+    def processar_arquivos_excel(self, lista_de_arquivos: list, contexto: ContextoProgresso = None,
+                                 max_processos: int = None, abas=None) -> pd.DataFrame:
         """
         Lê uma lista de caminhos de arquivos Excel, consolida seus conteúdos
         e retorna um único DataFrame.
 
+        A leitura do Excel é limitada pela CPU; com mais de um arquivo (ou mais de uma aba
+        selecionada), eles são lidos ao mesmo tempo em um pool de processos e consolidados na
+        ordem original da lista. Apenas as abas selecionadas são interpretadas.
+
+        Antes da concatenação, os esquemas são reconciliados (ver ReconciliadorEsquema): nomes de
+        colunas equivalentes são alinhados, cada coluna recebe um tipo único e compacto e
+        ARQUIVO_ORIGEM é categórica. As divergências encontradas são registradas no log e ficam
+        em df.attrs['divergencias_esquema'] para o relatório em PDF.
+
         Args:
             lista_de_arquivos (list): Uma lista de strings contendo os caminhos
                                       completos para os arquivos Excel.
+            contexto (ContextoProgresso, optional): Recebe o progresso por arquivo lido
+                                                    e permite cancelar entre um arquivo e outro.
+            max_processos (int, optional): Sobrepõe o max_processos do processador nesta chamada.
+            abas (optional): Sobrepõe a seleção de abas do processador nesta chamada.
 
         Returns:
-            pd.DataFrame: O DataFrame consolidado com uma coluna de rastreabilidade.
+            pd.DataFrame: O DataFrame consolidado com uma coluna de rastreabilidade (e a coluna
+                          ABA_ORIGEM, se as abas foram selecionadas).
 
         Raises:
             ValueError: Se a lista de arquivos estiver vazia ou se nenhum arquivo
@@ -41,43 +124,242 @@ class ExcelProcessor:
             raise ValueError("Nenhum arquivo foi selecionado para processamento.")
 
         self.log(f"Iniciando a consolidação de {len(lista_de_arquivos)} arquivo(s)...")
-        lista_de_dataframes = []
-
-        for arquivo_path in lista_de_arquivos:
-            nome_arquivo = os.path.basename(arquivo_path)
-            try:
-                self.log(f"Lendo o arquivo: {nome_arquivo}")
-                # Lê a primeira aba de cada arquivo Excel
-                df_temp = pd.read_excel(arquivo_path)
-                # Adiciona uma coluna de origem para rastreabilidade, que é muito útil
-                df_temp['ARQUIVO_ORIGEM'] = nome_arquivo
-                lista_de_dataframes.append(df_temp)
-            except Exception as e:
-                self.log(f"⚠️ Erro ao ler o arquivo {nome_arquivo}: {e}. O arquivo será ignorado.")
-                continue
+        contexto = contexto or CONTEXTO_NULO
+        reconciliador = ReconciliadorEsquema()
+        unidades = self._unidades_de_leitura(lista_de_arquivos, abas)
+        with closing(self._ler_arquivos(unidades, contexto, max_processos)) as leituras:
+            lista_de_dataframes = [reconciliador.registrar(_rotulo(unidade), df)
+                                   for unidade, df in leituras if df is not None]
 
         if not lista_de_dataframes:
             raise ValueError("Nenhum dos arquivos selecionados pôde ser lido com sucesso.")
 
-        df_consolidado = pd.concat(lista_de_dataframes, ignore_index=True)
+        contexto.etapa("Reconciliando colunas")
+        df_consolidado = reconciliador.consolidar(lista_de_dataframes)
+        df_consolidado.attrs['divergencias_esquema'] = self._registrar_divergencias(reconciliador)
         self.log(f"Consolidação concluída. Total de {len(df_consolidado)} linhas processadas.")
         return df_consolidado
 
+    def _unidades_de_leitura(self, lista_de_arquivos: list, abas=None) -> list:
+        """
+        Lista as leituras a fazer, como (caminho, aba): uma por arquivo (aba None = primeira)
+        ou, com abas selecionadas, uma por aba correspondente de cada arquivo.
+        """
+        abas = abas if abas is not None else self.abas
+        if abas is None:
+            return [(caminho, None) for caminho in lista_de_arquivos]
+
+        unidades = []
+        for caminho in lista_de_arquivos:
+            try:
+                selecionadas = selecionar_abas(nomes_abas(caminho), abas)
+            except Exception:
+                unidades.append((caminho, None))  # O erro é registrado quando o arquivo for lido
+                continue
+            if not selecionadas:
+                self.log(f"⚠️ Nenhuma aba de {os.path.basename(caminho)} corresponde à seleção. O arquivo será ignorado.")
+            unidades.extend((caminho, aba) for aba in selecionadas)
+        return unidades
+
+    def _ler_arquivos(self, unidades: list, contexto: ContextoProgresso, max_processos: int = None):
+        """
+        Gera ((caminho, aba), DataFrame) para cada unidade de leitura, na ordem da lista; o
+        DataFrame é None se a leitura falhou (o erro é registrado no log e a unidade, ignorada).
+
+        Com mais de um processo, as leituras seguintes (inclusive outras abas do mesmo arquivo)
+        são adiantadas no pool, mas nunca há mais do que `processos` leituras aguardando consumo.
+        """
+        total = len(unidades)
+        processos = min(max_processos or self.max_processos or max_processos_padrao(), total)
+        if processos <= 1:
+            for i, unidade in enumerate(unidades):
+                contexto.verificar_cancelamento()
+                contexto.progresso(i, total, "Lendo arquivos")
+                try:
+                    self.log(f"Lendo o arquivo: {_rotulo(unidade)}")
+                    df = _ler_arquivo_excel(*unidade)
+                except Exception as e:
+                    self.log(f"⚠️ Erro ao ler o arquivo {_rotulo(unidade)}: {e}. O arquivo será ignorado.")
+                    df = None
+                yield unidade, df
+            contexto.progresso(total, total, "Lendo arquivos")
+            return
+
+        self.log(f"Lendo os arquivos em {processos} processos simultâneos...")
+        executor = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn'))
+        pendentes = deque()
+        proximo = 0
+        try:
+            while pendentes or proximo < total:
+                while proximo < total and len(pendentes) < processos:
+                    pendentes.append((proximo, executor.submit(_ler_arquivo_excel, *unidades[proximo])))
+                    proximo += 1
+                i, futuro = pendentes.popleft()
+                try:
+                    df = futuro.result()
+                    self.log(f"Arquivo lido: {_rotulo(unidades[i])}")
+                except Exception as e:
+                    self.log(f"⚠️ Erro ao ler o arquivo {_rotulo(unidades[i])}: {e}. O arquivo será ignorado.")
+                    df = None
+                contexto.progresso(i + 1, total, "Lendo arquivos")
+                contexto.verificar_cancelamento()
+                yield unidades[i], df
+        finally:
+            # Em caso de cancelamento ou erro, descarta as leituras que ainda não começaram
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _registrar_divergencias(self, reconciliador: ReconciliadorEsquema, tipos_convertidos: bool = True) -> dict:
+        """Registra no log as divergências de esquema de cada arquivo e as retorna."""
+        divergencias = reconciliador.divergencias(tipos_convertidos)
+        for nome_arquivo, itens in divergencias.items():
+            self.log(f"⚠️ Divergências de esquema em {nome_arquivo}:")
+            for item in itens:
+                self.log(f"   - {item}")
+        return divergencias
+
+    def _colunas_consolidadas(self, unidades: list, reconciliador: ReconciliadorEsquema) -> list:
+        """
+        Lê apenas o cabeçalho de cada unidade de leitura e retorna a união das colunas (com os
+        nomes alinhados pelo reconciliador), seguida das colunas de origem. Necessário para
+        gravar em fluxo, já que as colunas da saída são fixadas antes da primeira linha.
+        """
+        for unidade in unidades:
+            caminho, aba = unidade
+            try:
+                cabecalho = ler_cabecalho(caminho, aba=aba or 0, linhas_amostra=0)['colunas']
+            except Exception:
+                continue  # O erro é registrado quando o arquivo for lido
+            reconciliador.alinhar_nomes(_rotulo(unidade), cabecalho + ([COLUNA_ABA] if aba is not None else []))
+        return reconciliador.colunas
+
+    def consolidar_em_fluxo(self, lista_de_arquivos: list, pasta_destino: str, formato: str = 'xlsx',
+                            contexto: ContextoProgresso = None, max_processos: int = None, abas=None) -> dict:
+        """
+        Consolida os arquivos gravando as linhas de cada um na saída assim que ele é lido, sem
+        montar o DataFrame consolidado: apenas um arquivo de entrada fica em memória por vez (ou
+        um por processo de leitura, na leitura paralela).
+
+        Args:
+            formato (str): 'xlsx' (openpyxl write-only, dividido em partes se passar do limite
+                           de linhas do Excel), 'csv' ou 'parquet'.
+
+        Os nomes das colunas são alinhados como em processar_arquivos_excel; os tipos não são
+        convertidos (os valores são gravados como vieram de cada arquivo, e como texto no
+        Parquet), e as divergências de tipo são apontadas como tal no log e no PDF.
+
+        Returns:
+            dict: 'caminho' do arquivo gerado, 'caminhos' (as partes, se dividido), 'contagens' ({arquivo: linhas}, para o log em PDF),
+                  'total_linhas' e 'divergencias' ({arquivo: [descrições]}).
+        """
+        if not lista_de_arquivos:
+            raise ValueError("Nenhum arquivo foi selecionado para processamento.")
+        if formato not in FORMATOS_SAIDA:
+            raise ValueError(f"Formato de saída desconhecido: '{formato}'.")
+
+        contexto = contexto or CONTEXTO_NULO
+        self.log(f"Iniciando a consolidação em fluxo de {len(lista_de_arquivos)} arquivo(s) para {formato.upper()}...")
+        contexto.etapa("Lendo cabeçalhos")
+        reconciliador = ReconciliadorEsquema()
+        unidades = self._unidades_de_leitura(lista_de_arquivos, abas)
+        colunas = self._colunas_consolidadas(unidades, reconciliador)
+
+        caminho_saida = _reservar_caminho(pasta_destino, "consolidado", FORMATOS_SAIDA[formato])
+        try:
+            escritor = criar_escritor(formato, caminho_saida, colunas)
+        except BaseException:
+            _remover_reserva(caminho_saida)
+            raise
+        contagens = {}
+        try:
+            with closing(self._ler_arquivos(unidades, contexto, max_processos)) as leituras:
+                for unidade, df in leituras:
+                    if df is None:
+                        continue
+                    nome_arquivo = os.path.basename(unidade[0])
+                    escritor.escrever(reconciliador.registrar(_rotulo(unidade), df))
+                    contagens[nome_arquivo] = contagens.get(nome_arquivo, 0) + len(df)
+                    del df
+            if not contagens:
+                raise ValueError("Nenhum dos arquivos selecionados pôde ser lido com sucesso.")
+            contexto.etapa("Finalizando o arquivo consolidado")
+            escritor.fechar()
+        except BaseException:
+            escritor.descartar()
+            raise
+
+        for caminho in escritor.caminhos:
+            self.log(f"✅ Arquivo consolidado salvo com sucesso em: {caminho}")
+        self.log(f"Consolidação concluída. Total de {escritor.linhas_escritas} linhas processadas.")
+        return {'caminho': caminho_saida, 'caminhos': escritor.caminhos, 'contagens': contagens, 'total_linhas': escritor.linhas_escritas,
+                'divergencias': self._registrar_divergencias(reconciliador, tipos_convertidos=False)}
+
+    def juntar_arquivos(self, lista_de_arquivos: list, pasta_destino: str, contexto: ContextoProgresso = None,
+                        max_processos: int = None, formato_saida: str = 'xlsx', em_fluxo: bool = False,
+                        abas=None) -> str:
+        """
+        Executa o processo completo: consolida os arquivos, salva o arquivo consolidado e gera o log em PDF.
+
+        Args:
+            formato_saida (str): 'xlsx', 'csv' ou 'parquet'.
+            em_fluxo (bool): Grava cada arquivo na saída assim que é lido, sem conversão de tipos
+                             (ver consolidar_em_fluxo; usa bem menos memória). Se False, monta o
+                             DataFrame consolidado com os tipos reconciliados e o salva.
+            abas (optional): Abas a consolidar de cada arquivo (padrão: a seleção do processador).
+
+        Returns:
+            str: Mensagem de conclusão.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        if em_fluxo:
+            resultado = self.consolidar_em_fluxo(lista_de_arquivos, pasta_destino, formato_saida,
+                                                 contexto=contexto, max_processos=max_processos, abas=abas)
+            contexto.verificar_cancelamento()
+            contexto.etapa("Gerando log em PDF")
+            self._gerar_pdf_resumo(pasta_destino, resultado['contagens'], resultado['divergencias'])
+            return "Processamento concluído com sucesso!"
+
+        df_consolidado = self.processar_arquivos_excel(lista_de_arquivos, contexto=contexto, max_processos=max_processos,
+                                                       abas=abas)
+        contexto.verificar_cancelamento()
+        contexto.etapa("Salvando consolidado")
+        self.salvar_consolidado(pasta_destino, df_consolidado, formato_saida)
+        contexto.verificar_cancelamento()
+        contexto.etapa("Gerando log em PDF")
+        self.gerar_resumo_e_pdf_log(pasta_destino, df_consolidado)
+        return "Processamento concluído com sucesso!"
+
     def salvar_consolidado_excel(self, pasta_destino: str, df: pd.DataFrame):
-        """Salva o DataFrame consolidado em um novo arquivo Excel com timestamp."""
+        """
+        Salva o DataFrame consolidado em um novo arquivo Excel com timestamp (dividido em partes
+        se passar do limite de linhas do Excel; ver salvar_excel).
+        """
+        self.salvar_consolidado(pasta_destino, df, 'xlsx')
+
+    def salvar_consolidado(self, pasta_destino: str, df: pd.DataFrame, formato: str = 'xlsx'):
+        """Salva o DataFrame consolidado, com os tipos reconciliados, em um novo arquivo com timestamp."""
+        if formato not in FORMATOS_SAIDA:
+            raise ValueError(f"Formato de saída desconhecido: '{formato}'.")
         if df.empty:
             self.log("Nenhum dado consolidado para salvar.")
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        caminho_saida = os.path.join(pasta_destino, f"consolidado_{timestamp}.xlsx")
-
+        caminho_saida = _reservar_caminho(pasta_destino, "consolidado", FORMATOS_SAIDA[formato])
         try:
-            df.to_excel(caminho_saida, index=False)
-            self.log(f"✅ Arquivo consolidado salvo com sucesso em: {caminho_saida}")
+            if formato == 'xlsx':
+                caminhos = salvar_excel(df, caminho_saida, max_processos=self.max_processos, log=self.log)
+            elif formato == 'csv':
+                df.to_csv(caminho_saida, index=False, encoding='utf-8-sig')
+                caminhos = [caminho_saida]
+            else:
+                df.to_parquet(caminho_saida, index=False)
+                caminhos = [caminho_saida]
+            for caminho in caminhos:
+                self.log(f"✅ Arquivo consolidado salvo com sucesso em: {caminho}")
         except Exception as e:
             self.log(f"❌ Erro ao salvar o arquivo consolidado: {e}")
             raise
+        finally:
+            _remover_reserva(caminho_saida)  # Se o consolidado foi dividido em partes ou não foi salvo
 
     def gerar_resumo_e_pdf_log(self, pasta_destino: str, df: pd.DataFrame):
         """
@@ -87,13 +369,23 @@ class ExcelProcessor:
             self.log("Nenhum dado para gerar o resumo em PDF.")
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        caminho_pdf = os.path.join(pasta_destino, f"log_processamento_{timestamp}.pdf")
-
         # Cria um resumo de quantas linhas vieram de cada arquivo
-        resumo = df.groupby('ARQUIVO_ORIGEM').size().reset_index(name='LINHAS_PROCESSADAS')
+        contagens = df.groupby('ARQUIVO_ORIGEM', sort=False, observed=True).size().to_dict()
+        self._gerar_pdf_resumo(pasta_destino, contagens, df.attrs.get('divergencias_esquema'))
+
+    def _gerar_pdf_resumo(self, pasta_destino: str, contagens: dict, divergencias: dict = None):
+        """
+        Gera o log em PDF a partir das contagens {arquivo de origem: linhas consolidadas} e, se
+        houver, das divergências de esquema {arquivo: [descrições]}.
+        """
+        if not contagens:
+            self.log("Nenhum dado para gerar o resumo em PDF.")
+            return
+
+        caminho_pdf = _reservar_caminho(pasta_destino, "log_processamento", ".pdf")
 
         try:
+            from fpdf import FPDF  # Importado sob demanda para não pesar na abertura da tela
             pdf = FPDF()
             pdf.add_page()
             pdf.set_font("Helvetica", "B", 16)
@@ -103,8 +395,8 @@ class ExcelProcessor:
             pdf.set_font("Helvetica", size=11)
             pdf.cell(0, 8, f"Data do Processamento: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", new_x="LMARGIN",
                      new_y="NEXT")
-            pdf.cell(0, 8, f"Total de Arquivos Processados: {len(resumo)}", new_x="LMARGIN", new_y="NEXT")
-            pdf.cell(0, 8, f"Total de Linhas Consolidadas: {len(df)}", new_x="LMARGIN", new_y="NEXT")
+            pdf.cell(0, 8, f"Total de Arquivos Processados: {len(contagens)}", new_x="LMARGIN", new_y="NEXT")
+            pdf.cell(0, 8, f"Total de Linhas Consolidadas: {sum(contagens.values())}", new_x="LMARGIN", new_y="NEXT")
             pdf.ln(10)
 
             # Cabeçalho da tabela no PDF
@@ -115,13 +407,25 @@ class ExcelProcessor:
 
             # Corpo da tabela
             pdf.set_font("Helvetica", size=10)
-            for _, row in resumo.iterrows():
-                pdf.cell(130, 10, str(row['ARQUIVO_ORIGEM']), border=1)
-                pdf.cell(50, 10, str(row['LINHAS_PROCESSADAS']), border=1, align='C')
+            for arquivo_origem, linhas in contagens.items():
+                pdf.cell(130, 10, _texto_pdf(arquivo_origem), border=1)
+                pdf.cell(50, 10, str(linhas), border=1, align='C')
                 pdf.ln()
 
+            if divergencias:
+                pdf.ln(10)
+                pdf.set_font("Helvetica", "B", 12)
+                pdf.cell(0, 10, "Divergências de Esquema", new_x="LMARGIN", new_y="NEXT")
+                for nome_arquivo, itens in divergencias.items():
+                    pdf.set_font("Helvetica", "B", 10)
+                    pdf.multi_cell(0, 6, _texto_pdf(nome_arquivo), new_x="LMARGIN", new_y="NEXT")
+                    pdf.set_font("Helvetica", size=9)
+                    for item in itens:
+                        pdf.multi_cell(0, 5, _texto_pdf(f"- {item}"), new_x="LMARGIN", new_y="NEXT")
+
             pdf.output(caminho_pdf)
             self.log(f"📄 Relatório em PDF gerado com sucesso em: {caminho_pdf}")
         except Exception as e:
             self.log(f"❌ Erro ao gerar o relatório em PDF: {e}")
+            _remover_reserva(caminho_pdf)
             raise
\ No newline at end of file
@@ -0,0 +1,176 @@
+# app/logic/leitor_excel.py
+"""
+Leitura de planilhas Excel usada por todos os processadores.
+
+O motor padrão do pandas (openpyxl) interpreta o XML da planilha em Python puro e é a opção
+mais lenta. Quando o python-calamine está instalado (pip install python-calamine), as leituras
+passam a usar o motor 'calamine', escrito em Rust e várias vezes mais rápido; caso contrário,
+continua-se com o openpyxl. O resultado com dtype=str é o mesmo nos dois motores (números
+inteiros sem ".0", datas no formato do pandas), que é o que os processadores esperam.
+
+O motor pode ser forçado pela variável de ambiente ATIVIDADES_FOLHA_LEITOR_EXCEL
+('calamine' ou 'openpyxl') ou por definir_motor(); a escolha vale também para os
+processos de trabalho criados depois dela.
+
+Para planilhas com várias abas, ler_abas() lê apenas as abas selecionadas (por nome, posição
+ou padrão, ver selecionar_abas) e, quando são várias, interpreta-as ao mesmo tempo em
+processos separados.
+"""
+import os
+import fnmatch
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+VARIAVEL_MOTOR = "ATIVIDADES_FOLHA_LEITOR_EXCEL"
+MOTORES_SUPORTADOS = ('calamine', 'openpyxl')
+
+_falhas_calamine_avisadas = False
+
+
+def _calamine_disponivel() -> bool:
+    # O motor 'calamine' do pandas existe a partir da versão 2.2
+    versao_pandas = tuple(int(parte) for parte in pd.__version__.split('.')[:2] if parte.isdigit())
+    return versao_pandas >= (2, 2) and importlib.util.find_spec("python_calamine") is not None
+
+
+def motores_disponiveis() -> list:
+    """Motores que podem ser usados neste computador, do mais rápido para o mais lento."""
+    return [motor for motor in MOTORES_SUPORTADOS if motor != 'calamine' or _calamine_disponivel()]
+
+
+def motor_atual() -> str:
+    """Motor usado quando nenhum é informado: o definido pelo usuário, se disponível, ou o mais rápido."""
+    disponiveis = motores_disponiveis()
+    escolhido = os.environ.get(VARIAVEL_MOTOR, "").strip().lower()
+    return escolhido if escolhido in disponiveis else disponiveis[0]
+
+
+def definir_motor(motor: str = None):
+    """Fixa o motor de leitura (None volta à escolha automática)."""
+    if motor is None:
+        os.environ.pop(VARIAVEL_MOTOR, None)
+        return
+    if motor not in MOTORES_SUPORTADOS:
+        raise ValueError(f"Motor de leitura desconhecido: '{motor}'. Use um de: {', '.join(MOTORES_SUPORTADOS)}.")
+    os.environ[VARIAVEL_MOTOR] = motor
+
+
+def ler_excel(caminho, motor: str = None, **kwargs):
+    """
+    Equivalente a pd.read_excel(caminho, **kwargs) usando o motor configurado.
+
+    Se o calamine não conseguir ler um arquivo (recurso da planilha não suportado), a leitura
+    é refeita com o openpyxl. Arquivos .xls antigos ficam com o motor que o pandas escolher.
+
+    Args:
+        caminho (str): Caminho da planilha.
+        motor (str, optional): 'calamine' ou 'openpyxl'; padrão: motor_atual().
+        **kwargs: Repassados ao pd.read_excel (dtype, sheet_name, usecols...).
+    """
+    global _falhas_calamine_avisadas
+    motor = motor or motor_atual()
+    if motor == 'calamine':
+        try:
+            return pd.read_excel(caminho, engine='calamine', **kwargs)
+        except (FileNotFoundError, PermissionError):
+            raise
+        except Exception as e:
+            if not _falhas_calamine_avisadas:
+                print(f"⚠️ AVISO: O leitor rápido não conseguiu ler '{os.path.basename(str(caminho))}' ({e}). "
+                      f"Usando o openpyxl para este arquivo.")
+                _falhas_calamine_avisadas = True
+
+    motor_openpyxl = None if str(caminho).lower().endswith('.xls') else 'openpyxl'
+    return pd.read_excel(caminho, engine=motor_openpyxl, **kwargs)
+
+
+def nomes_abas(caminho) -> list:
+    """Nomes das abas da planilha, na ordem do arquivo, sem ler o conteúdo delas."""
+    if str(caminho).lower().endswith(('.xlsx', '.xlsm')):
+        from openpyxl import load_workbook
+        pasta = load_workbook(caminho, read_only=True)
+        try:
+            return list(pasta.sheetnames)
+        finally:
+            pasta.close()
+    with pd.ExcelFile(caminho) as arquivo:
+        return list(arquivo.sheet_names)
+
+
+def interpretar_abas(texto: str):
+    """
+    Converte a seleção de abas digitada pelo usuário para o formato de selecionar_abas.
+
+    Ex: "" -> None (primeira aba); "*" -> todas; "#1, #3" -> primeira e terceira (posições
+    contadas a partir de 1); "Janeiro, Fev*, 2024" -> as abas Janeiro e 2024 e as que começam
+    com "Fev". Sem o "#", números são nomes de aba.
+    """
+    itens = [item.strip() for item in (texto or "").split(",") if item.strip()]
+    if not itens:
+        return None
+    return [int(item[1:]) - 1 if item[:1] == "#" and item[1:].strip().isdigit() else item for item in itens]
+
+
+def selecionar_abas(nomes: list, abas=None) -> list:
+    """
+    Aplica uma seleção de abas à lista de nomes de uma planilha.
+
+    Args:
+        nomes (list): Abas existentes, na ordem do arquivo.
+        abas: None (a primeira aba), "*" (todas), uma posição (int, a partir de 0; negativas
+              contam do fim), um nome, um padrão com curingas ("Folha*", "??-2024"; sem
+              diferenciar maiúsculas) ou uma lista com qualquer combinação desses.
+
+    Returns:
+        list: Nomes selecionados, na ordem do arquivo e sem repetições.
+    """
+    if abas is None:
+        return nomes[:1]
+    selecionadas = set()
+    for aba in (abas if isinstance(abas, (list, tuple)) else [abas]):
+        if isinstance(aba, int):
+            if -len(nomes) <= aba < len(nomes):
+                selecionadas.add(nomes[aba])
+        elif aba in nomes:
+            selecionadas.add(aba)
+        else:
+            selecionadas.update(nome for nome in nomes if fnmatch.fnmatch(nome.lower(), str(aba).lower()))
+    return [nome for nome in nomes if nome in selecionadas]
+
+
+def _ler_aba(caminho, aba, kwargs):
+    return aba, ler_excel(caminho, sheet_name=aba, **kwargs)
+
+
+def ler_abas(caminho, abas=None, max_processos: int = None, **kwargs) -> dict:
+    """
+    Lê apenas as abas selecionadas de uma planilha (ver selecionar_abas para o formato de `abas`).
+
+    Com várias abas e mais de um processo disponível, cada aba é interpretada em um processo
+    separado; caso contrário, o arquivo é aberto uma única vez e as abas são lidas em sequência.
+    Em um processo de trabalho (ex: o do PoolProcessos ou o de um pool de leitura), a leitura é
+    sempre em sequência, para não criar um pool de processos dentro de outro a cada planilha.
+
+    Args:
+        max_processos (int, optional): Abas lidas ao mesmo tempo; padrão: uma por núcleo.
+        **kwargs: Repassados ao ler_excel (dtype, usecols...).
+
+    Returns:
+        dict: {nome da aba: DataFrame}, na ordem do arquivo. Vazio se nenhuma aba corresponder.
+    """
+    nomes = selecionar_abas(nomes_abas(caminho), abas)
+    if not nomes:
+        return {}
+
+    processos = min(max_processos or os.cpu_count() or 1, len(nomes))
+    if processos > 1 and multiprocessing.parent_process() is None:
+        try:
+            with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context('spawn')) as executor:
+                return dict(executor.map(_ler_aba, [caminho] * len(nomes), nomes, [kwargs] * len(nomes)))
+        except (BrokenProcessPool, OSError):
+            pass  # Sem processos disponíveis: lê em sequência
+    return ler_excel(caminho, sheet_name=nomes, **kwargs)
@@ -0,0 +1,48 @@
+# app/logic/progresso.py
+
+
+class ProcessamentoCancelado(BaseException):
+    """
+    Lançada quando o usuário cancela um processamento em andamento.
+
+    Herda de BaseException (como KeyboardInterrupt) para não ser capturada pelos blocos
+    `except Exception` que os processadores usam para pular um arquivo com erro.
+    """
+
+
+class ContextoProgresso:
+    """
+    Protocolo de progresso e cancelamento aceito pelos processadores (parâmetro `contexto`).
+
+    Esta implementação não faz nada e é usada quando nenhum contexto é informado; a interface
+    fornece a sua própria (ver app.task_runner.ContextoTarefa), que repassa o progresso para a
+    lista de tarefas e atende ao botão de cancelar.
+    """
+
+    @property
+    def cancelado(self) -> bool:
+        return False
+
+    def verificar_cancelamento(self):
+        """Lança ProcessamentoCancelado se o cancelamento tiver sido solicitado."""
+        if self.cancelado:
+            raise ProcessamentoCancelado()
+
+    def progresso(self, atual: int, total: int = 0, etapa: str = None):
+        """Informa quantos itens (linhas, arquivos...) de `total` já foram concluídos na etapa."""
+
+    def etapa(self, nome: str):
+        """Informa o início de uma nova etapa, ainda sem total conhecido."""
+        self.progresso(0, 0, nome)
+
+    def marcar(self, atual: int, total: int, etapa: str = None, a_cada: int = 1000):
+        """
+        Ponto de verificação para laços longos: a cada `a_cada` itens (e no último) informa o
+        progresso e verifica o cancelamento, mantendo o custo por item desprezível.
+        """
+        if atual % a_cada == 0 or atual >= total:
+            self.verificar_cancelamento()
+            self.progresso(atual, total, etapa)
+
+
+CONTEXTO_NULO = ContextoProgresso()
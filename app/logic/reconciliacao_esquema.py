@@ -0,0 +1,241 @@
+# app/logic/reconciliacao_esquema.py
+"""
+Reconciliação de esquema na consolidação de planilhas (Juntar Arquivos).
+
+Planilhas do mesmo relatório costumam chegar com pequenas diferenças: "Matrícula" em uma,
+"MATRÍCULA " em outra; a mesma coluna como número em um mês e como texto no seguinte. Um
+pd.concat direto cria colunas separadas para cada grafia e alarga os tipos divergentes para
+object, o que deixa o consolidado maior e mais lento de gravar.
+
+O ReconciliadorEsquema:
+  - alinha os nomes das colunas ignorando maiúsculas/minúsculas e espaços (vale a primeira
+    grafia encontrada, sem os espaços sobrando);
+  - escolhe um tipo único por coluna antes da concatenação (inteiro, decimal, data, lógico ou
+    texto), no menor tipo numérico que comporta os valores;
+  - guarda as colunas de origem (arquivo e, se houver, aba) como categóricas (cada nome é
+    armazenado uma vez);
+  - registra as divergências de cada arquivo em relação ao consolidado.
+"""
+import re
+import pandas as pd
+
+COLUNA_ORIGEM = 'ARQUIVO_ORIGEM'
+COLUNA_ABA = 'ABA_ORIGEM'  # Presente quando as abas a ler foram selecionadas
+COLUNAS_ORIGEM = (COLUNA_ABA, COLUNA_ORIGEM)
+
+# Tipos lógicos usados na reconciliação
+VAZIO, INTEIRO, DECIMAL, DATA, LOGICO, TEXTO = 'vazio', 'inteiro', 'decimal', 'data', 'lógico', 'texto'
+
+# Colunas de texto com até esta proporção de valores distintos viram categóricas
+LIMITE_CATEGORIA = 0.5
+
+
+def chave_coluna(nome) -> str:
+    """Forma normalizada do nome de uma coluna, usada para reconhecer grafias equivalentes."""
+    return re.sub(r"\s+", " ", str(nome)).strip().casefold()
+
+
+def tipo_da_coluna(serie: pd.Series) -> str:
+    """Classifica uma coluna lida da planilha em um dos tipos lógicos da reconciliação."""
+    if serie.isna().all():
+        return VAZIO
+    if pd.api.types.is_bool_dtype(serie):
+        return LOGICO
+    if pd.api.types.is_integer_dtype(serie):
+        return INTEIRO
+    if pd.api.types.is_float_dtype(serie):
+        # Colunas inteiras com células vazias são lidas como decimais
+        valores = serie.dropna()
+        return INTEIRO if (valores == valores.round()).all() else DECIMAL
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return DATA
+
+    inferido = pd.api.types.infer_dtype(serie, skipna=True)
+    if inferido == 'boolean':
+        return LOGICO
+    if inferido == 'integer':
+        return INTEIRO
+    if inferido in ('floating', 'mixed-integer-float'):
+        return tipo_da_coluna(pd.to_numeric(serie))
+    if inferido in ('datetime', 'datetime64', 'date'):
+        return DATA
+    return TEXTO
+
+
+def _tipo_unificado(tipos: set) -> str:
+    tipos = tipos - {VAZIO}
+    if not tipos:
+        return VAZIO
+    if len(tipos) == 1:
+        return next(iter(tipos))
+    if tipos <= {INTEIRO, DECIMAL}:
+        return DECIMAL
+    return TEXTO
+
+
+def _como_texto(serie: pd.Series) -> pd.Series:
+    """Converte os valores para texto sem o ".0" dos inteiros lidos como decimais."""
+    def converter(valor):
+        if pd.isna(valor):
+            return pd.NA
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        return str(valor)
+    return serie.map(converter).astype('string')
+
+
+def _menor_inteiro(minimo, maximo) -> str:
+    for dtype, limite in (('Int8', 2 ** 7), ('Int16', 2 ** 15), ('Int32', 2 ** 31)):
+        if -limite <= minimo and maximo < limite:
+            return dtype
+    return 'Int64'
+
+
+class ReconciliadorEsquema:
+    """
+    Acumula os esquemas dos arquivos lidos e consolida os seus DataFrames em um só.
+
+    Uso: registrar(nome_do_arquivo, df) para cada arquivo lido (retorna o df com os nomes
+    alinhados) e, ao final, consolidar(lista_de_dfs) e divergencias().
+    """
+
+    def __init__(self):
+        self._nomes = {}  # chave normalizada -> nome canônico
+        self._colunas = []  # nomes canônicos, na ordem em que aparecem
+        self._arquivos = {}  # arquivo -> {'renomeadas': {original: canônico}, 'colunas': [...], 'tipos': {...}}
+
+    @property
+    def colunas(self) -> list:
+        """União das colunas de todos os arquivos, com as colunas de origem por último."""
+        return ([c for c in self._colunas if c not in COLUNAS_ORIGEM]
+                + [c for c in COLUNAS_ORIGEM if c in self._colunas or c == COLUNA_ORIGEM])
+
+    def alinhar_nomes(self, nome_arquivo: str, colunas) -> dict:
+        """
+        Registra as colunas de um arquivo e retorna o mapeamento {nome original: nome canônico}
+        das que precisam ser renomeadas.
+        """
+        renomeadas, vistas = {}, set()
+        for coluna in colunas:
+            chave = chave_coluna(coluna)
+            if chave in vistas:
+                # Duas grafias da mesma coluna no mesmo arquivo: a segunda é mantida como está
+                if coluna not in self._colunas:
+                    self._colunas.append(coluna)
+                continue
+            vistas.add(chave)
+            if chave not in self._nomes:
+                canonico = re.sub(r"\s+", " ", coluna).strip() if isinstance(coluna, str) else coluna
+                self._nomes[chave] = canonico
+                self._colunas.append(canonico)
+            if self._nomes[chave] != coluna:
+                renomeadas[coluna] = self._nomes[chave]
+
+        registro = self._arquivos.setdefault(nome_arquivo, {'tipos': {}})
+        registro['renomeadas'] = renomeadas
+        registro['colunas'] = [renomeadas.get(c, c) for c in colunas]
+        return renomeadas
+
+    def registrar(self, nome_arquivo: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Alinha os nomes das colunas de um arquivo lido e registra os tipos encontrados."""
+        renomeadas = self.alinhar_nomes(nome_arquivo, df.columns)
+        if renomeadas:
+            df = df.rename(columns=renomeadas)
+        self._arquivos[nome_arquivo]['tipos'] = {
+            coluna: tipo_da_coluna(df[coluna]) for coluna in df.columns
+            if coluna not in COLUNAS_ORIGEM and isinstance(df[coluna], pd.Series)
+        }
+        return df
+
+    def tipos_unificados(self) -> dict:
+        """{coluna: tipo lógico} escolhido para cada coluna a partir de todos os arquivos registrados."""
+        tipos = {coluna: set() for coluna in self._colunas if coluna not in COLUNAS_ORIGEM}
+        for registro in self._arquivos.values():
+            for coluna, tipo in registro['tipos'].items():
+                tipos.setdefault(coluna, set()).add(tipo)
+        return {coluna: _tipo_unificado(encontrados) for coluna, encontrados in tipos.items()}
+
+    def consolidar(self, lista_de_dataframes: list) -> pd.DataFrame:
+        """
+        Concatena os DataFrames já registrados com as colunas alinhadas e um tipo por coluna.
+        """
+        colunas = self.colunas
+        tipos = self.tipos_unificados()
+        categorias = {
+            coluna: list(dict.fromkeys(valor for df in lista_de_dataframes if coluna in df.columns
+                                       for valor in df[coluna].dropna().unique()))
+            for coluna in COLUNAS_ORIGEM if coluna in colunas
+        }
+
+        # Faixa de valores das colunas inteiras, para escolher o menor tipo que as comporta
+        faixas = {}
+        for df in lista_de_dataframes:
+            for coluna, tipo in tipos.items():
+                if tipo == INTEIRO and coluna in df.columns and df[coluna].notna().any():
+                    valores = pd.to_numeric(df[coluna])
+                    minimo, maximo = faixas.get(coluna, (valores.min(), valores.max()))
+                    faixas[coluna] = (min(minimo, valores.min()), max(maximo, valores.max()))
+
+        alinhados = []
+        for df in lista_de_dataframes:
+            df = df.reindex(columns=colunas)
+            for coluna, tipo in tipos.items():
+                df[coluna] = self._converter(df[coluna], tipo, faixas.get(coluna, (0, 0)))
+            for coluna, valores in categorias.items():
+                df[coluna] = pd.Categorical(df[coluna], categories=valores)
+            alinhados.append(df)
+
+        df_consolidado = pd.concat(alinhados, ignore_index=True)
+        for coluna, tipo in tipos.items():
+            if tipo == TEXTO and df_consolidado[coluna].nunique() <= LIMITE_CATEGORIA * len(df_consolidado):
+                df_consolidado[coluna] = df_consolidado[coluna].astype('category')
+        return df_consolidado
+
+    @staticmethod
+    def _converter(serie: pd.Series, tipo: str, faixa: tuple) -> pd.Series:
+        if tipo == INTEIRO:
+            return pd.to_numeric(serie).astype(_menor_inteiro(*faixa))
+        if tipo == DECIMAL:
+            return pd.to_numeric(serie).astype('float64')
+        if tipo == DATA:
+            return pd.to_datetime(serie)
+        if tipo == LOGICO:
+            return serie.astype('boolean')
+        if tipo == TEXTO:
+            return _como_texto(serie)
+        return serie
+
+    def divergencias(self, tipos_convertidos: bool = True) -> dict:
+        """
+        Diferenças de cada arquivo em relação ao esquema consolidado.
+
+        Args:
+            tipos_convertidos (bool): Se o consolidado foi gravado com os tipos unificados
+                                      (consolidar); False quando os valores foram gravados como
+                                      vieram dos arquivos (consolidação em fluxo).
+
+        Returns:
+            dict: {arquivo: [descrições]}, apenas para os arquivos com alguma divergência.
+        """
+        todas = [c for c in self._colunas if c not in COLUNAS_ORIGEM]
+        tipos = self.tipos_unificados()
+        relatorio = {}
+        for nome_arquivo, registro in self._arquivos.items():
+            itens = []
+            if registro['renomeadas']:
+                pares = ", ".join(f"'{original}' -> '{canonico}'" for original, canonico in registro['renomeadas'].items())
+                itens.append(f"Colunas renomeadas: {pares}")
+            ausentes = [c for c in todas if c not in registro['colunas']]
+            if ausentes:
+                itens.append(f"Colunas ausentes: {', '.join(map(str, ausentes))}")
+            descricao = "consolidada como {}" if tipos_convertidos else "gravada como veio do arquivo, sem conversão para {}"
+            tipo_diferente = [
+                f"{coluna} ({tipo}, {descricao.format(tipos[coluna])})"
+                for coluna, tipo in registro['tipos'].items()
+                if tipo not in (VAZIO, tipos.get(coluna))
+            ]
+            if tipo_diferente:
+                itens.append(f"Tipos divergentes: {', '.join(tipo_diferente)}")
+            if itens:
+                relatorio[nome_arquivo] = itens
+        return relatorio
@@ -0,0 +1,241 @@
+# app/logic/tabela_tarifas.py
+"""
+Tabela de tarifas da Ajuda de Custo (data/dados_ajuda_de_custo.xlsx), compilada e em cache.
+
+Ler a planilha a cada abertura do Cálculo ACO é a parte lenta da tela. A tabela normalizada
+(CLF, CODIGO, VALOR) é gravada ao lado da planilha em um cache Parquet cujo nome leva o hash do
+conteúdo dela e a sua data de modificação e tamanho. Nas aberturas seguintes, se a data e o
+tamanho continuam os mesmos, basta ler o cache e indexá-lo, o que leva milissegundos; só quando
+eles mudam o conteúdo é lido para calcular o hash. Um cache de outra versão da planilha nunca é
+usado, e os antigos são apagados quando um novo é gravado. O cache guarda apenas dados (não
+pickle), já que a pasta de dados pode ser gravada por outros usuários.
+
+verificar_atualizacao() compara a data de modificação da planilha com a da versão carregada e,
+se ela mudou, recompila a tabela em segundo plano. A tabela nova substitui a antiga de uma só
+vez (IndiceTarifas), então as consultas em andamento nunca esperam nem veem uma tabela pela
+metade.
+
+Para o preenchimento automático da tela, o índice inclui também as chaves ordenadas por CLF e
+por CODIGO (IndicePrefixos): os candidatos que começam com o texto digitado são localizados por
+busca binária, sem percorrer a tabela.
+"""
+import os
+import glob
+import bisect
+import hashlib
+import threading
+from collections import namedtuple
+
+import pandas as pd
+
+from app.logic.leitor_excel import ler_excel
+
+CAMINHO_PADRAO = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/dados_ajuda_de_custo.xlsx'))
+EXTENSAO_CACHE = ".tarifas.parquet"
+EXTENSAO_CACHE_ANTIGA = ".tarifas.pkl"  # Formato anterior (pickle): apagado sem ser lido
+
+# dados: a planilha normalizada (CLF, CODIGO, VALOR como texto); por_clf e por_clf_codigo: QTD de
+# linhas com a chave (para identificar ambiguidades) e TARIFA normal já numérica (NaN se inválida);
+# prefixos: IndicePrefixos da tabela
+IndiceTarifas = namedtuple('IndiceTarifas', ['dados', 'por_clf', 'por_clf_codigo', 'prefixos'])
+
+# Maior caractere possível: prefixo + FIM_PREFIXO fica depois de toda chave que começa com o prefixo
+FIM_PREFIXO = chr(0x10FFFF)
+
+
+class IndicePrefixos:
+    """
+    Linhas da tabela (CLF, CODIGO, tarifa normal, linhas do CLF) em duas listas ordenadas, uma por CLF e outra
+    por CODIGO. Cada consulta custa duas buscas binárias por lista mais os candidatos retornados.
+    """
+
+    def __init__(self, linhas: list):
+        self._por_clf = sorted(linhas)
+        self._chaves_clf = [linha[0] for linha in self._por_clf]
+        self._por_codigo = sorted(linhas, key=lambda linha: (linha[1], linha[0]))
+        self._chaves_codigo = [linha[1] for linha in self._por_codigo]
+
+    def __len__(self):
+        return len(self._por_clf)
+
+    @staticmethod
+    def _faixa(chaves: list, prefixo: str) -> tuple:
+        return bisect.bisect_left(chaves, prefixo), bisect.bisect_left(chaves, prefixo + FIM_PREFIXO)
+
+    def buscar(self, prefixo_clf: str = "", prefixo_codigo: str = "", limite: int = 50) -> list:
+        """
+        Linhas cujo CLF e CODIGO começam com os prefixos informados, ordenadas por CLF. Se houver
+        mais do que `limite`, vêm as primeiras na ordem da chave com a faixa mais estreita (CLF ou
+        CODIGO), sem percorrer as demais.
+
+        Returns:
+            list: Até `limite` tuplas (CLF, CODIGO, tarifa normal, linhas do CLF na tabela).
+        """
+        inicio_clf, fim_clf = self._faixa(self._chaves_clf, prefixo_clf)
+        inicio_cod, fim_cod = self._faixa(self._chaves_codigo, prefixo_codigo)
+        # Percorre a faixa mais estreita e filtra pelo outro prefixo
+        if fim_clf - inicio_clf <= fim_cod - inicio_cod:
+            linhas, inicio, fim, prefixo, posicao = self._por_clf, inicio_clf, fim_clf, prefixo_codigo, 1
+        else:
+            linhas, inicio, fim, prefixo, posicao = self._por_codigo, inicio_cod, fim_cod, prefixo_clf, 0
+        if not prefixo:
+            return sorted(linhas[inicio:min(fim, inicio + limite)])
+        encontradas = []
+        for indice in range(inicio, fim):
+            linha = linhas[indice]
+            if linha[posicao].startswith(prefixo):
+                encontradas.append(linha)
+                if len(encontradas) == limite:
+                    break
+        return sorted(encontradas)
+
+
+def compilar(dados: pd.DataFrame) -> IndiceTarifas:
+    """Indexa a tabela de tarifas por CLF e por (CLF, CODIGO)."""
+    dados = dados.copy()
+    dados['CLF'] = dados['CLF'].astype(str).str.strip()
+    dados['CODIGO'] = dados['CODIGO'].astype(str).str.strip()
+    tarifas = dados.assign(
+        TARIFA=pd.to_numeric(dados['VALOR'].astype(str).str.replace(',', '.', regex=False), errors='coerce'))
+    agregacao = {'QTD': ('TARIFA', 'size'), 'TARIFA': ('TARIFA', 'first')}
+    por_clf = tarifas.groupby('CLF', sort=False).agg(**agregacao)
+    linhas = zip(tarifas['CLF'].tolist(), tarifas['CODIGO'].tolist(), tarifas['TARIFA'].tolist(),
+                 por_clf['QTD'].reindex(tarifas['CLF']).tolist())
+    return IndiceTarifas(dados, por_clf,
+                         tarifas.groupby(['CLF', 'CODIGO'], sort=False).agg(**agregacao),
+                         IndicePrefixos(list(linhas)))
+
+
+INDICE_VAZIO = compilar(pd.DataFrame(columns=['CLF', 'CODIGO', 'VALOR']))
+
+
+def _hash_arquivo(caminho: str) -> str:
+    resumo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()[:16]
+
+
+class TabelaTarifas:
+    """
+    Tabela de tarifas de uma planilha, compartilhada por todos os CalcAcoProcessor do processo
+    (ver instancia()). As consultas usam sempre `indice`, que é trocado por inteiro a cada recarga.
+    """
+
+    _instancias = {}
+    _trava_instancias = threading.Lock()
+
+    @classmethod
+    def instancia(cls, caminho: str = CAMINHO_PADRAO, log=None) -> 'TabelaTarifas':
+        """Retorna a tabela da planilha, carregando-a na primeira chamada."""
+        with cls._trava_instancias:
+            if caminho not in cls._instancias:
+                cls._instancias[caminho] = cls(caminho, log)
+            return cls._instancias[caminho]
+
+    def __init__(self, caminho: str = CAMINHO_PADRAO, log=None):
+        self.caminho = caminho
+        self.log = log or print
+        self.indice = INDICE_VAZIO
+        self._assinatura = None  # (data de modificação, tamanho) da versão carregada
+        self._trava_recarga = threading.Lock()
+        self.carregar(inicial=True)
+
+    def _assinatura_arquivo(self):
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return estado.st_mtime_ns, estado.st_size
+
+    def _caminho_cache(self, hash_planilha: str, assinatura) -> str:
+        data_modificacao, tamanho = assinatura
+        return f"{os.path.splitext(self.caminho)[0]}.{hash_planilha}.{data_modificacao}-{tamanho}{EXTENSAO_CACHE}"
+
+    def carregar(self, inicial: bool = False):
+        """
+        Carrega a planilha (pelo cache, se houver um da versão atual) e publica o novo índice.
+        Na carga inicial, uma falha deixa a tabela vazia; nas recargas, mantém a versão anterior.
+        """
+        assinatura = self._assinatura_arquivo()
+        if assinatura is None:
+            self.log(f"⚠️ AVISO: O arquivo de dados não foi encontrado em: {self.caminho}")
+            self.indice, self._assinatura = INDICE_VAZIO, None
+            return
+
+        try:
+            indice = self._ler_cache(self._caches(f"*.{assinatura[0]}-{assinatura[1]}"))
+            if indice is None:
+                # A planilha mudou (ou foi tocada) desde o cache: o hash decide se o conteúdo é outro
+                hash_planilha = _hash_arquivo(self.caminho)
+                indice = self._ler_cache(self._caches(f"{hash_planilha}.*"))
+                if indice is None:
+                    indice = compilar(ler_excel(self.caminho, dtype=str))
+                self._gravar_cache(self._caminho_cache(hash_planilha, assinatura), indice)
+        except Exception as e:
+            if inicial:
+                self.log(f"🚨 ERRO CRÍTICO ao tentar carregar a base de dados: {e}")
+                self.indice = INDICE_VAZIO
+            else:
+                self.log(f"⚠️ AVISO: Não foi possível recarregar a base de dados ({e}). A versão anterior continua em uso.")
+            self._assinatura = assinatura  # Não tenta de novo até o arquivo mudar outra vez
+            return
+
+        self.indice, self._assinatura = indice, assinatura
+        self.log("✅ Base de dados de ajuda de custo carregada com sucesso.")
+
+    def _caches(self, chave: str = "*", extensao: str = EXTENSAO_CACHE) -> list:
+        """Caches da planilha cujo nome, entre o nome da planilha e a extensão, corresponde a `chave`."""
+        return glob.glob(glob.escape(os.path.splitext(self.caminho)[0]) + "." + chave + extensao)
+
+    @staticmethod
+    def _ler_cache(caminhos: list):
+        """IndiceTarifas do primeiro cache legível entre `caminhos`, ou None."""
+        for caminho_cache in caminhos:
+            try:
+                return compilar(pd.read_parquet(caminho_cache))
+            except Exception:
+                continue  # Cache corrompido (ou pyarrow ausente): recompila a partir da planilha
+        return None
+
+    def _gravar_cache(self, caminho_cache: str, indice: IndiceTarifas):
+        try:
+            temporario = caminho_cache + ".tmp"
+            indice.dados[['CLF', 'CODIGO', 'VALOR']].to_parquet(temporario, index=False)
+            os.replace(temporario, caminho_cache)
+            for antigo in self._caches() + self._caches(extensao=EXTENSAO_CACHE_ANTIGA):
+                if antigo != caminho_cache:
+                    os.remove(antigo)
+        except (OSError, ImportError) as e:
+            self.log(f"⚠️ AVISO: Não foi possível gravar o cache da base de dados: {e}")
+
+    def verificar_atualizacao(self, em_segundo_plano: bool = True) -> bool:
+        """
+        Recarrega a tabela se a planilha mudou desde a última carga.
+
+        Args:
+            em_segundo_plano (bool): Recarrega em uma thread e retorna imediatamente (as consultas
+                                     continuam com a versão atual até a nova ficar pronta). Se False,
+                                     só retorna com a versão atual carregada, aguardando inclusive uma
+                                     recarga em segundo plano que já esteja em andamento.
+
+        Returns:
+            bool: True se uma recarga foi iniciada (em segundo plano) ou feita.
+        """
+        if self._assinatura_arquivo() == self._assinatura:
+            return False
+        if not em_segundo_plano:
+            return self._recarregar()
+        if self._trava_recarga.locked():
+            return False
+        threading.Thread(target=self._recarregar, name="recarga_tarifas", daemon=True).start()
+        return True
+
+    def _recarregar(self) -> bool:
+        with self._trava_recarga:
+            if self._assinatura_arquivo() == self._assinatura:
+                return False  # Outra recarga já carregou esta versão
+            self.log("🔄 A base de dados de ajuda de custo foi alterada. Recarregando...")
+            self.carregar()
+            return True
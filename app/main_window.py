@@ -1,24 +1,56 @@
 # app/main_window.py
+import os
+import time
+import datetime
+import importlib
+import threading
 from PySide6.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QFrame, QStackedWidget
-from PySide6.QtCore import QSize
-
-# Importa os widgets de tela
-from app.views.home_gui import HomeGUI
-from app.views.aco_militar_gui import AcoMilitarGUI
-from app.views.aco_demais_cat_gui import AcoDemaisCatGUI
-from app.views.file_monitor_gui import FileMonitorGUI
-from app.views.analise_folha_gui import AnaliseView
-from app.views.calc_aco_gui import CalcAcoGUI
-from app.views.junta_arquivos_gui import JuntaArquivosGUI
-from app.views.honorarios_gui import HonorariosGUI
-from app.views.acordo_prestadores_gui import AcordoPrestadoresGUI
-from app.views.acordo_prof_aposentados_gui import AcordoProfAposentadosGUI
-from app.views.implantacoes_gui import ImplantacoesGUI # <-- **IMPORTAÇÃO CORRETA**
+
+from app.task_runner import TaskRunner
+from app.process_worker import PoolProcessos
 from app.widgets.styled_widgets import StyledButton
+from app.widgets.task_list import TaskListWidget
+
+ARQUIVO_TEMPOS_INICIALIZACAO = os.path.abspath(os.path.join(os.path.dirname(__file__), '../data/logs/inicializacao.csv'))
+
+
+def _fabrica_view(modulo: str, classe: str):
+    """
+    Retorna uma função que importa o módulo da tela e cria a sua instância apenas quando chamada,
+    evitando carregar processadores (e seus arquivos de dados) antes de a tela ser aberta.
+    O nome do módulo fica em `criar.modulo`, para o pré-aquecimento.
+    """
+    def criar():
+        return getattr(importlib.import_module(modulo), classe)()
+    criar.modulo = modulo
+    return criar
+
+
+def _pre_carregar_modulo(modulo: str):
+    """
+    Importa o módulo da tela (e, com ele, pandas e os processadores) e executa a sua função
+    pre_carregar(), se houver, que carrega os dados de apoio da tela. Roda fora da thread da interface.
+    """
+    pre_carregar = getattr(importlib.import_module(modulo), 'pre_carregar', None)
+    if pre_carregar is not None:
+        pre_carregar()
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, inicio_aplicacao: float = None, pre_aquecer_views: bool = False):
+        """
+        Args:
+            inicio_aplicacao (float, optional): time.perf_counter() do início do processo, usado
+                                                para medir o tempo até a primeira pintura da janela.
+            pre_aquecer_views (bool): Se True, depois que a janela aparece, os módulos e os dados das
+                                      telas restantes são carregados em segundo plano. Os widgets de
+                                      cada tela continuam sendo montados apenas na primeira navegação.
+        """
         super().__init__()
+        self.inicio_aplicacao = inicio_aplicacao if inicio_aplicacao is not None else time.perf_counter()
+        self.pre_aquecer_views = pre_aquecer_views
+        self.tempo_primeira_pintura_ms = None
+
         self.setWindowTitle("Sistema de Automação de Atividades")
         self.resize(1200, 800)
 
@@ -29,45 +61,97 @@ class MainWindow(QMainWindow):
         menu_frame = QFrame()
         menu_layout = QVBoxLayout(menu_frame)
         menu_frame.setFixedWidth(200)
-        
+
         self.pages_widget = QStackedWidget()
 
         main_layout.addWidget(menu_frame)
         main_layout.addWidget(self.pages_widget)
 
-        # Mapeamento de botões para as classes de tela
+        # Mapeamento de botões para as fábricas das telas; cada tela só é criada na primeira navegação
         self.view_map = {
-            "Home": HomeGUI,
-            "Implantações": ImplantacoesGUI, # <-- **NOVA TELA ADICIONADA**
-            "ACO Militar": AcoMilitarGUI,
-            "ACO (GPC-PENAL)": AcoDemaisCatGUI,
-            "Monitor de Arquivos": FileMonitorGUI,
-            "Análise Folha": AnaliseView,
-            "Cálculo ACO": CalcAcoGUI,
-            "Juntar Arquivos": JuntaArquivosGUI,
-            "Honorários": HonorariosGUI,
-            "Acordo Prestadores": AcordoPrestadoresGUI,
-            "Acordo Prof Aposentados": AcordoProfAposentadosGUI,
+            "Home": _fabrica_view("app.views.home_gui", "HomeGUI"),
+            "Implantações": _fabrica_view("app.views.implantacoes_gui", "ImplantacoesGUI"),
+            "ACO Militar": _fabrica_view("app.views.aco_militar_gui", "AcoMilitarGUI"),
+            "ACO (GPC-PENAL)": _fabrica_view("app.views.aco_demais_cat_gui", "AcoDemaisCatGUI"),
+            "Monitor de Arquivos": _fabrica_view("app.views.file_monitor_gui", "FileMonitorGUI"),
+            "Análise Folha": _fabrica_view("app.views.analise_folha_gui", "AnaliseView"),
+            "Cálculo ACO": _fabrica_view("app.views.calc_aco_gui", "CalcAcoGUI"),
+            "Juntar Arquivos": _fabrica_view("app.views.junta_arquivos_gui", "JuntaArquivosGUI"),
+            "Honorários": _fabrica_view("app.views.honorarios_gui", "HonorariosGUI"),
+            "Acordo Prestadores": _fabrica_view("app.views.acordo_prestadores_gui", "AcordoPrestadoresGUI"),
+            "Acordo Prof Aposentados": _fabrica_view("app.views.acordo_prof_aposentados_gui", "AcordoProfAposentadosGUI"),
         }
+        self.views = {}  # Telas já criadas, por nome
 
-        # --- CORREÇÃO APLICADA AQUI ---
-        # Criar e adicionar os botões e as instâncias das telas
-        for text, view_class in self.view_map.items():
-            # Esta linha cria a INSTÂNCIA (o objeto) da classe da view
-            view_instance = view_class() 
-            
-            # Adiciona a INSTÂNCIA ao QStackedWidget
-            self.pages_widget.addWidget(view_instance)
-            
+        for text in self.view_map:
             button = StyledButton(text, variant="primary")
-            button.clicked.connect(lambda checked=False, widget=view_instance: self.pages_widget.setCurrentWidget(widget))
+            button.clicked.connect(lambda checked=False, nome=text: self.mostrar_view(nome))
             menu_layout.addWidget(button)
 
         menu_layout.addStretch()
-        
+
+        # Tarefas em segundo plano de todas as telas (executadas pelo TaskRunner compartilhado)
+        self.runner = TaskRunner.instancia()
+        self.lista_tarefas = TaskListWidget(self.runner)
+        menu_layout.addWidget(self.lista_tarefas)
+
         btn_quit = StyledButton("Sair", variant="danger")
         btn_quit.clicked.connect(self.close)
         menu_layout.addWidget(btn_quit)
 
-        if self.pages_widget.count() > 0:
-            self.pages_widget.setCurrentIndex(0)
\ No newline at end of file
+        # Apenas a tela inicial é criada junto com a janela
+        self.mostrar_view("Home")
+
+    def obter_view(self, nome: str) -> QWidget:
+        """Retorna a tela pelo nome, criando-a e adicionando-a às páginas na primeira vez."""
+        view = self.views.get(nome)
+        if view is None:
+            view = self.view_map[nome]()
+            self.views[nome] = view
+            self.pages_widget.addWidget(view)
+        return view
+
+    def mostrar_view(self, nome: str):
+        self.pages_widget.setCurrentWidget(self.obter_view(nome))
+
+    def _pre_carregar_views(self, nomes: list):
+        """Carrega, em segundo plano, os módulos e os dados das telas, sem montar os seus widgets."""
+        for nome in nomes:
+            # Uma falha aqui não deve impedir o uso do sistema; o módulo será importado de novo ao navegar
+            try:
+                _pre_carregar_modulo(self.view_map[nome].modulo)
+            except Exception as e:
+                print(f"⚠️ AVISO: Não foi possível pré-carregar a tela '{nome}': {e}")
+
+    def closeEvent(self, event):
+        # Pede às tarefas em andamento que parem e dá a elas um instante para encerrar
+        self.runner.cancelar_todas()
+        self.runner.aguardar(3000)
+        PoolProcessos.instancia().encerrar()
+        super().closeEvent(event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.tempo_primeira_pintura_ms is None:
+            self.tempo_primeira_pintura_ms = (time.perf_counter() - self.inicio_aplicacao) * 1000
+            self._registrar_tempo_inicializacao(self.tempo_primeira_pintura_ms)
+            if self.pre_aquecer_views:
+                pendentes = [nome for nome in self.view_map if nome not in self.views]
+                threading.Thread(target=self._pre_carregar_views, args=(pendentes,), name="pre_aquecimento_views",
+                                 daemon=True).start()
+                # O processo de trabalho (com pandas já importado) sobe em paralelo, fora da thread da interface
+                threading.Thread(target=PoolProcessos.instancia().aquecer, daemon=True).start()
+
+    @staticmethod
+    def _registrar_tempo_inicializacao(tempo_ms: float):
+        """Registra o tempo até a primeira pintura em data/logs/inicializacao.csv, para acompanhar regressões."""
+        print(f"⏱️ Janela principal exibida em {tempo_ms:.0f} ms.")
+        try:
+            os.makedirs(os.path.dirname(ARQUIVO_TEMPOS_INICIALIZACAO), exist_ok=True)
+            novo = not os.path.exists(ARQUIVO_TEMPOS_INICIALIZACAO)
+            with open(ARQUIVO_TEMPOS_INICIALIZACAO, 'a', encoding='utf-8') as arquivo:
+                if novo:
+                    arquivo.write("data_hora;tempo_primeira_pintura_ms\n")
+                arquivo.write(f"{datetime.datetime.now().isoformat(timespec='seconds')};{tempo_ms:.1f}\n")
+        except OSError as e:
+            print(f"⚠️ AVISO: Não foi possível registrar o tempo de inicialização: {e}")
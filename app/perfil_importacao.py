@@ -0,0 +1,100 @@
+# app/perfil_importacao.py
+"""
+Perfil do tempo de importação na abertura do sistema.
+
+Executa `python -X importtime` em um processo limpo importando o módulo da janela principal,
+agrega o tempo por módulo e confere o orçamento de inicialização:
+  - o tempo total de importação não pode passar de --orcamento-ms;
+  - nenhuma dependência pesada (MODULOS_PESADOS) pode ser carregada antes de a janela aparecer,
+    pois elas devem ser importadas apenas pelas telas e processadores que as utilizam.
+
+Uso:
+    python -m app.perfil_importacao [--orcamento-ms 500] [--top 15] [--modulo app.main_window]
+
+Sai com código 1 se o orçamento for estourado.
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+MODULOS_PESADOS = ['pandas', 'numpy', 'pyarrow', 'openpyxl', 'fpdf', 'num2words', 'watchdog', 'pyperclip']
+ORCAMENTO_PADRAO_MS = 500
+
+_LINHA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def medir_importacao(modulo: str = "app.main_window") -> list:
+    """
+    Importa o módulo em um interpretador novo com -X importtime.
+
+    Returns:
+        list: Tuplas (módulo, tempo próprio em ms, tempo acumulado em ms, nível de aninhamento),
+              na ordem em que o Python reporta.
+    """
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    ambiente = dict(os.environ, PYTHONPATH=raiz + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                              cwd=raiz, env=ambiente, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar '{modulo}':\n{processo.stderr[-2000:]}")
+
+    registros = []
+    for linha in processo.stderr.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if encontrado:
+            proprio, acumulado, recuo, nome = encontrado.groups()
+            registros.append((nome, int(proprio) / 1000, int(acumulado) / 1000, (len(recuo) - 1) // 2))
+    return registros
+
+
+def verificar_orcamento(registros: list, orcamento_ms: float) -> list:
+    """Retorna a lista de violações do orçamento (vazia se estiver tudo certo)."""
+    violacoes = []
+    total_ms = sum(acumulado for _, _, acumulado, nivel in registros if nivel == 0)
+    if total_ms > orcamento_ms:
+        violacoes.append(f"Tempo total de importação de {total_ms:.0f} ms excede o orçamento de {orcamento_ms:.0f} ms.")
+    carregados = {nome.split('.')[0] for nome, _, _, _ in registros}
+    for pesado in MODULOS_PESADOS:
+        if pesado in carregados:
+            violacoes.append(f"A dependência pesada '{pesado}' é importada na abertura do sistema.")
+    return violacoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Perfil e orçamento do tempo de importação na inicialização.")
+    parser.add_argument("--modulo", default="app.main_window")
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    parser.add_argument("--top", type=int, default=15, help="Quantidade de módulos exibidos no ranking.")
+    args = parser.parse_args(argv)
+
+    registros = medir_importacao(args.modulo)
+
+    # Agrupa pelo pacote de primeiro nível para mostrar de onde vem o custo
+    por_pacote = {}
+    for nome, proprio, _, _ in registros:
+        pacote = nome.split('.')[0]
+        por_pacote[pacote] = por_pacote.get(pacote, 0.0) + proprio
+
+    total_ms = sum(acumulado for _, _, acumulado, nivel in registros if nivel == 0)
+    print(f"Importação de '{args.modulo}': {total_ms:.0f} ms ({len(registros)} módulos)\n")
+    print("Por pacote (tempo próprio):")
+    for pacote, tempo in sorted(por_pacote.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {tempo:9.1f} ms  {pacote}")
+    print("\nMódulos mais lentos (tempo acumulado):")
+    for nome, _, acumulado, _ in sorted(registros, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {acumulado:9.1f} ms  {nome}")
+
+    violacoes = verificar_orcamento(registros, args.orcamento_ms)
+    if violacoes:
+        print("\n❌ Orçamento de inicialização estourado:")
+        for violacao in violacoes:
+            print(f"  - {violacao}")
+        return 1
+    print(f"\n✅ Dentro do orçamento de {args.orcamento_ms:.0f} ms, sem dependências pesadas na abertura.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+# app/process_worker.py
+"""
+Processos de trabalho para os processamentos pesados.
+
+Os processadores (pandas, laços com iterrows, leitura de Excel) seguram o GIL por longos
+períodos; executados em uma thread do próprio programa, eles travam a interface, e uma falha
+grave neles derruba o sistema inteiro. Aqui eles rodam em processos separados, criados
+antecipadamente e com pandas/openpyxl já importados, para que o trabalho comece sem a espera
+das importações.
+
+A thread do TaskRunner que dispara o trabalho apenas aguarda no pipe (sem segurar o GIL),
+repassando para a interface as mensagens de log e o progresso enviados pelo processo.
+DataFrames do resultado voltam como Arrow IPC em memória compartilhada (ver app.transferencia_arrow);
+a interface confirma o recebimento de cada resultado para o processo liberar os segmentos.
+"""
+import os
+import time
+import atexit
+import tempfile
+import threading
+import importlib
+import traceback
+import multiprocessing
+
+from app.logic.progresso import ContextoProgresso, ProcessamentoCancelado, CONTEXTO_NULO
+from app.transferencia_arrow import (arrow_disponivel, publicar_tabela, abrir_tabela, descartar_tabela,
+                                     liberar_tabelas_publicadas)
+
+# Importados pelo processo assim que ele é criado, antes de receber o primeiro trabalho
+MODULOS_PRE_CARREGADOS = ['pandas', 'openpyxl']
+
+
+class ProcessoEncerrado(RuntimeError):
+    """O processo de trabalho terminou de forma inesperada durante um trabalho."""
+
+
+class ErroNoProcesso(RuntimeError):
+    """Erro lançado pelo processador dentro do processo de trabalho; `detalhes` traz o traceback original."""
+
+    def __init__(self, mensagem: str, detalhes: str = ""):
+        super().__init__(mensagem)
+        self.detalhes = detalhes
+
+
+def _resolver_alvo(alvo: str, instancias: dict, logger):
+    """
+    Converte "modulo:funcao" ou "modulo:Classe.metodo" no objeto chamável.
+    Instâncias de processadores são reaproveitadas entre trabalhos (dados de apoio já carregados);
+    o logger é trocado a cada trabalho.
+    """
+    nome_modulo, _, caminho = alvo.partition(':')
+    modulo = importlib.import_module(nome_modulo)
+    nome_classe, _, nome_metodo = caminho.rpartition('.')
+    if not nome_classe:
+        return getattr(modulo, nome_metodo)
+    chave = (nome_modulo, nome_classe)
+    if chave not in instancias:
+        instancias[chave] = getattr(modulo, nome_classe)(logger_callback=logger)
+    instancia = instancias[chave]
+    instancia.log = logger
+    return getattr(instancia, nome_metodo)
+
+
+class _TabelaCompartilhada:
+    """Ocupa, no resultado enviado pelo pipe, o lugar de um DataFrame publicado em memória compartilhada."""
+
+    def __init__(self, descritor: dict):
+        self.descritor = descritor
+
+
+class _ArquivoTemporario:
+    """Ocupa o lugar de um DataFrame gravado em arquivo temporário (quando o pyarrow não está instalado)."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+
+
+def _empacotar_resultado(valor, usar_arrow: bool):
+    """
+    Substitui os DataFrames do resultado (o próprio resultado ou valores de dicts e tuplas) por
+    referências, para que os dados não passem pelo pipe com pickle.
+    """
+    if isinstance(valor, dict):
+        return {chave: _empacotar_resultado(item, usar_arrow) for chave, item in valor.items()}
+    if isinstance(valor, tuple):
+        return tuple(_empacotar_resultado(item, usar_arrow) for item in valor)
+    if type(valor).__name__ == 'DataFrame':
+        if usar_arrow:
+            return _TabelaCompartilhada(publicar_tabela(valor))
+        descritor, caminho = tempfile.mkstemp(prefix="resultado_", suffix=".pkl")
+        os.close(descritor)
+        valor.to_pickle(caminho)
+        return _ArquivoTemporario(caminho)
+    return valor
+
+
+def _desempacotar_resultado(valor, como_arrow: bool):
+    """Operação inversa de _empacotar_resultado; com `como_arrow`, as tabelas são entregues sem conversão."""
+    if isinstance(valor, dict):
+        return {chave: _desempacotar_resultado(item, como_arrow) for chave, item in valor.items()}
+    if isinstance(valor, tuple):
+        return tuple(_desempacotar_resultado(item, como_arrow) for item in valor)
+    if isinstance(valor, _TabelaCompartilhada):
+        tabela = abrir_tabela(valor.descritor)
+        return tabela if como_arrow else tabela.to_pandas()
+    if isinstance(valor, _ArquivoTemporario):
+        import pandas as pd
+        try:
+            return pd.read_pickle(valor.caminho)
+        finally:
+            os.remove(valor.caminho)
+    return valor
+
+
+def _descartar_resultado(valor):
+    """Libera segmentos e arquivos de um resultado que não pôde ser desempacotado."""
+    if isinstance(valor, dict):
+        valor = tuple(valor.values())
+    if isinstance(valor, tuple):
+        for item in valor:
+            _descartar_resultado(item)
+    elif isinstance(valor, _TabelaCompartilhada):
+        descartar_tabela(valor.descritor)
+    elif isinstance(valor, _ArquivoTemporario) and os.path.exists(valor.caminho):
+        os.remove(valor.caminho)
+
+
+class _ContextoProcesso(ContextoProgresso):
+    """Contexto usado dentro do processo: envia progresso e log pelo pipe e lê o cancelamento do evento compartilhado."""
+
+    INTERVALO_PROGRESSO = 0.05
+
+    def __init__(self, conexao, evento_cancelar):
+        self._conexao = conexao
+        self._evento_cancelar = evento_cancelar
+        self._ultimo_aviso = 0.0
+        self._etapa = None
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento_cancelar.is_set()
+
+    def progresso(self, atual: int, total: int = 0, etapa: str = None):
+        agora = time.monotonic()
+        etapa_mudou = etapa is not None and etapa != self._etapa
+        if etapa is not None:
+            self._etapa = etapa
+        if etapa_mudou or (total and atual >= total) or agora - self._ultimo_aviso >= self.INTERVALO_PROGRESSO:
+            self._ultimo_aviso = agora
+            self._conexao.send(('progresso', int(atual), int(total), self._etapa))
+
+    def log(self, mensagem):
+        self._conexao.send(('log', str(mensagem)))
+
+
+def _principal_trabalhador(conexao, evento_cancelar):
+    """Laço do processo de trabalho: recebe (alvo, args, kwargs), executa e devolve o resultado."""
+    for nome_modulo in MODULOS_PRE_CARREGADOS:
+        try:
+            importlib.import_module(nome_modulo)
+        except ImportError:
+            pass
+    conexao.send(('pronto',))
+
+    usar_arrow = arrow_disponivel()
+    instancias = {}
+    while True:
+        try:
+            mensagem = conexao.recv()
+        except (EOFError, OSError):
+            break
+        if mensagem is None:
+            break
+        alvo, args, kwargs = mensagem
+        contexto = _ContextoProcesso(conexao, evento_cancelar)
+        resultado_enviado = False
+        try:
+            funcao = _resolver_alvo(alvo, instancias, contexto.log)
+            resultado = funcao(*args, contexto=contexto, **kwargs)
+            conexao.send(('resultado', _empacotar_resultado(resultado, usar_arrow)))
+            resultado_enviado = True
+        except ProcessamentoCancelado:
+            conexao.send(('cancelado',))
+        except Exception as e:
+            liberar_tabelas_publicadas(descartar=True)
+            conexao.send(('erro', f"{type(e).__name__}: {e}", traceback.format_exc()))
+        if resultado_enviado:
+            # Os segmentos ficam abertos até a interface abri-los (ver ProcessoTrabalhador._confirmar_recebimento)
+            try:
+                conexao.recv()
+            except (EOFError, OSError):
+                break
+            finally:
+                liberar_tabelas_publicadas()
+
+
+class ProcessoTrabalhador:
+    """Um processo de trabalho e o pipe usado para conversar com ele."""
+
+    # Segundos que um trabalho cancelado tem para parar sozinho antes de o processo ser encerrado à força
+    TEMPO_LIMITE_CANCELAMENTO = 5.0
+
+    def __init__(self, contexto_mp):
+        self._conexao, conexao_filho = contexto_mp.Pipe()
+        self._evento_cancelar = contexto_mp.Event()
+        self.processo = contexto_mp.Process(target=_principal_trabalhador, args=(conexao_filho, self._evento_cancelar),
+                                            name="trabalhador_atividades_folha")
+        self.processo.start()
+        conexao_filho.close()
+
+    @property
+    def vivo(self) -> bool:
+        return self.processo.is_alive()
+
+    def executar(self, alvo: str, args: tuple, kwargs: dict, contexto: ContextoProgresso = None, logger=None,
+                 resultado_arrow: bool = False):
+        """
+        Envia o trabalho e aguarda o resultado, repassando log e progresso.
+        Com `resultado_arrow`, DataFrames do resultado são entregues como tabelas Arrow lidas
+        diretamente da memória compartilhada (sem cópia); sem ele, são convertidos em DataFrame.
+        Se `contexto` for cancelado, o pedido é repassado ao processo; se ele não parar dentro de
+        TEMPO_LIMITE_CANCELAMENTO, o processo é encerrado.
+        """
+        contexto = contexto or CONTEXTO_NULO
+        self._evento_cancelar.clear()
+        try:
+            self._conexao.send((alvo, args, kwargs))
+        except OSError:
+            self.encerrar(forcar=True)
+            raise ProcessoEncerrado("O processo de trabalho não está mais disponível.")
+        momento_cancelamento = None
+
+        while True:
+            if contexto.cancelado and momento_cancelamento is None:
+                self._evento_cancelar.set()
+                momento_cancelamento = time.monotonic()
+            if momento_cancelamento is not None and time.monotonic() - momento_cancelamento > self.TEMPO_LIMITE_CANCELAMENTO:
+                self.encerrar(forcar=True)
+                raise ProcessamentoCancelado()
+
+            if not self._conexao.poll(0.1):
+                if not self.vivo:
+                    self.encerrar(forcar=True)
+                    raise ProcessoEncerrado(f"O processo de trabalho terminou inesperadamente (código {self.processo.exitcode}).")
+                continue
+            try:
+                mensagem = self._conexao.recv()
+            except (EOFError, OSError):
+                self.encerrar(forcar=True)
+                raise ProcessoEncerrado("A comunicação com o processo de trabalho foi interrompida.")
+
+            tipo = mensagem[0]
+            if tipo == 'log':
+                if logger:
+                    logger(mensagem[1])
+            elif tipo == 'progresso':
+                contexto.progresso(*mensagem[1:])
+            elif tipo == 'resultado':
+                try:
+                    return _desempacotar_resultado(mensagem[1], resultado_arrow)
+                except BaseException:
+                    _descartar_resultado(mensagem[1])
+                    raise
+                finally:
+                    self._confirmar_recebimento()
+            elif tipo == 'cancelado':
+                raise ProcessamentoCancelado()
+            elif tipo == 'erro':
+                raise ErroNoProcesso(mensagem[1], mensagem[2])
+
+    def _confirmar_recebimento(self):
+        """Avisa o processo de que o resultado foi aberto (ou descartado) e os segmentos podem ser fechados nele."""
+        try:
+            self._conexao.send(('recebido',))
+        except OSError:
+            pass
+
+    def encerrar(self, forcar: bool = False, timeout: float = 2.0):
+        if self.vivo and not forcar:
+            try:
+                self._conexao.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+            self.processo.join(timeout)
+        if self.vivo:
+            self.processo.terminate()
+            self.processo.join(timeout)
+        self._conexao.close()
+
+
+class PoolProcessos:
+    """
+    Conjunto de processos de trabalho reaproveitáveis, compartilhado pela aplicação.
+
+    Cada trabalho usa um processo ocioso (ou cria um novo) e o devolve ao terminar; sempre que
+    o último processo ocioso é usado, outro é criado em seguida, para o próximo trabalho também
+    encontrar um processo pronto. A quantidade de trabalhos simultâneos já é limitada pelo TaskRunner.
+    """
+
+    _instancia = None
+
+    def __init__(self, manter_aquecido: bool = True):
+        self.manter_aquecido = manter_aquecido
+        self._mp = multiprocessing.get_context('spawn')
+        self._ociosos = []
+        self._todos = []
+        self._trava = threading.Lock()
+        self._indisponivel = False
+        # Os processos não são daemon (precisam criar os seus próprios processos, ex: leitura paralela
+        # de planilhas); então são encerrados aqui ao sair, antes de o multiprocessing aguardá-los.
+        # Se o programa for interrompido sem isso, eles terminam sozinhos ao perder o pipe.
+        atexit.register(self.encerrar)
+
+    @classmethod
+    def instancia(cls) -> "PoolProcessos":
+        if cls._instancia is None:
+            cls._instancia = PoolProcessos()
+        return cls._instancia
+
+    def _criar(self) -> ProcessoTrabalhador:
+        trabalhador = ProcessoTrabalhador(self._mp)
+        with self._trava:
+            self._todos.append(trabalhador)
+        return trabalhador
+
+    def aquecer(self, quantidade: int = 1):
+        """Garante `quantidade` processos ociosos (chamado após a janela principal aparecer)."""
+        try:
+            while True:
+                with self._trava:
+                    self._ociosos = [t for t in self._ociosos if t.vivo]
+                    if len(self._ociosos) >= quantidade:
+                        return
+                trabalhador = self._criar()
+                with self._trava:
+                    self._ociosos.append(trabalhador)
+        except Exception as e:
+            self._indisponivel = True
+            print(f"⚠️ AVISO: Não foi possível criar o processo de trabalho ({e}). Os processamentos rodarão no próprio programa.")
+
+    def _obter(self) -> ProcessoTrabalhador:
+        with self._trava:
+            while self._ociosos:
+                trabalhador = self._ociosos.pop()
+                if trabalhador.vivo:
+                    break
+            else:
+                trabalhador = None
+            repor = self.manter_aquecido and not self._ociosos
+        if trabalhador is None:
+            trabalhador = self._criar()
+        if repor:
+            threading.Thread(target=self.aquecer, daemon=True).start()
+        return trabalhador
+
+    def executar(self, contexto: ContextoProgresso, alvo: str, *args, logger=None, resultado_arrow: bool = False,
+                 **kwargs):
+        """
+        Executa `alvo` em um processo de trabalho e retorna o seu resultado.
+
+        Args:
+            contexto (ContextoProgresso): Recebe o progresso e é consultado para o cancelamento.
+            alvo (str): "modulo:funcao" ou "modulo:Classe.metodo" (a classe é criada com
+                        logger_callback e reaproveitada). O alvo recebe `contexto=` além dos argumentos.
+            logger (callable, optional): Recebe as mensagens de log do processador.
+            resultado_arrow (bool): Entrega os DataFrames do resultado como tabelas Arrow sem cópia
+                                    (aceitas pelo DataFrameTableModel).
+        """
+        if self._indisponivel:
+            return self._executar_localmente(contexto, alvo, args, kwargs, logger)
+        try:
+            trabalhador = self._obter()
+        except Exception as e:
+            self._indisponivel = True
+            print(f"⚠️ AVISO: Não foi possível criar o processo de trabalho ({e}). Os processamentos rodarão no próprio programa.")
+            return self._executar_localmente(contexto, alvo, args, kwargs, logger)
+
+        try:
+            return trabalhador.executar(alvo, args, kwargs, contexto=contexto, logger=logger,
+                                        resultado_arrow=resultado_arrow)
+        finally:
+            with self._trava:
+                if trabalhador.vivo:
+                    self._ociosos.append(trabalhador)
+                elif trabalhador in self._todos:
+                    self._todos.remove(trabalhador)
+
+    @staticmethod
+    def _executar_localmente(contexto, alvo, args, kwargs, logger):
+        funcao = _resolver_alvo(alvo, {}, logger or print)
+        return funcao(*args, contexto=contexto, **kwargs)
+
+    def encerrar(self):
+        """Encerra todos os processos (chamado ao fechar a aplicação)."""
+        with self._trava:
+            trabalhadores, self._todos, self._ociosos = self._todos, [], []
+        for trabalhador in trabalhadores:
+            trabalhador.encerrar()
@@ -0,0 +1,243 @@
+# app/task_runner.py
+import os
+import time
+import itertools
+import threading
+import traceback
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from app.logic.progresso import ContextoProgresso, ProcessamentoCancelado
+
+# Estados de uma tarefa
+PENDENTE, EXECUTANDO, CONCLUIDA, FALHOU, CANCELADA = "Na fila", "Executando", "Concluída", "Falhou", "Cancelada"
+
+
+class TarefaCancelada(ProcessamentoCancelado):
+    """Lançada por ContextoTarefa.verificar_cancelamento() quando o usuário cancela a tarefa."""
+
+
+class ContextoTarefa(ContextoProgresso):
+    """
+    Objeto entregue à função da tarefa (sempre como primeiro argumento), usado para
+    informar progresso e etapa e para consultar se o cancelamento foi solicitado.
+    Implementa o protocolo dos processadores, então pode ser repassado a eles diretamente.
+    É seguro para uso a partir da thread de trabalho.
+    """
+
+    INTERVALO_PROGRESSO = 0.05  # Segundos mínimos entre dois avisos de progresso para a interface
+
+    def __init__(self, sinais):
+        self._sinais = sinais
+        self._evento_cancelar = threading.Event()
+        self._ultimo_aviso = 0.0
+        self._etapa = ""
+
+    @property
+    def cancelado(self) -> bool:
+        return self._evento_cancelar.is_set()
+
+    def cancelar(self):
+        self._evento_cancelar.set()
+
+    def verificar_cancelamento(self):
+        """Interrompe a tarefa (lançando TarefaCancelada) se o cancelamento foi solicitado."""
+        if self._evento_cancelar.is_set():
+            raise TarefaCancelada()
+
+    def progresso(self, atual: int, total: int = 0, etapa: str = None):
+        """
+        Informa o andamento da tarefa. Chamadas muito frequentes são agrupadas, mas uma nova
+        etapa ou a conclusão (atual == total) são sempre repassadas.
+        """
+        agora = time.monotonic()
+        etapa_mudou = etapa is not None and etapa != self._etapa
+        if etapa is not None:
+            self._etapa = etapa
+        if etapa_mudou or (total and atual >= total) or agora - self._ultimo_aviso >= self.INTERVALO_PROGRESSO:
+            self._ultimo_aviso = agora
+            self._sinais.progresso.emit(int(atual), int(total), self._etapa)
+
+
+class _SinaisExecucao(QObject):
+    """Sinais emitidos pela thread de trabalho e recebidos (em fila) pela Tarefa na thread da interface."""
+    iniciou = Signal()
+    progresso = Signal(int, int, str)
+    terminou = Signal(str, object)  # estado final, resultado ou mensagem de erro
+
+
+class _Execucao(QRunnable):
+    def __init__(self, tarefa, funcao, args, kwargs):
+        super().__init__()
+        self.tarefa = tarefa
+        self.funcao, self.args, self.kwargs = funcao, args, kwargs
+
+    def run(self):
+        sinais, contexto = self.tarefa._sinais, self.tarefa.contexto
+        if contexto.cancelado:
+            sinais.terminou.emit(CANCELADA, None)
+            return
+        sinais.iniciou.emit()
+        try:
+            resultado = self.funcao(contexto, *self.args, **self.kwargs)
+        except ProcessamentoCancelado:
+            sinais.terminou.emit(CANCELADA, None)
+        except Exception as e:
+            traceback.print_exc()
+            sinais.terminou.emit(FALHOU, f"{type(e).__name__}: {e}")
+        else:
+            sinais.terminou.emit(CONCLUIDA, resultado)
+
+
+class Tarefa(QObject):
+    """
+    Representa um trabalho enviado ao TaskRunner. Vive na thread da interface: todos os
+    sinais públicos abaixo são emitidos nela, então podem ser ligados diretamente a widgets.
+    """
+
+    progresso_alterado = Signal(int, int, str)  # atual, total, etapa
+    estado_alterado = Signal(str)
+    concluida = Signal(object)                  # resultado retornado pela função
+    falhou = Signal(str)                        # mensagem de erro
+    cancelada = Signal()
+
+    def __init__(self, identificador: int, nome: str, parent=None):
+        super().__init__(parent)
+        self.id = identificador
+        self.nome = nome
+        self.estado = PENDENTE
+        self.atual, self.total, self.etapa = 0, 0, ""
+        self.resultado = None
+        self.erro = None
+        self.inicio = None
+        self.fim = None
+
+        self._sinais = _SinaisExecucao()
+        self.contexto = ContextoTarefa(self._sinais)
+        self._sinais.iniciou.connect(self._ao_iniciar)
+        self._sinais.progresso.connect(self._ao_progredir)
+        self._sinais.terminou.connect(self._ao_terminar)
+
+    @property
+    def ativa(self) -> bool:
+        return self.estado in (PENDENTE, EXECUTANDO)
+
+    def cancelar(self):
+        """Solicita o cancelamento; a função da tarefa deve consultar o contexto para atendê-lo."""
+        if self.ativa:
+            self.contexto.cancelar()
+            self.etapa = "Cancelando..."
+            self.progresso_alterado.emit(self.atual, self.total, self.etapa)
+
+    def duracao(self) -> float:
+        if self.inicio is None:
+            return 0.0
+        return (self.fim or time.monotonic()) - self.inicio
+
+    def _mudar_estado(self, estado):
+        self.estado = estado
+        self.estado_alterado.emit(estado)
+
+    @Slot()
+    def _ao_iniciar(self):
+        self.inicio = time.monotonic()
+        self._mudar_estado(EXECUTANDO)
+
+    @Slot(int, int, str)
+    def _ao_progredir(self, atual, total, etapa):
+        if self.contexto.cancelado:
+            etapa = "Cancelando..."
+        self.atual, self.total, self.etapa = atual, total, etapa
+        self.progresso_alterado.emit(atual, total, etapa)
+
+    @Slot(str, object)
+    def _ao_terminar(self, estado, valor):
+        self.fim = time.monotonic()
+        if estado == CONCLUIDA:
+            self.resultado = valor
+        elif estado == FALHOU:
+            self.erro = valor
+        self._mudar_estado(estado)
+        if estado == CONCLUIDA:
+            self.concluida.emit(valor)
+        elif estado == FALHOU:
+            self.falhou.emit(valor)
+        else:
+            self.cancelada.emit()
+
+
+class TaskRunner(QObject):
+    """
+    Executor único de tarefas em segundo plano do sistema.
+
+    Usa um QThreadPool com limite de threads (as tarefas excedentes aguardam na fila),
+    entrega progresso, resultado e erros na thread da interface e mantém a lista das
+    tarefas para que a janela principal possa exibi-las.
+    """
+
+    tarefa_adicionada = Signal(object)
+    _instancia = None
+
+    def __init__(self, max_threads: int = None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or max(2, min(4, os.cpu_count() or 1)))
+        self.tarefas = []
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def instancia(cls) -> "TaskRunner":
+        """Retorna o executor compartilhado pela aplicação (criado no primeiro uso)."""
+        if cls._instancia is None:
+            cls._instancia = TaskRunner()
+        return cls._instancia
+
+    def executar(self, nome: str, funcao, *args, ao_concluir=None, ao_falhar=None, ao_cancelar=None,
+                 ao_progresso=None, **kwargs) -> Tarefa:
+        """
+        Agenda `funcao(contexto, *args, **kwargs)` no pool.
+
+        Args:
+            nome (str): Nome exibido na lista de tarefas.
+            funcao (callable): Função executada em segundo plano; recebe um ContextoTarefa como primeiro argumento.
+            ao_concluir (callable, optional): Chamado na thread da interface com o valor retornado.
+            ao_falhar (callable, optional): Chamado com a mensagem de erro se a função lançar uma exceção.
+            ao_cancelar (callable, optional): Chamado se a tarefa for cancelada.
+            ao_progresso (callable, optional): Chamado com (atual, total, etapa).
+
+        Returns:
+            Tarefa: Objeto para acompanhar ou cancelar o trabalho.
+        """
+        tarefa = Tarefa(next(self._ids), nome, parent=self)
+        if ao_concluir:
+            tarefa.concluida.connect(ao_concluir)
+        if ao_falhar:
+            tarefa.falhou.connect(ao_falhar)
+        if ao_cancelar:
+            tarefa.cancelada.connect(ao_cancelar)
+        if ao_progresso:
+            tarefa.progresso_alterado.connect(ao_progresso)
+        tarefa.estado_alterado.connect(lambda _estado, t=tarefa: self._remover_se_finalizada(t))
+
+        self.tarefas.append(tarefa)
+        self.tarefa_adicionada.emit(tarefa)
+        self.pool.start(_Execucao(tarefa, funcao, args, kwargs))
+        return tarefa
+
+    def tarefas_ativas(self) -> list:
+        return [t for t in self.tarefas if t.ativa]
+
+    def cancelar_todas(self):
+        for tarefa in self.tarefas_ativas():
+            tarefa.cancelar()
+
+    def aguardar(self, timeout_ms: int = -1) -> bool:
+        """Bloqueia até o pool esvaziar (usado ao fechar a aplicação)."""
+        return self.pool.waitForDone(timeout_ms)
+
+    def _remover_se_finalizada(self, tarefa):
+        # Mantém apenas as tarefas ativas e as últimas finalizadas, para a lista não crescer sem limite
+        finalizadas = [t for t in self.tarefas if not t.ativa]
+        if len(finalizadas) > 50:
+            for antiga in finalizadas[:-50]:
+                self.tarefas.remove(antiga)
+                antiga.deleteLater()
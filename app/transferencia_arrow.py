@@ -0,0 +1,139 @@
+# app/transferencia_arrow.py
+"""
+Transferência de tabelas entre os processos de trabalho e a interface em Arrow IPC,
+por memória compartilhada.
+
+O processo de trabalho grava a tabela uma única vez em um segmento de memória compartilhada;
+a interface abre o segmento e lê a tabela Arrow diretamente dele, sem cópia e sem unpickle.
+O DataFrameTableModel aceita a tabela Arrow como está, então um resultado pode ir do processo
+de trabalho para a tela sem nenhuma conversão. O segmento é liberado quando a tabela deixa de
+ser usada.
+
+O processo de trabalho mantém o segmento aberto até a interface confirmar que o abriu (ver
+liberar_tabelas_publicadas): no Windows, um segmento deixa de existir quando o último handle
+aberto para ele é fechado. Quem remove o segmento é a interface, então o processo de trabalho
+não o registra no resource_tracker (que, ao encerrar, avisaria de um segmento "vazado").
+
+pyarrow é importado apenas quando necessário (não pesa na abertura do sistema).
+"""
+import sys
+import ctypes
+from multiprocessing import shared_memory, resource_tracker
+
+# Segmentos publicados por este processo e ainda não liberados (nome -> SharedMemory)
+_publicados = {}
+
+
+def arrow_disponivel() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def para_tabela_arrow(df):
+    """
+    Converte um DataFrame em tabela Arrow, sem o índice. Colunas de texto com tipos misturados
+    (comuns em planilhas lidas sem dtype) são convertidas para texto em vez de falhar.
+    """
+    import pyarrow as pa
+    import pandas as pd
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        df = df.copy()
+        for coluna in df.columns:
+            if df[coluna].dtype == object:
+                try:
+                    pa.array(df[coluna], from_pandas=True)
+                except (pa.ArrowTypeError, pa.ArrowInvalid):
+                    df[coluna] = df[coluna].map(lambda v: None if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _gravar_stream(tabela, destino):
+    import pyarrow as pa
+    with pa.ipc.new_stream(destino, tabela.schema) as escritor:
+        escritor.write_table(tabela)
+
+
+def publicar_tabela(dados) -> dict:
+    """
+    Grava um DataFrame (ou tabela Arrow) em um novo segmento de memória compartilhada.
+
+    Returns:
+        dict: Descritor com 'nome', 'tamanho' e 'linhas', a ser enviado ao outro processo.
+    """
+    import pyarrow as pa
+
+    tabela = dados if isinstance(dados, pa.Table) else para_tabela_arrow(dados)
+    medidor = pa.MockOutputStream()
+    _gravar_stream(tabela, medidor)
+    tamanho = medidor.size()
+
+    segmento = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+    if sys.platform != "win32":
+        resource_tracker.unregister(segmento._name, "shared_memory")
+    try:
+        _gravar_stream(tabela, pa.FixedSizeBufferWriter(pa.py_buffer(segmento.buf)))
+    except BaseException:
+        _remover(segmento)
+        raise
+    _publicados[segmento.name] = segmento  # Aberto até liberar_tabelas_publicadas()
+    return {'nome': segmento.name, 'tamanho': tamanho, 'linhas': tabela.num_rows}
+
+
+def liberar_tabelas_publicadas(descartar: bool = False):
+    """
+    Fecha os segmentos publicados por este processo, depois de o outro processo abri-los (ele
+    passa a ser o responsável por removê-los).
+
+    Args:
+        descartar (bool): Remove também os segmentos (o resultado não chegou a ser enviado).
+    """
+    while _publicados:
+        _, segmento = _publicados.popitem()
+        if descartar:
+            _remover(segmento)
+        else:
+            segmento.close()
+
+
+def _remover(segmento):
+    segmento.close()
+    if sys.platform != "win32":
+        # unlink() retira o segmento do resource_tracker, onde publicar_tabela não o deixou
+        resource_tracker.register(segmento._name, "shared_memory")
+    segmento.unlink()
+
+
+def abrir_tabela(descritor: dict):
+    """
+    Abre a tabela publicada por publicar_tabela() sem copiar os dados.
+
+    O nome do segmento é liberado imediatamente; a memória continua mapeada enquanto a tabela
+    (ou qualquer coluna dela) estiver em uso e é devolvida ao sistema quando for descartada.
+    """
+    import pyarrow as pa
+
+    segmento = shared_memory.SharedMemory(name=descritor['nome'])
+    if sys.platform != "win32":
+        segmento.unlink()
+    ponteiro = ctypes.c_char.from_buffer(segmento.buf)
+    endereco = ctypes.addressof(ponteiro)
+    del ponteiro
+    # `base` mantém o segmento vivo enquanto o Arrow referenciar o buffer
+    buffer = pa.foreign_buffer(endereco, descritor['tamanho'], base=segmento)
+    return pa.ipc.open_stream(buffer).read_all()
+
+
+def descartar_tabela(descritor: dict):
+    """Libera um segmento publicado que não será aberto (ex: resultado abandonado)."""
+    try:
+        segmento = shared_memory.SharedMemory(name=descritor['nome'])
+    except FileNotFoundError:
+        return
+    segmento.close()
+    segmento.unlink()
@@ -1,23 +1,18 @@
 # app/views/aco_demais_cat_gui.py
 import os
-import datetime
-import threading
 import sys
 import subprocess
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QScrollArea, QLabel, QCheckBox, 
-                               QLineEdit, QFileDialog, QMessageBox, QTextEdit)
-from PySide6.QtCore import Slot, Signal, QObject, Qt
+                               QLineEdit, QFileDialog, QMessageBox)
+from PySide6.QtCore import Slot, Qt
 from PySide6.QtGui import QIntValidator
 
 # Importa a lógica e os nossos componentes padronizados
 from app.logic.aco_demais_cat_processor import AcoDemaisCatProcessor
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-# Classe para comunicação segura entre threads e a GUI
-class WorkerSignals(QObject):
-    log_message = Signal(str)
-    validation_finished = Signal(int)
-    processing_finished = Signal(dict)
+from app.widgets.log_console import LogConsole
 
 class AcoDemaisCatGUI(QWidget):
     """
@@ -32,10 +27,8 @@ class AcoDemaisCatGUI(QWidget):
             os.path.join(os.path.dirname(__file__), '../../data/demais_categorias_outputs'))
         os.makedirs(self.pasta_destino_saida, exist_ok=True)
         
-        self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
-        self.signals.validation_finished.connect(self._on_validation_finished)
-        self.signals.processing_finished.connect(self._pos_processamento_gui)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
 
         self.processor = AcoDemaisCatProcessor(logger_callback=self._log_mensagem_thread_safe)
         
@@ -83,8 +76,7 @@ class AcoDemaisCatGUI(QWidget):
         
         # --- Botão de Processamento e Log ---
         self.btn_processar = StyledButton("⚙️ Iniciar Processamento", variant="processing")
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole(nome_arquivo_log="aco_demais_cat")
 
         main_layout.addWidget(files_main_frame)
         main_layout.addWidget(output_frame)
@@ -114,12 +106,13 @@ class AcoDemaisCatGUI(QWidget):
         self.arquivos_selecionados.append(arquivo_info)
         
         index = len(self.arquivos_selecionados) - 1
-        threading.Thread(target=self._validar_arquivo_background, args=(index,), daemon=True).start()
+        self.runner.executar(f"Validar {nome_amigavel}", self._validar_arquivo_background, index,
+                             ao_concluir=self._on_validation_finished)
         
         self._atualizar_lista_arquivos_gui()
         self._log_mensagem_thread_safe(f"📁 Arquivo adicionado: {nome_amigavel}")
 
-    def _validar_arquivo_background(self, index):
+    def _validar_arquivo_background(self, contexto, index):
         try:
             arquivo_info = self.arquivos_selecionados[index]
             resultado = self.processor.validar_e_padronizar_arquivo(arquivo_info['caminho'])
@@ -127,14 +120,13 @@ class AcoDemaisCatGUI(QWidget):
                 arquivo_info['status_validacao'] = 'Válido ✅'
             else:
                 arquivo_info['status_validacao'] = 'Erro ❌'
-                self.signals.log_message.emit(f"❌ Erro de validação em '{arquivo_info['nome_amigavel']}': {resultado.get('mensagem')}")
+                self._log_mensagem_thread_safe(f"❌ Erro de validação em '{arquivo_info['nome_amigavel']}': {resultado.get('mensagem')}")
         except Exception as e:
             arquivo_info['status_validacao'] = 'Erro ❌'
-            self.signals.log_message.emit(f"🚨 Erro inesperado na validação de '{arquivo_info['nome_amigavel']}': {e}")
-        finally:
-            self.signals.validation_finished.emit(index)
+            self._log_mensagem_thread_safe(f"🚨 Erro inesperado na validação de '{arquivo_info['nome_amigavel']}': {e}")
+        return index
 
-    @Slot(int)
+    @Slot(object)
     def _on_validation_finished(self, index):
         self._atualizar_lista_arquivos_gui()
 
@@ -223,19 +215,29 @@ class AcoDemaisCatGUI(QWidget):
         self.btn_processar.setText("Processando...")
         self._limpar_log_gui()
         self._log_mensagem_thread_safe("Iniciando processamento...")
-        threading.Thread(target=self._executar_processamento, daemon=True).start()
+        arquivos_para_proc = [
+            {'caminho': arq['caminho'], 'limite_horas': arq['limite_horas'], 'nome_amigavel': arq['origem_manual']}
+            for arq in self.arquivos_selecionados]
+        self.runner.executar("ACO (GPC-PENAL)", self._executar_processamento, arquivos_para_proc,
+                             self.pasta_destino_saida, self.var_gerar_analise.isChecked(),
+                             ao_concluir=self._pos_processamento_gui, ao_cancelar=self._processamento_cancelado)
 
-    def _executar_processamento(self):
+    def _executar_processamento(self, contexto, arquivos_para_proc, pasta_destino, gerar_analise):
         try:
-            arquivos_para_proc = [
-                {'caminho': arq['caminho'], 'limite_horas': arq['limite_horas'], 'nome_amigavel': arq['origem_manual']}
-                for arq in self.arquivos_selecionados]
-            resultado = self.processor.processar_arquivos(arquivos_para_proc, self.pasta_destino_saida, self.var_gerar_analise.isChecked())
-            self.signals.processing_finished.emit(resultado)
+            # Roda em um processo de trabalho, para o pandas não disputar o GIL com a interface
+            return self.pool_processos.executar(
+                contexto, "app.logic.aco_demais_cat_processor:AcoDemaisCatProcessor.processar_arquivos",
+                arquivos_para_proc, pasta_destino, gerar_analise, logger=self._log_mensagem_thread_safe)
         except Exception as e:
-            self.signals.processing_finished.emit({"status": "erro", "mensagem": f"Ocorreu um erro inesperado: {e}"})
+            return {"status": "erro", "mensagem": f"Ocorreu um erro inesperado: {e}"}
 
-    @Slot(dict)
+    @Slot()
+    def _processamento_cancelado(self):
+        self._log_mensagem_thread_safe("⛔ Processamento cancelado pelo usuário.")
+        self.btn_processar.setEnabled(True)
+        self.btn_processar.setText("⚙️ Iniciar Processamento")
+
+    @Slot(object)
     def _pos_processamento_gui(self, resultado):
         if resultado["status"] == "sucesso":
             QMessageBox.information(self, "Sucesso", resultado["mensagem"])
@@ -253,12 +255,7 @@ class AcoDemaisCatGUI(QWidget):
         self.btn_processar.setText("⚙️ Iniciar Processamento")
 
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
+        self.caixa_log.registrar(mensagem)
 
     def _limpar_log_gui(self):
         self.caixa_log.clear()
\ No newline at end of file
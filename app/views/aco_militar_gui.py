@@ -1,24 +1,20 @@
 # app/views/aco_militar_gui.py
 import os
-import datetime
-import threading
 import sys
 import subprocess
 import pandas as pd
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QScrollArea, QLabel, QCheckBox, 
-                               QLineEdit, QComboBox, QFileDialog, QMessageBox, QTextEdit)
-from PySide6.QtCore import Slot, Signal, QObject, Qt
+                               QLineEdit, QComboBox, QFileDialog, QMessageBox)
+from PySide6.QtCore import Slot, Qt
 from PySide6.QtGui import QIntValidator
 
 # Importa a lógica e os nossos componentes padronizados
 from app.logic.aco_militar_processor import AcoMilitarProcessor
+from app.logic.leitor_excel import interpretar_abas
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-# Classe para comunicação segura entre threads e a GUI
-class WorkerSignals(QObject):
-    log_message = Signal(str)
-    validation_finished = Signal(int)
-    processing_finished = Signal(dict)
+from app.widgets.log_console import LogConsole
 
 class AcoMilitarGUI(QWidget):
     """
@@ -31,10 +27,8 @@ class AcoMilitarGUI(QWidget):
         self.pasta_destino_saida = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/acordo_militar_outputs'))
         os.makedirs(self.pasta_destino_saida, exist_ok=True)
         
-        self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
-        self.signals.validation_finished.connect(self._on_validation_finished)
-        self.signals.processing_finished.connect(self._pos_processamento_gui)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
 
         self.processor = AcoMilitarProcessor(logger_callback=self._log_mensagem_thread_safe)
         
@@ -78,8 +72,7 @@ class AcoMilitarGUI(QWidget):
         output_layout.addWidget(self.var_gerar_analise)
         
         self.btn_processar = StyledButton("⚙️ Iniciar Processamento", variant="processing")
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole(nome_arquivo_log="aco_militar")
 
         main_layout.addWidget(files_main_frame)
         main_layout.addWidget(output_frame)
@@ -109,33 +102,36 @@ class AcoMilitarGUI(QWidget):
             'limite_horas': self.processor.LIMITE_PADRAO_HORAS,
             'limite_gmr_horas': self.processor.LIMITE_PADRAO_GMR_HORAS, 
             'nome_amigavel': nome_amigavel,
-            'status_validacao': 'Pendente',
-            'dataframe': None
+            'status_validacao': 'Pendente'
         }
         self.arquivos_selecionados.append(arquivo_info)
         
         index = len(self.arquivos_selecionados) - 1
-        threading.Thread(target=self._validar_arquivo_background, args=(index,), daemon=True).start()
+        self.runner.executar(f"Validar {nome_amigavel}", self._validar_arquivo_background, index,
+                             ao_concluir=self._on_validation_finished)
         
         self._atualizar_lista_arquivos_gui()
         self._log_mensagem_thread_safe(f"📁 Arquivo adicionado: {nome_amigavel}")
         
-    def _validar_arquivo_background(self, index):
+    def _validar_arquivo_background(self, contexto, index):
         arquivo_info = self.arquivos_selecionados[index]
-        self.signals.log_message.emit(f"🔍 Validando arquivo: {arquivo_info['nome_amigavel']}...")
-        resultado = self.processor.validar_e_padronizar_arquivo(arquivo_info['caminho'])
+        self._log_mensagem_thread_safe(f"🔍 Validando arquivo: {arquivo_info['nome_amigavel']}...")
+        # A leitura roda em um processo de trabalho; só o status volta (o processamento relê o arquivo)
+        try:
+            resultado = self.pool_processos.executar(contexto, "app.logic.aco_militar_processor:AcoMilitarProcessor.validar_arquivo",
+                                                     arquivo_info['caminho'], logger=self._log_mensagem_thread_safe)
+        except Exception as e:
+            resultado = {'status': 'erro', 'mensagem': str(e)}
 
         if resultado['status'] == 'sucesso':
             arquivo_info['status_validacao'] = 'Válido ✅'
-            arquivo_info['dataframe'] = resultado['dataframe']
-            self.signals.log_message.emit(f"✅ Arquivo '{arquivo_info['nome_amigavel']}' validado com sucesso.")
+            self._log_mensagem_thread_safe(f"✅ Arquivo '{arquivo_info['nome_amigavel']}' validado com sucesso.")
         else:
             arquivo_info['status_validacao'] = 'Erro ❌'
-            self.signals.log_message.emit(f"❌ Erro na validação de '{arquivo_info['nome_amigavel']}': {resultado.get('mensagem', 'Erro desconhecido')}")
-        
-        self.signals.validation_finished.emit(index)
+            self._log_mensagem_thread_safe(f"❌ Erro na validação de '{arquivo_info['nome_amigavel']}': {resultado.get('mensagem', 'Erro desconhecido')}")
+        return index
 
-    @Slot(int)
+    @Slot(object)
     def _on_validation_finished(self, index):
         self._atualizar_lista_arquivos_gui()
 
@@ -192,6 +188,13 @@ class AcoMilitarGUI(QWidget):
             entry_gmr.setFixedWidth(60)
             entry_gmr.editingFinished.connect(lambda idx=i, w=entry_gmr: self._atualizar_entry(idx, 'limite_gmr_horas', w))
             bottom_layout.addWidget(entry_gmr)
+
+            # Abas lidas do arquivo de Magistério (vazio = primeira aba)
+            bottom_layout.addWidget(QLabel("Abas:"))
+            entry_abas = QLineEdit(info.get('abas_texto', ''))
+            entry_abas.setPlaceholderText("1ª aba (ex: *, #1,#3, Jan*)")
+            entry_abas.editingFinished.connect(lambda idx=i, w=entry_abas: self._atualizar_entry(idx, 'abas_texto', w))
+            bottom_layout.addWidget(entry_abas, 1)
             bottom_layout.addStretch()
             
             item_layout.addLayout(top_layout)
@@ -210,10 +213,13 @@ class AcoMilitarGUI(QWidget):
     @Slot()
     def _atualizar_entry(self, index, entry_type, widget):
         try:
-            old_value = self.arquivos_selecionados[index][entry_type]
+            old_value = self.arquivos_selecionados[index].get(entry_type, '')
             new_value_str = widget.text().strip()
             
-            if entry_type == 'limite_horas' or entry_type == 'limite_gmr_horas':
+            if entry_type == 'abas_texto':
+                new_value = new_value_str
+                self.arquivos_selecionados[index]['abas'] = interpretar_abas(new_value)
+            elif entry_type == 'limite_horas' or entry_type == 'limite_gmr_horas':
                 default = self.processor.LIMITE_PADRAO_HORAS if entry_type == 'limite_horas' else self.processor.LIMITE_PADRAO_GMR_HORAS
                 new_value = int(new_value_str) if new_value_str else default
                 if new_value < 0: raise ValueError("O limite não pode ser negativo.")
@@ -251,16 +257,26 @@ class AcoMilitarGUI(QWidget):
         self.btn_processar.setEnabled(False)
         self.btn_processar.setText("Processando...")
         self._limpar_log_gui()
-        threading.Thread(target=self._executar_processamento, daemon=True).start()
+        self.runner.executar("ACO Militar", self._executar_processamento, list(self.arquivos_selecionados),
+                             self.pasta_destino_saida, self.var_gerar_analise.isChecked(),
+                             ao_concluir=self._pos_processamento_gui, ao_cancelar=self._processamento_cancelado)
 
-    def _executar_processamento(self):
+    def _executar_processamento(self, contexto, arquivos, pasta_destino, gerar_analise):
         try:
-            resultado = self.processor.processar_arquivos_militares(self.arquivos_selecionados, self.pasta_destino_saida, self.var_gerar_analise.isChecked())
-            self.signals.processing_finished.emit(resultado)
+            # Roda em um processo de trabalho, para o pandas não disputar o GIL com a interface
+            return self.pool_processos.executar(
+                contexto, "app.logic.aco_militar_processor:AcoMilitarProcessor.processar_arquivos_militares",
+                arquivos, pasta_destino, gerar_analise, logger=self._log_mensagem_thread_safe)
         except Exception as e:
-            self.signals.processing_finished.emit({"status": "erro", "mensagem": f"Ocorreu um erro inesperado: {e}"})
+            return {"status": "erro", "mensagem": f"Ocorreu um erro inesperado: {e}"}
 
-    @Slot(dict)
+    @Slot()
+    def _processamento_cancelado(self):
+        self._log_mensagem_thread_safe("⛔ Processamento cancelado pelo usuário.")
+        self.btn_processar.setEnabled(True)
+        self.btn_processar.setText("⚙️ Iniciar Processamento")
+
+    @Slot(object)
     def _pos_processamento_gui(self, resultado):
         if resultado["status"] == "sucesso":
             QMessageBox.information(self, "Sucesso", resultado["mensagem"])
@@ -277,12 +293,7 @@ class AcoMilitarGUI(QWidget):
         self.btn_processar.setText("⚙️ Iniciar Processamento")
 
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
+        self.caixa_log.registrar(mensagem)
         
     def _limpar_log_gui(self):
         self.caixa_log.clear()
\ No newline at end of file
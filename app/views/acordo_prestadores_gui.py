@@ -1,21 +1,17 @@
 # app/views/acordo_prestadores_gui.py
 import os
-import datetime
-import threading
 import pandas as pd
 import sys
 import subprocess
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QTextEdit, 
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
                                QFileDialog, QMessageBox)
-from PySide6.QtCore import Slot, Signal, QObject
+from PySide6.QtCore import Slot
 
 from app.logic.acordo_prestadores_processor import AcordoPrestadoresProcessor
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-# Classe para comunicação segura entre a thread de processamento e a GUI
-class WorkerSignals(QObject):
-    log_message = Signal(str)
-    finished = Signal(dict)
+from app.widgets.log_console import LogConsole
 
 class AcordoPrestadoresGUI(QWidget):
     """
@@ -30,9 +26,8 @@ class AcordoPrestadoresGUI(QWidget):
             os.path.join(os.path.dirname(__file__), '../../data/acordos_prestadores'))
         os.makedirs(self.caminho_base_saida, exist_ok=True)
 
-        self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
-        self.signals.finished.connect(self._pos_processamento_gui)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
 
         self.processor = AcordoPrestadoresProcessor(logger_callback=self._log_mensagem_thread_safe)
         
@@ -69,8 +64,7 @@ class AcordoPrestadoresGUI(QWidget):
 
         # --- Botão de Processamento e Log ---
         self.btn_processar = StyledButton("⚙️ Iniciar Processamento", "processing")
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole()
 
         main_layout.addWidget(file_selection_frame)
         main_layout.addWidget(output_frame)
@@ -144,20 +138,23 @@ class AcordoPrestadoresGUI(QWidget):
         self.btn_processar.setText("Processando...")
         self._log_mensagem_thread_safe("Iniciando o processamento... Isso pode levar um momento.")
         
-        threading.Thread(target=self._executar_processamento, daemon=True).start()
+        self.runner.executar("Acordo Prestadores", self._executar_processamento, dict(self.caminhos_arquivos),
+                             ao_concluir=self._pos_processamento_gui,
+                             ao_cancelar=lambda: self._pos_processamento_gui({"status": "erro", "mensagem": "Processamento cancelado pelo usuário."}))
 
-    def _executar_processamento(self):
+    def _executar_processamento(self, contexto, caminhos_arquivos):
         try:
-            resultado_msg = self.processor.processar_acordo_prestadores(
-                self.caminhos_arquivos['cadastro'], self.caminhos_arquivos['advogados'],
-                self.caminhos_arquivos['116'], self.caminhos_arquivos['898_csv'],
-                self.caminho_base_saida
+            resultado_msg = self.pool_processos.executar(
+                contexto, "app.logic.acordo_prestadores_processor:AcordoPrestadoresProcessor.processar_acordo_prestadores",
+                caminhos_arquivos['cadastro'], caminhos_arquivos['advogados'],
+                caminhos_arquivos['116'], caminhos_arquivos['898_csv'],
+                self.caminho_base_saida, logger=self._log_mensagem_thread_safe
             )
-            self.signals.finished.emit({"status": "sucesso", "mensagem": resultado_msg})
+            return {"status": "sucesso", "mensagem": resultado_msg}
         except Exception as e:
-            self.signals.finished.emit({"status": "erro", "mensagem": f"Ocorreu um erro durante o processamento:\n{e}"})
+            return {"status": "erro", "mensagem": f"Ocorreu um erro durante o processamento:\n{e}"}
 
-    @Slot(dict)
+    @Slot(object)
     def _pos_processamento_gui(self, resultado):
         if resultado["status"] == "sucesso":
             QMessageBox.information(self, "Sucesso", resultado["mensagem"])
@@ -170,9 +167,4 @@ class AcordoPrestadoresGUI(QWidget):
         self.btn_processar.setText("⚙️ Iniciar Processamento")
 
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
\ No newline at end of file
+        self.caixa_log.registrar(mensagem)
\ No newline at end of file
@@ -1,19 +1,14 @@
 # app/views/acordo_prof_aposentados_gui.py
 import os
-import datetime
-import threading
-import pandas as pd
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QTextEdit, 
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
                                QFileDialog, QMessageBox)
-from PySide6.QtCore import Slot, Signal, QObject
+from PySide6.QtCore import Slot
 
 from app.logic.acordo_prof_aposentados_processor import AcordoProfAposentadosProcessor
+from app.logic.leitor_excel import ler_excel
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-# Classe para comunicação segura entre a thread de processamento e a GUI
-class WorkerSignals(QObject):
-    log_message = Signal(str)
-    finished = Signal(dict)
+from app.widgets.log_console import LogConsole
 
 class AcordoProfAposentadosGUI(QWidget):
     """
@@ -25,9 +20,7 @@ class AcordoProfAposentadosGUI(QWidget):
         self.novos_input_path = ""
         self.bloqueados_input_path = ""
         
-        self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
-        self.signals.finished.connect(self._pos_processamento_gui)
+        self.runner = TaskRunner.instancia()
 
         self.processor = AcordoProfAposentadosProcessor()
         self._criar_interface()
@@ -48,8 +41,7 @@ class AcordoProfAposentadosGUI(QWidget):
         
         # --- Botão de Processamento e Log ---
         self.btn_processar = StyledButton("⚙️ Iniciar Processamento", "processing")
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole()
 
         main_layout.addWidget(file_selection_frame)
         main_layout.addWidget(self.btn_processar)
@@ -120,30 +112,36 @@ class AcordoProfAposentadosGUI(QWidget):
         self.btn_processar.setText("Processando...")
         self._log_mensagem_thread_safe("Iniciando o processamento...")
         
-        threading.Thread(target=self._executar_processamento, daemon=True).start()
+        self.runner.executar("Acordo Prof Aposentados", self._executar_processamento,
+                             self.novos_input_path, self.bloqueados_input_path,
+                             ao_concluir=self._pos_processamento_gui,
+                             ao_cancelar=lambda: self._pos_processamento_gui({"status": "erro", "mensagem": "Processamento cancelado pelo usuário."}))
 
-    def _executar_processamento(self):
+    def _executar_processamento(self, contexto, novos_input_path, bloqueados_input_path):
         resultados = {'novos': {}, 'bloqueados': {}}
         try:
-            if self.novos_input_path:
-                self.signals.log_message.emit("="*50 + "\nProcessando arquivo de NOVOS ACORDOS...")
-                df_input_novos = pd.read_excel(self.novos_input_path)
+            if novos_input_path:
+                contexto.etapa("Novos acordos")
+                self._log_mensagem_thread_safe("="*50 + "\nProcessando arquivo de NOVOS ACORDOS...")
+                df_input_novos = ler_excel(novos_input_path)
                 df_apos, df_pensao, df_calculos = self.processor.tratar_novos(df_input_novos)
                 resultados['novos'] = {'apos': df_apos, 'pensao': df_pensao, 'calculos': df_calculos}
-                self.signals.log_message.emit("Dados de Novos Acordos processados.")
+                self._log_mensagem_thread_safe("Dados de Novos Acordos processados.")
 
-            if self.bloqueados_input_path:
-                self.signals.log_message.emit("="*50 + "\nProcessando arquivo de BLOQUEADOS...")
-                df_input_bloqueados = pd.read_excel(self.bloqueados_input_path)
+            contexto.verificar_cancelamento()
+            if bloqueados_input_path:
+                contexto.etapa("Bloqueados")
+                self._log_mensagem_thread_safe("="*50 + "\nProcessando arquivo de BLOQUEADOS...")
+                df_input_bloqueados = ler_excel(bloqueados_input_path)
                 df_apos, df_pensao, df_calculos = self.processor.tratar_bloqueados(df_input_bloqueados)
                 resultados['bloqueados'] = {'apos': df_apos, 'pensao': df_pensao, 'calculos': df_calculos}
-                self.signals.log_message.emit("Dados de Bloqueados processados.")
+                self._log_mensagem_thread_safe("Dados de Bloqueados processados.")
             
-            self.signals.finished.emit({"status": "sucesso", "data": resultados})
+            return {"status": "sucesso", "data": resultados}
         except Exception as e:
-            self.signals.finished.emit({"status": "erro", "mensagem": str(e)})
+            return {"status": "erro", "mensagem": str(e)}
 
-    @Slot(dict)
+    @Slot(object)
     def _pos_processamento_gui(self, resultado):
         if resultado["status"] == "erro":
             QMessageBox.critical(self, "Erro no Processamento", f"Ocorreu um erro:\n{resultado['mensagem']}")
@@ -189,9 +187,4 @@ class AcordoProfAposentadosGUI(QWidget):
             self._log_mensagem_thread_safe(f"Arquivo com cálculos completos ({prefixo}) salvo em: {path_calculos}")
 
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
\ No newline at end of file
+        self.caixa_log.registrar(mensagem)
\ No newline at end of file
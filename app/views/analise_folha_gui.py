@@ -1,17 +1,16 @@
 # app/views/analise_folha_gui.py
 import os
-import threading
 import pandas as pd
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QFileDialog, 
-                               QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget)
-from PySide6.QtCore import Slot, Signal, QObject
+                               QMessageBox, QTabWidget)
+from PySide6.QtCore import Slot
 
-from app.logic.analise_folha_processor import analisar_arquivos
 from app.logic.data_manager import DataManager
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-class WorkerSignals(QObject):
-    finished = Signal(object)
+from app.widgets.dataframe_table import DataFrameTableModel, DataFrameTableView
+from app.widgets.table_filter import FilterBar
 
 class AnaliseView(QWidget):
     def __init__(self, master=None):
@@ -19,9 +18,11 @@ class AnaliseView(QWidget):
         
         self.caminho_inf_completo = ""
         self.caminho_folha_completo = ""
+        self.resultados = {"Sucesso": pd.DataFrame(), "Falhou": pd.DataFrame()}
+        self.abas_resultado = {}
         
-        self.signals = WorkerSignals()
-        self.signals.finished.connect(self._atualizar_ui_com_resultados)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
         
         self._criar_interface()
 
@@ -50,10 +51,8 @@ class AnaliseView(QWidget):
         self.btn_analisar = StyledButton("Analisar Arquivos", "processing")
         
         self.tab_widget = QTabWidget()
-        self.tab_sucesso = QWidget()
-        self.tab_falhou = QWidget()
-        self.tab_widget.addTab(self.tab_sucesso, "Sucesso")
-        self.tab_widget.addTab(self.tab_falhou, "Falhou")
+        for tipo in ("Sucesso", "Falhou"):
+            self.tab_widget.addTab(self._criar_aba_de_resultado(tipo), tipo)
 
         self.lbl_status = QLabel("Pronto para começar.")
 
@@ -91,20 +90,24 @@ class AnaliseView(QWidget):
         self.btn_analisar.setText("Analisando...")
         self.lbl_status.setText("Analisando, por favor aguarde...")
         
-        threading.Thread(target=self._executar_analise, daemon=True).start()
+        self.runner.executar("Análise da Folha", self._executar_analise,
+                             self.caminho_inf_completo, self.caminho_folha_completo,
+                             ao_concluir=self._atualizar_ui_com_resultados,
+                             ao_falhar=self._atualizar_ui_com_resultados,
+                             ao_cancelar=lambda: self._atualizar_ui_com_resultados("Análise cancelada pelo usuário."))
 
-    def _executar_analise(self):
-        resultado = analisar_arquivos(self.caminho_inf_completo, self.caminho_folha_completo)
-        self.signals.finished.emit(resultado)
+    def _executar_analise(self, contexto, caminho_inf, caminho_folha):
+        # As tabelas de resultado chegam como Arrow em memória compartilhada e vão direto para o modelo
+        return self.pool_processos.executar(contexto, "app.logic.analise_folha_processor:analisar_arquivos_por_teste",
+                                            caminho_inf, caminho_folha, resultado_arrow=True)
 
     @Slot(object)
     def _atualizar_ui_com_resultados(self, resultado):
-        if isinstance(resultado, pd.DataFrame):
-            df_sucesso = resultado[resultado['TESTE'] == 'SUCESSO'].copy()
-            df_falhou = resultado[resultado['TESTE'] == 'FALHOU'].copy()
+        if isinstance(resultado, dict):
+            self.resultados.update(resultado)
 
-            self._criar_aba_de_resultado(self.tab_sucesso, df_sucesso, "Sucesso")
-            self._criar_aba_de_resultado(self.tab_falhou, df_falhou, "Falhou")
+            for tipo, df in self.resultados.items():
+                self._exibir_resultado(tipo, df)
             
             self.lbl_status.setText("<font color='green'>Análise concluída com sucesso!</font>")
         else: # É uma string de erro
@@ -113,38 +116,34 @@ class AnaliseView(QWidget):
         self.btn_analisar.setEnabled(True)
         self.btn_analisar.setText("Analisar Arquivos")
         
-    def _criar_aba_de_resultado(self, tab, df, tipo):
+    def _criar_aba_de_resultado(self, tipo):
+        """Cria a aba com contador, botão de download e a tabela virtualizada de resultados."""
+        tab = QWidget()
         layout = QVBoxLayout(tab)
-        # Limpa layout antigo
-        while layout.count():
-            item = layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        
+
         header_layout = QHBoxLayout()
-        header_layout.addWidget(QLabel(f"{len(df)} registros encontrados."))
+        lbl_contagem = QLabel("0 registros encontrados.")
+        header_layout.addWidget(lbl_contagem)
         header_layout.addStretch()
         btn_download = StyledButton("Baixar Relatório (.xlsx)", "primary")
-        if df.empty:
-            btn_download.setEnabled(False)
-        btn_download.clicked.connect(lambda: self._baixar_arquivo_excel(df, tipo))
+        btn_download.setEnabled(False)
+        btn_download.clicked.connect(lambda: self._baixar_arquivo_excel(self.resultados[tipo], tipo))
         header_layout.addWidget(btn_download)
-        
-        tabela = QTableWidget()
-        if not df.empty:
-            colunas = [col for col in df.columns if col != '_merge']
-            tabela.setColumnCount(len(colunas))
-            tabela.setHorizontalHeaderLabels(colunas)
-            tabela.setRowCount(len(df))
-            
-            for i, row in enumerate(df[colunas].itertuples(index=False)):
-                for j, val in enumerate(row):
-                    tabela.setItem(i, j, QTableWidgetItem(str(val)))
-            tabela.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+
+        tabela = DataFrameTableView(DataFrameTableModel(colunas_ocultas=['_merge']))
+        filtro = FilterBar(tabela, colunas=['MATRICULA', 'CODIGO', 'TESTE', 'NOME'])
 
         layout.addLayout(header_layout)
+        layout.addWidget(filtro)
         layout.addWidget(tabela)
+        self.abas_resultado[tipo] = {'contagem': lbl_contagem, 'download': btn_download, 'tabela': tabela}
+        return tab
+
+    def _exibir_resultado(self, tipo, df):
+        aba = self.abas_resultado[tipo]
+        aba['contagem'].setText(f"{len(df)} registros encontrados.")
+        aba['download'].setEnabled(len(df) > 0)
+        aba['tabela'].definir_dados(df)
 
     def _baixar_arquivo_excel(self, df, tipo):
         nome_sugerido = DataManager.generate_report_filename(f"relatorio_{tipo.lower()}", "xlsx")
@@ -152,9 +151,11 @@ class AnaliseView(QWidget):
         if not filepath: return
         
         try:
+            if not isinstance(df, pd.DataFrame):
+                df = df.to_pandas()  # Tabela Arrow recebida do processo de trabalho
             colunas_para_salvar = [col for col in df.columns if col != '_merge']
             df_to_save = df[colunas_para_salvar]
-            DataManager.save_df_to_xlsx(df_to_save, filepath)
-            self.lbl_status.setText(f"Arquivo salvo com sucesso em: {os.path.basename(filepath)}")
+            caminhos = DataManager.save_df_to_xlsx(df_to_save, filepath)
+            self.lbl_status.setText(f"Arquivo salvo com sucesso em: {', '.join(os.path.basename(c) for c in caminhos)}")
         except Exception as e:
             self.lbl_status.setText(f"<font color='red'>Falha ao salvar o arquivo: {e}</font>")
\ No newline at end of file
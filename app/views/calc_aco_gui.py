@@ -1,31 +1,52 @@
 # app/views/calc_aco_gui.py
 import os
 import datetime
-import threading
 import pandas as pd
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QLabel, 
-                               QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox)
-from PySide6.QtCore import Slot, Signal, QObject
-from PySide6.QtGui import QFont
+                               QLineEdit, QFileDialog, QMessageBox, QCompleter)
+from PySide6.QtCore import Qt, Slot, QTimer, QModelIndex
+from PySide6.QtGui import QFont, QStandardItemModel, QStandardItem
 
 from app.logic.calc_aco_processor import CalcAcoProcessor
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
+from app.widgets.dataframe_table import DataFrameTableModel, DataFrameTableView
+from app.widgets.table_filter import FilterBar
 
-class WorkerSignals(QObject):
-    import_finished = Signal(dict)
+
+def pre_carregar():
+    """Carrega a tabela de tarifas (compartilhada, ver TabelaTarifas) antes de a tela ser criada."""
+    CalcAcoProcessor()
+
+
+def _formatar_moeda(valor):
+    try:
+        return f"R$ {float(valor):.2f}"
+    except (TypeError, ValueError):
+        return ""
 
 class CalcAcoGUI(QWidget):
+    INTERVALO_VERIFICACAO_TARIFAS_MS = 2000
+    LIMITE_SUGESTOES = 50
+    # Papéis dos itens de sugestão que guardam o CLF e o código do candidato
+    PAPEL_CLF = Qt.ItemDataRole.UserRole
+    PAPEL_CODIGO = Qt.ItemDataRole.UserRole + 1
+
     def __init__(self, master=None):
         super().__init__(master)
 
         self.processor = CalcAcoProcessor()
+        # Se a planilha de tarifas for alterada, a tabela é recarregada em segundo plano
+        self.timer_tarifas = QTimer(self)
+        self.timer_tarifas.timeout.connect(self.processor.tabela.verificar_atualizacao)
+        self.timer_tarifas.start(self.INTERVALO_VERIFICACAO_TARIFAS_MS)
         self.colunas_tabela = ['Matrícula', 'CLF', 'Código', 'Referencia (Horas)', 'H. Normal',
                                'Tarifa Normal', 'H. Majorada', 'Tarifa Majorada', 'Valor Total', 'Observação']
-        self.dados_para_exibicao = []
         self.valores_calculados = None
 
-        self.signals = WorkerSignals()
-        self.signals.import_finished.connect(self._finalizar_importacao)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
 
         self._criar_interface()
 
@@ -60,21 +81,28 @@ class CalcAcoGUI(QWidget):
         layout_entradas.addWidget(self.entry_observacao, 5, 1)
         layout_entradas.setColumnStretch(1, 1)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(self.colunas_tabela))
-        self.table.setHorizontalHeaderLabels(self.colunas_tabela)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        # Preenchimento automático: a cada tecla, os candidatos vêm do índice de prefixos da tabela
+        self.completer_clf = self._criar_completer(self.entry_clf)
+        self.completer_codigo = self._criar_completer(self.entry_codigo)
+
+        # Tarifas e valores são guardados como números e formatados apenas na exibição
+        self.modelo_tabela = DataFrameTableModel(
+            pd.DataFrame(columns=self.colunas_tabela),
+            formatadores={col: _formatar_moeda for col in ['Tarifa Normal', 'Tarifa Majorada', 'Valor Total']})
+        self.table = DataFrameTableView(self.modelo_tabela)
+        self.filtro_tabela = FilterBar(self.table, colunas=['Matrícula', 'CLF', 'Código', 'Observação'])
         
         acoes_layout = QHBoxLayout()
-        btn_importar = StyledButton("Importar", "primary")
+        self.btn_importar = StyledButton("Importar", "primary")
         btn_exportar = StyledButton("Exportar", "primary")
         btn_limpar = StyledButton("Limpar", "danger")
-        acoes_layout.addWidget(btn_importar)
+        acoes_layout.addWidget(self.btn_importar)
         acoes_layout.addWidget(btn_exportar)
         acoes_layout.addWidget(btn_limpar)
         acoes_layout.addStretch()
 
         layout_esquerdo.addWidget(frame_entradas)
+        layout_esquerdo.addWidget(self.filtro_tabela)
         layout_esquerdo.addWidget(self.table, 1)
         layout_esquerdo.addLayout(acoes_layout)
 
@@ -126,14 +154,66 @@ class CalcAcoGUI(QWidget):
         main_layout.addWidget(frame_direito, 1) # 1/3 do espaço
 
         # --- Conexões ---
+        self.entry_clf.textEdited.connect(lambda: self._atualizar_sugestoes(self.completer_clf))
+        self.entry_codigo.textEdited.connect(lambda: self._atualizar_sugestoes(self.completer_codigo))
         self.entry_clf.editingFinished.connect(self._buscar_tarifas_e_calcular)
         self.entry_codigo.editingFinished.connect(self._buscar_tarifas_e_calcular)
         self.entry_referencia.editingFinished.connect(self._calcular_valores)
         btn_adicionar.clicked.connect(self._adicionar_item)
-        btn_importar.clicked.connect(self._iniciar_importacao_threaded)
+        self.btn_importar.clicked.connect(self._iniciar_importacao_threaded)
         btn_exportar.clicked.connect(self._exportar_excel)
         btn_limpar.clicked.connect(self._limpar_tabela)
 
+    def _criar_completer(self, entry: QLineEdit) -> QCompleter:
+        # A filtragem é feita pelo índice; o completer só exibe os candidatos e avisa a escolha
+        completer = QCompleter(QStandardItemModel(self), self)
+        completer.setWidget(entry)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.setMaxVisibleItems(12)
+        completer.activated[QModelIndex].connect(self._sugestao_escolhida)
+        return completer
+
+    @staticmethod
+    def _texto_sugestao(candidato: dict) -> str:
+        if candidato['tarifa_normal'] is None:
+            tarifas = "tarifa inválida"
+        else:
+            tarifas = f"R$ {candidato['tarifa_normal']:.2f} / majorada R$ {candidato['tarifa_majorada']:.2f}"
+        texto = f"{candidato['clf']}  |  Código {candidato['codigo']}  |  {tarifas}"
+        return texto + ("  (CLF com mais de um código)" if candidato['ambiguo'] else "")
+
+    def _atualizar_sugestoes(self, completer: QCompleter):
+        clf = self.entry_clf.text()
+        codigo = self.entry_codigo.text() if completer is self.completer_codigo else ""
+        modelo = completer.model()
+        modelo.clear()
+        if not clf and not codigo:
+            completer.popup().hide()
+            return
+
+        candidatos = self.processor.sugerir(clf, codigo, self.LIMITE_SUGESTOES)
+        for candidato in candidatos:
+            item = QStandardItem(self._texto_sugestao(candidato))
+            item.setData(candidato['clf'], self.PAPEL_CLF)
+            item.setData(candidato['codigo'], self.PAPEL_CODIGO)
+            modelo.appendRow(item)
+
+        if candidatos:
+            mais = "+" if len(candidatos) == self.LIMITE_SUGESTOES else ""
+            self.lbl_status_busca.setText(f"{len(candidatos)}{mais} candidato(s) na base.")
+            completer.complete()
+        else:
+            completer.popup().hide()
+            filtro = f"CLF iniciado por '{clf}'" + (f" e código iniciado por '{codigo}'" if codigo else "")
+            self.lbl_status_busca.setText(f"<font color='red'>Nenhuma tarifa com {filtro}.</font>")
+
+    @Slot(QModelIndex)
+    def _sugestao_escolhida(self, index: QModelIndex):
+        self.entry_clf.setText(index.data(self.PAPEL_CLF))
+        self.entry_codigo.setText(index.data(self.PAPEL_CODIGO))
+        self._buscar_tarifas_e_calcular()
+        self.entry_referencia.setFocus()
+
     def _limpar_resultados(self):
         self.valores_calculados = None
         self.lbl_tarifa_normal.setText("R$ 0,00")
@@ -201,14 +281,13 @@ class CalcAcoGUI(QWidget):
             'Matrícula': self.entry_matricula.text(), 'CLF': self.entry_clf.text(),
             'Código': self.entry_codigo.text(), 'Referencia (Horas)': self.entry_referencia.text(),
             'H. Normal': self.valores_calculados['h_normal'], 
-            'Tarifa Normal': f"R$ {self.valores_calculados['tarifa_normal']:.2f}",
+            'Tarifa Normal': self.valores_calculados['tarifa_normal'],
             'H. Majorada': self.valores_calculados['h_majorada'], 
-            'Tarifa Majorada': f"R$ {self.valores_calculados['tarifa_majorada']:.2f}",
-            'Valor Total': f"R$ {self.valores_calculados['valor_total']:.2f}", 
+            'Tarifa Majorada': self.valores_calculados['tarifa_majorada'],
+            'Valor Total': self.valores_calculados['valor_total'], 
             'Observação': self.entry_observacao.text()
         }
-        self.dados_para_exibicao.append(nova_linha)
-        self._atualizar_tabela()
+        self.modelo_tabela.adicionar_linhas(pd.DataFrame([nova_linha], columns=self.colunas_tabela))
         self._limpar_campos_de_entrada()
 
     def _limpar_campos_de_entrada(self):
@@ -224,17 +303,36 @@ class CalcAcoGUI(QWidget):
     def _iniciar_importacao_threaded(self):
         caminho, _ = QFileDialog.getOpenFileName(self, "Importar Arquivo", "", "Arquivos Excel (*.xlsx)")
         if not caminho: return
-        threading.Thread(target=self._executar_importacao, args=(caminho,), daemon=True).start()
+        self.btn_importar.setEnabled(False)
+        self.btn_importar.setText("Importando...")
+        self.runner.executar(f"Importar {os.path.basename(caminho)}", self._executar_importacao, caminho,
+                             ao_concluir=self._finalizar_importacao, ao_falhar=self._importacao_falhou,
+                             ao_cancelar=self._restaurar_botao_importar)
 
-    def _executar_importacao(self, caminho_arquivo):
-        resultado = self.processor.processar_arquivo_importado(caminho_arquivo)
-        self.signals.import_finished.emit(resultado)
+    def _executar_importacao(self, contexto, caminho_arquivo):
+        # As linhas calculadas chegam como Arrow em memória compartilhada, sem passar pelo pipe com pickle
+        return self.pool_processos.executar(contexto, "app.logic.calc_aco_processor:CalcAcoProcessor.processar_arquivo_importado",
+                                            caminho_arquivo, resultado_arrow=True)
 
-    @Slot(dict)
+    @Slot()
+    def _restaurar_botao_importar(self):
+        self.btn_importar.setEnabled(True)
+        self.btn_importar.setText("Importar")
+
+    @Slot(str)
+    def _importacao_falhou(self, erro):
+        # Ex: o processo de trabalho terminou inesperadamente ou a planilha não pôde ser lida
+        self._restaurar_botao_importar()
+        QMessageBox.critical(self, "Erro na Importação", f"Não foi possível importar o arquivo:\n{erro}")
+
+    @Slot(object)
     def _finalizar_importacao(self, resultado):
+        self._restaurar_botao_importar()
         if resultado['status'] == 'sucesso':
-            self.dados_para_exibicao.extend(resultado['dados'])
-            self._atualizar_tabela()
+            dados = resultado['dados']
+            if not isinstance(dados, pd.DataFrame):
+                dados = dados.to_pandas()  # Tabela Arrow recebida do processo de trabalho
+            self.modelo_tabela.adicionar_linhas(dados[self.colunas_tabela])
             sucesso_msg = f"{len(resultado['dados'])} linhas importadas."
             if resultado['erros']:
                 erros_msg = "\n\nOcorreram erros:\n" + "\n".join(resultado['erros'])
@@ -244,28 +342,21 @@ class CalcAcoGUI(QWidget):
         else:
             QMessageBox.critical(self, "Erro na Importação", resultado['mensagem'])
         
-    def _atualizar_tabela(self):
-        self.table.setRowCount(len(self.dados_para_exibicao))
-        for i, item in enumerate(self.dados_para_exibicao):
-            for j, col_name in enumerate(self.colunas_tabela):
-                self.table.setItem(i, j, QTableWidgetItem(str(item.get(col_name, ""))))
-
     @Slot()
     def _exportar_excel(self):
-        if not self.dados_para_exibicao:
+        if self.modelo_tabela.rowCount() == 0:
             QMessageBox.warning(self, "Aviso", "Não há dados para exportar.")
             return
         caminho, _ = QFileDialog.getSaveFileName(self, "Exportar para Excel", "", "Arquivos Excel (*.xlsx)")
         if caminho:
-            df = pd.DataFrame(self.dados_para_exibicao)
+            df = self.modelo_tabela.dados()
             df.to_excel(caminho, index=False)
             QMessageBox.information(self, "Sucesso", f"Dados exportados com sucesso para:\n{caminho}")
 
     @Slot()
     def _limpar_tabela(self):
-        if not self.dados_para_exibicao: return
+        if self.modelo_tabela.rowCount() == 0: return
         reply = QMessageBox.question(self, "Confirmar", "Limpar todos os dados da tabela?", 
                                      QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            self.dados_para_exibicao.clear()
-            self._atualizar_tabela()
\ No newline at end of file
+            self.modelo_tabela.definir_dados(pd.DataFrame(columns=self.colunas_tabela))
\ No newline at end of file
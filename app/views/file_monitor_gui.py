@@ -1,16 +1,17 @@
 # app/views/file_monitor_gui.py
 import os
-import datetime
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, QTextEdit, 
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
                                QFileDialog, QMessageBox)
 from PySide6.QtCore import Slot, Signal, QObject, QTimer
 
 from app.logic.data_manager import DataManager
 from app.logic.file_monitor import FileMonitor
+from app.logic.honorarios_processor import HonorariosProcessor
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
+from app.widgets.log_console import LogConsole
 
 class WorkerSignals(QObject):
-    log_message = Signal(str)
     file_processed = Signal()
 
 class FileMonitorGUI(QWidget):
@@ -20,11 +21,11 @@ class FileMonitorGUI(QWidget):
         # --- Lógica de negócio ---
         self.pasta_origem_monitoramento = os.path.expanduser("~/Downloads")
         self.pasta_destino_processados = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/processados'))
+        self.pasta_honorarios = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/honorarios_reports'))
         self.colunas_folha = ['MATRICULA', 'NOME', 'CODIGO', 'VALOR', 'REFERENCIA', 'PRAZO',
                               'ORGAO', 'CLF', 'SIMBOLO', 'SITUACAO', 'SAIDA', 'DATA_AFAST', 'GRUPO', 'REGIME']
         
         self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
         self.signals.file_processed.connect(self._atualizar_info_dados)
 
         self.data_manager = DataManager(self.colunas_folha)
@@ -69,15 +70,16 @@ class FileMonitorGUI(QWidget):
         btn_csv = StyledButton("💾 Salvar CSV", "primary")
         btn_xlsx = StyledButton("💾 Salvar XLSX", "primary")
         btn_limpar = StyledButton("🧹 Limpar Dados", "danger")
+        self.btn_honorarios = StyledButton("📈 Honorários", "processing")
         botoes_layout.addWidget(btn_csv)
         botoes_layout.addWidget(btn_xlsx)
+        botoes_layout.addWidget(self.btn_honorarios)
         botoes_layout.addWidget(btn_limpar)
 
         info_actions_layout.addWidget(self.lbl_info_dados)
         info_actions_layout.addLayout(botoes_layout)
         
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole(nome_arquivo_log="file_monitor")
 
         main_layout.addWidget(folders_frame)
         main_layout.addWidget(self.btn_alternar_monitoramento)
@@ -92,6 +94,7 @@ class FileMonitorGUI(QWidget):
         btn_csv.clicked.connect(self._salvar_csv)
         btn_xlsx.clicked.connect(self._salvar_xlsx)
         btn_limpar.clicked.connect(self._limpar_dados)
+        self.btn_honorarios.clicked.connect(self._gerar_honorarios)
 
     @Slot()
     def _selecionar_pasta_origem(self):
@@ -140,11 +143,36 @@ class FileMonitorGUI(QWidget):
         path, _ = QFileDialog.getSaveFileName(self, "Salvar Excel", self.pasta_destino_processados, "Arquivos Excel (*.xlsx)")
         if path:
             try:
-                self.data_manager.salvar_para_xlsx(path)
-                QMessageBox.information(self, "Sucesso", f"Arquivo salvo em:\n{path}")
+                caminhos = self.data_manager.salvar_para_xlsx(path)
+                QMessageBox.information(self, "Sucesso", "Arquivo salvo em:\n" + "\n".join(caminhos))
             except Exception as e:
                 QMessageBox.critical(self, "Erro", f"Erro ao salvar:\n{e}")
 
+    @Slot()
+    def _gerar_honorarios(self):
+        if self.data_manager.esta_vazio():
+            QMessageBox.warning(self, "Aviso", "Não há dados para o relatório."); return
+        self.btn_honorarios.setEnabled(False)
+        TaskRunner.instancia().executar("Honorários (Monitor de Arquivos)", self._executar_honorarios,
+                                        ao_concluir=self._on_honorarios_concluido,
+                                        ao_falhar=self._on_honorarios_falhou,
+                                        ao_cancelar=lambda: self.btn_honorarios.setEnabled(True))
+
+    def _executar_honorarios(self, contexto):
+        # Os totais são somados direto dos dados acumulados, em blocos, sem salvá-los antes
+        processor = HonorariosProcessor(logger_callback=self._log_mensagem_thread_safe)
+        return processor.processar_honorarios_e_gerar_pdf(self.data_manager, self.pasta_honorarios, contexto=contexto)
+
+    @Slot(object)
+    def _on_honorarios_concluido(self, mensagem):
+        self.btn_honorarios.setEnabled(True)
+        self._log_mensagem_thread_safe(f"✅ {mensagem}")
+
+    @Slot(str)
+    def _on_honorarios_falhou(self, erro):
+        self.btn_honorarios.setEnabled(True)
+        QMessageBox.critical(self, "Erro", f"Erro ao gerar o relatório de honorários:\n{erro}")
+
     @Slot()
     def _limpar_dados(self):
         if self.data_manager.esta_vazio():
@@ -161,9 +189,4 @@ class FileMonitorGUI(QWidget):
         self.lbl_info_dados.setText(f"Dados Acumulados: {num_registros} registros")
         
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
\ No newline at end of file
+        self.caixa_log.registrar(mensagem)
\ No newline at end of file
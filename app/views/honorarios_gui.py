@@ -1,17 +1,14 @@
 # app/views/honorarios_gui.py
 import os
-import datetime
-import threading
-from PySide6.QtWidgets import (QWidget, QVBoxLayout, QFrame, QLabel, QTextEdit, 
-                               QFileDialog, QMessageBox)
-from PySide6.QtCore import Slot, Signal, QObject
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QLabel, 
+                               QFileDialog, QMessageBox, QLineEdit, QCheckBox, QListWidget, QAbstractItemView)
+from PySide6.QtCore import Slot
 
-from app.logic.honorarios_processor import HonorariosProcessor
+from app.logic.cubo_honorarios import CuboHonorarios, competencia_do_arquivo
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-class WorkerSignals(QObject):
-    finished = Signal(dict)
-    log_message = Signal(str)
+from app.widgets.log_console import LogConsole
 
 class HonorariosGUI(QWidget):
     def __init__(self, master=None):
@@ -21,11 +18,10 @@ class HonorariosGUI(QWidget):
         self.pasta_destino_pdf = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/honorarios_reports'))
         os.makedirs(self.pasta_destino_pdf, exist_ok=True)
         
-        self.signals = WorkerSignals()
-        self.signals.finished.connect(self._on_processing_finished)
-        self.signals.log_message.connect(self._append_log_message)
-        
-        self.processor = HonorariosProcessor(logger_callback=self._log_mensagem_thread_safe)
+        self.runner = TaskRunner.instancia()
+        # Os relatórios rodam em um processo de trabalho, para o pandas não disputar o GIL com a interface
+        self.pool_processos = PoolProcessos.instancia()
+        self.cubo = CuboHonorarios()
         
         self._criar_interface()
 
@@ -38,26 +34,57 @@ class HonorariosGUI(QWidget):
         settings_layout = QVBoxLayout(settings_frame)
         
         self.lbl_nome_arquivo = QLabel("Nenhum arquivo selecionado.")
-        btn_sel_arquivo = StyledButton("Selecionar Arquivo Excel", "primary")
+        btn_sel_arquivo = StyledButton("Selecionar Arquivo (Excel, TXT ou CSV)", "primary")
         
         self.lbl_pasta_destino = QLabel(f"<b>Pasta de Destino:</b> {self.pasta_destino_pdf}")
         self.lbl_pasta_destino.setWordWrap(True)
         btn_sel_pasta = StyledButton("Selecionar Pasta de Destino", "primary")
         
         settings_layout.addWidget(QLabel("<b>Configuração do Relatório de Honorários</b>"))
-        settings_layout.addWidget(QLabel("Arquivo Excel de Honorários:"))
+        settings_layout.addWidget(QLabel("Arquivo de Honorários (planilha ou folha em TXT/CSV):"))
         settings_layout.addWidget(self.lbl_nome_arquivo)
         settings_layout.addWidget(btn_sel_arquivo)
         settings_layout.addWidget(self.lbl_pasta_destino)
         settings_layout.addWidget(btn_sel_pasta)
+
+        # Totais guardados por competência, para relatórios comparativos sem reler os arquivos
+        competencia_layout = QHBoxLayout()
+        self.check_guardar_cubo = QCheckBox("Guardar no cubo de competências")
+        self.check_guardar_cubo.setChecked(True)
+        self.entry_competencia = QLineEdit()
+        self.entry_competencia.setPlaceholderText("AAAA-MM (padrão: pelo nome do arquivo)")
+        competencia_layout.addWidget(self.check_guardar_cubo)
+        competencia_layout.addWidget(QLabel("Competência:"))
+        competencia_layout.addWidget(self.entry_competencia, 1)
+        settings_layout.addLayout(competencia_layout)
         
         self.btn_gerar_relatorio = StyledButton("📈 Gerar Relatório de Honorários", "processing")
+
+        # Lote: vários arquivos somados em paralelo, em um único PDF e um CSV de resumo
+        lote_layout = QHBoxLayout()
+        self.btn_lote_arquivos = StyledButton("📚 Lote: Selecionar Arquivos", "primary")
+        self.btn_lote_pasta = StyledButton("📁 Lote: Pasta Inteira", "primary")
+        lote_layout.addWidget(self.btn_lote_arquivos)
+        lote_layout.addWidget(self.btn_lote_pasta)
+
+        comparativo_frame = QFrame()
+        comparativo_frame.setObjectName("container")
+        comparativo_frame.setStyleSheet("#container { border: 1px solid #dcdcdc; border-radius: 5px; }")
+        comparativo_layout = QVBoxLayout(comparativo_frame)
+        self.lista_competencias = QListWidget()
+        self.lista_competencias.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.lista_competencias.setMaximumHeight(110)
+        self.btn_comparativo = StyledButton("📊 Relatório Comparativo", "processing")
+        comparativo_layout.addWidget(QLabel("<b>Competências no cubo</b> (nenhuma selecionada = todas):"))
+        comparativo_layout.addWidget(self.lista_competencias)
+        comparativo_layout.addWidget(self.btn_comparativo)
         
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole()
 
         main_layout.addWidget(settings_frame)
         main_layout.addWidget(self.btn_gerar_relatorio)
+        main_layout.addLayout(lote_layout)
+        main_layout.addWidget(comparativo_frame)
         main_layout.addWidget(QLabel("<b>Log de Processamento:</b>"))
         main_layout.addWidget(self.caixa_log, 1)
 
@@ -65,13 +92,23 @@ class HonorariosGUI(QWidget):
         btn_sel_arquivo.clicked.connect(self._selecionar_arquivo_excel)
         btn_sel_pasta.clicked.connect(self._selecionar_pasta_destino)
         self.btn_gerar_relatorio.clicked.connect(self._iniciar_geracao_relatorio)
+        self.btn_comparativo.clicked.connect(self._iniciar_relatorio_comparativo)
+        self.btn_lote_arquivos.clicked.connect(self._selecionar_lote_arquivos)
+        self.btn_lote_pasta.clicked.connect(self._selecionar_lote_pasta)
+        self._atualizar_competencias()
+
+    def _atualizar_competencias(self):
+        self.lista_competencias.clear()
+        self.lista_competencias.addItems(self.cubo.competencias())
 
     @Slot()
     def _selecionar_arquivo_excel(self):
-        caminho, _ = QFileDialog.getOpenFileName(self, "Selecione o arquivo de honorários", "", "Arquivos Excel (*.xlsx *.xls)")
+        caminho, _ = QFileDialog.getOpenFileName(self, "Selecione o arquivo de honorários", "",
+                                                 "Planilhas e folhas (*.xlsx *.xls *.txt *.csv);;Arquivos Excel (*.xlsx *.xls);;Folha TXT/CSV (*.txt *.csv)")
         if caminho:
             self.caminho_arquivo_excel = caminho
             self.lbl_nome_arquivo.setText(os.path.basename(caminho))
+            self.entry_competencia.setText(competencia_do_arquivo(caminho))
             self._log_mensagem_thread_safe(f"Arquivo selecionado: {os.path.basename(caminho)}")
 
     @Slot()
@@ -85,25 +122,86 @@ class HonorariosGUI(QWidget):
     @Slot()
     def _iniciar_geracao_relatorio(self):
         if not self.caminho_arquivo_excel:
-            QMessageBox.warning(self, "Aviso", "Por favor, selecione um arquivo Excel primeiro.")
+            QMessageBox.warning(self, "Aviso", "Por favor, selecione um arquivo primeiro.")
             return
             
         self.btn_gerar_relatorio.setEnabled(False)
         self.btn_gerar_relatorio.setText("Gerando Relatório...")
         self._log_mensagem_thread_safe("Iniciando a geração do relatório...")
         
-        threading.Thread(target=self._executar_geracao_relatorio, daemon=True).start()
+        self.runner.executar("Relatório de Honorários", self._executar_geracao_relatorio,
+                             self.caminho_arquivo_excel, self.pasta_destino_pdf,
+                             self.entry_competencia.text().strip() or None, self.check_guardar_cubo.isChecked(),
+                             ao_concluir=self._on_processing_finished,
+                             ao_cancelar=lambda: self._on_processing_finished({"status": "erro", "mensagem": "Geração cancelada pelo usuário."}))
 
-    def _executar_geracao_relatorio(self):
+    def _executar_geracao_relatorio(self, contexto, caminho_arquivo_excel, pasta_destino_pdf, competencia, guardar_no_cubo):
         try:
-            resultado_msg = self.processor.processar_honorarios_e_gerar_pdf(
-                self.caminho_arquivo_excel, self.pasta_destino_pdf
-            )
-            self.signals.finished.emit({"status": "sucesso", "mensagem": resultado_msg})
+            resultado_msg = self.pool_processos.executar(
+                contexto, "app.logic.honorarios_processor:HonorariosProcessor.processar_honorarios_e_gerar_pdf",
+                caminho_arquivo_excel, pasta_destino_pdf, competencia=competencia, guardar_no_cubo=guardar_no_cubo,
+                logger=self._log_mensagem_thread_safe)
+            return {"status": "sucesso", "mensagem": resultado_msg}
         except Exception as e:
-            self.signals.finished.emit({"status": "erro", "mensagem": str(e)})
+            return {"status": "erro", "mensagem": str(e)}
+
+    @Slot()
+    def _selecionar_lote_arquivos(self):
+        caminhos, _ = QFileDialog.getOpenFileNames(self, "Selecione os arquivos de honorários", "",
+                                                   "Planilhas e folhas (*.xlsx *.xls *.txt *.csv)")
+        if caminhos:
+            self._iniciar_lote(caminhos)
+
+    @Slot()
+    def _selecionar_lote_pasta(self):
+        pasta = QFileDialog.getExistingDirectory(self, "Selecione a pasta com os arquivos de honorários")
+        if pasta:
+            self._iniciar_lote(pasta)
+
+    def _iniciar_lote(self, origens):
+        self._definir_botoes_lote(False)
+        self._log_mensagem_thread_safe("Iniciando a geração do relatório em lote...")
+        self.runner.executar("Relatório de Honorários em Lote", self._executar_lote,
+                             origens, self.pasta_destino_pdf, self.check_guardar_cubo.isChecked(),
+                             ao_concluir=self._on_processing_finished,
+                             ao_cancelar=lambda: self._on_processing_finished({"status": "erro", "mensagem": "Geração cancelada pelo usuário."}))
 
-    @Slot(dict)
+    def _executar_lote(self, contexto, origens, pasta_destino_pdf, guardar_no_cubo):
+        try:
+            resultado_msg = self.pool_processos.executar(
+                contexto, "app.logic.honorarios_processor:HonorariosProcessor.processar_lote_e_gerar_relatorio",
+                origens, pasta_destino_pdf, guardar_no_cubo=guardar_no_cubo, logger=self._log_mensagem_thread_safe)
+            return {"status": "sucesso", "mensagem": resultado_msg}
+        except Exception as e:
+            return {"status": "erro", "mensagem": str(e)}
+
+    def _definir_botoes_lote(self, habilitados: bool):
+        self.btn_lote_arquivos.setEnabled(habilitados)
+        self.btn_lote_pasta.setEnabled(habilitados)
+
+    @Slot()
+    def _iniciar_relatorio_comparativo(self):
+        if not self.lista_competencias.count():
+            QMessageBox.warning(self, "Aviso", "Nenhuma competência no cubo. Gere um relatório com 'Guardar no cubo' marcado.")
+            return
+        competencias = [item.text() for item in self.lista_competencias.selectedItems()] or None
+        self.btn_comparativo.setEnabled(False)
+        self.runner.executar("Relatório Comparativo de Honorários", self._executar_relatorio_comparativo,
+                             self.pasta_destino_pdf, competencias,
+                             ao_concluir=self._on_processing_finished,
+                             ao_cancelar=lambda: self._on_processing_finished({"status": "erro", "mensagem": "Geração cancelada pelo usuário."}))
+
+    def _executar_relatorio_comparativo(self, contexto, pasta_destino_pdf, competencias):
+        try:
+            # O processo de trabalho lê o cubo da pasta padrão, a mesma de self.cubo
+            resultado_msg = self.pool_processos.executar(
+                contexto, "app.logic.honorarios_processor:HonorariosProcessor.gerar_relatorio_comparativo",
+                pasta_destino_pdf, competencias, logger=self._log_mensagem_thread_safe)
+            return {"status": "sucesso", "mensagem": resultado_msg}
+        except Exception as e:
+            return {"status": "erro", "mensagem": str(e)}
+
+    @Slot(object)
     def _on_processing_finished(self, resultado):
         if resultado["status"] == "sucesso":
             QMessageBox.information(self, "Sucesso", resultado["mensagem"])
@@ -114,11 +212,9 @@ class HonorariosGUI(QWidget):
             
         self.btn_gerar_relatorio.setEnabled(True)
         self.btn_gerar_relatorio.setText("📈 Gerar Relatório de Honorários")
+        self.btn_comparativo.setEnabled(True)
+        self._definir_botoes_lote(True)
+        self._atualizar_competencias()
 
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
\ No newline at end of file
+        self.caixa_log.registrar(mensagem)
\ No newline at end of file
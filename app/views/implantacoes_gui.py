@@ -1,32 +1,23 @@
 # atividades_folha/app/views/implantacoes_gui.py
 import os
-import sys
-import threading
-from datetime import datetime
+import pandas as pd
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QFrame, QLabel,
-                               QLineEdit, QTextEdit, QTableWidget, QTableWidgetItem, QCheckBox,
-                               QHeaderView, QFileDialog, QMessageBox)
-from PySide6.QtCore import Slot, Signal, QObject, Qt # <-- Importação do Qt
+                               QLineEdit, QTextEdit, QCheckBox, QFileDialog, QMessageBox)
+from PySide6.QtCore import Slot, Qt, QModelIndex
 
 # Importa a classe de lógica e widgets padronizados
 from app.logic.implantacoes_processor import ImplantacoesProcessor
+from app.logic.implantacoes_store import ImplantacoesStore
 from app.widgets.styled_widgets import StyledButton
-
-try:
-    import pandas as pd
-except ImportError:
-    print("AVISO: A biblioteca 'pandas' não está instalada. Execute: pip install pandas openpyxl")
-
-try:
-    import pyperclip
-except ImportError:
-    print("AVISO: A biblioteca 'pyperclip' não está instalada. Execute: pip install pyperclip")
+from app.widgets.dataframe_table import DataFrameTableModel, DataFrameTableView
+from app.widgets.table_filter import FilterBar
 
 class ImplantacoesGUI(QWidget):
     def __init__(self, master=None):
         super().__init__(master)
-        self.colunas_arquivo = ['Operacao', 'Matricula', 'Codigo', 'Valor', 'Referencia', 'Prazo', 'Observacao']
-        self.colunas_tabela = self.colunas_arquivo + ['Data']
+        self.colunas_arquivo = ImplantacoesStore.COLUNAS_ARQUIVO
+        self.colunas_tabela = ImplantacoesStore.COLUNAS
+        self.store = ImplantacoesStore()
         self.item_selecionado_para_edicao_row = -1
         self.indice_implantacao_atual = 0
         self.em_modo_implantacao = False # <-- Variável de estado para o atalho
@@ -96,10 +87,14 @@ class ImplantacoesGUI(QWidget):
         layout_tabela = QVBoxLayout(frame_tabela)
         layout_tabela.addWidget(QLabel("<b>Implantações (Dê um duplo-clique em um item para editar)</b>"))
         
-        self.table = QTableWidget()
-        self.table.setColumnCount(len(self.colunas_tabela))
-        self.table.setHorizontalHeaderLabels(self.colunas_tabela)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # A tabela apenas exibe o armazenamento tipado; Valor e Data são formatados na exibição
+        self.modelo_tabela = DataFrameTableModel(self.store.df, formatadores={
+            'Valor': lambda v: f"{v:.2f}".replace('.', ','),
+            'Data': lambda d: d.strftime('%d/%m/%Y') if not pd.isna(d) else ''})
+        self.table = DataFrameTableView(self.modelo_tabela)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.filtro_tabela = FilterBar(self.table, colunas=['Matricula', 'Codigo', 'Operacao', 'Observacao'])
+        layout_tabela.addWidget(self.filtro_tabela)
         layout_tabela.addWidget(self.table)
         
         frame_copia = QFrame()
@@ -140,7 +135,7 @@ class ImplantacoesGUI(QWidget):
         self.btn_importar.clicked.connect(self._importar_arquivo)
         self.btn_salvar.clicked.connect(self._salvar_edicao)
         self.btn_cancelar.clicked.connect(self._cancelar_edicao)
-        self.table.cellDoubleClicked.connect(self._iniciar_edicao_item)
+        self.table.doubleClicked.connect(self._iniciar_edicao_item)
         self.btn_implantar.clicked.connect(self._implantar_dados)
         self.btn_parar_implantar.clicked.connect(self._finalizar_processo_implantacao)
         self.btn_exportar.clicked.connect(self._exportar_para_excel)
@@ -153,18 +148,8 @@ class ImplantacoesGUI(QWidget):
             QMessageBox.critical(self, "Erro de Validação", "Os campos 'Operacao', 'Matricula', 'Codigo' e 'Observacao' são obrigatórios.")
             return
 
-        try:
-            valor_float = float(dados[3].replace(',', '.')) if dados[3] else 0.0
-            dados[3] = f"{valor_float:.2f}".replace('.', ',')
-        except (ValueError, TypeError):
-            dados[3] = "0,00"
-
-        dados.append(datetime.now().strftime('%d/%m/%Y'))
-        
-        rowCount = self.table.rowCount()
-        self.table.insertRow(rowCount)
-        for col, value in enumerate(dados):
-            self.table.setItem(rowCount, col, QTableWidgetItem(str(value)))
+        self.store.adicionar(dados)
+        self.modelo_tabela.sincronizar(self.store.df)
 
         for campo, entry in self.entries.items():
             if not self.keep_checks[campo].isChecked():
@@ -174,7 +159,7 @@ class ImplantacoesGUI(QWidget):
 
     @Slot()
     def _implantar_dados(self):
-        if self.table.rowCount() == 0:
+        if len(self.store) == 0:
             QMessageBox.information(self, "Implantar", "Não há dados na tabela.")
             return
         
@@ -183,19 +168,20 @@ class ImplantacoesGUI(QWidget):
         self._processar_proxima_linha()
 
     def _processar_proxima_linha(self):
-        if self.indice_implantacao_atual >= self.table.rowCount():
+        if self.indice_implantacao_atual >= len(self.store):
             self._finalizar_processo_implantacao()
             return
 
-        linha_dados = [self.table.item(self.indice_implantacao_atual, col).text() for col in range(self.table.columnCount())]
+        linha_dados = self.store.linha(self.indice_implantacao_atual)
         texto = self.processor.formatar_linha_para_txt(linha_dados)
         try:
+            import pyperclip  # Importado sob demanda: só é necessário durante a implantação
             pyperclip.copy(texto)
             self.status_label.setText(f"Linha {self.indice_implantacao_atual + 1} copiada. Pressione SHIFT para a próxima.")
         except Exception as e:
             self.status_label.setText(f"Erro ao copiar para a área de transferência: {e}")
 
-        self.table.selectRow(self.indice_implantacao_atual)
+        self.table.selecionar_linha_origem(self.indice_implantacao_atual)
         self.text_para_copiar.setText(texto)
         self.indice_implantacao_atual += 1
     
@@ -225,12 +211,13 @@ class ImplantacoesGUI(QWidget):
 
     @Slot()
     def _limpar_tabela(self):
-        if self.table.rowCount() == 0:
+        if len(self.store) == 0:
             QMessageBox.information(self, "Limpar", "A tabela já está vazia.")
             return
         
         if QMessageBox.question(self, "Confirmar", "Deseja realmente limpar todos os dados da tabela?") == QMessageBox.StandardButton.Yes:
-            self.table.setRowCount(0)
+            self.store.limpar()
+            self.modelo_tabela.definir_dados(self.store.df)
             self.text_para_copiar.clear()
             self.status_label.setText("Tabela limpa.")
 
@@ -239,70 +226,51 @@ class ImplantacoesGUI(QWidget):
         self.btn_importar.setVisible(not editar)
         self.btn_salvar.setVisible(editar)
         self.btn_cancelar.setVisible(editar)
-    
-    # ... (Os métodos restantes como _importar_arquivo, _exportar_para_excel, _salvar_edicao, etc. permanecem os mesmos) ...
 
     @Slot()
     def _importar_arquivo(self):
         filepath, _ = QFileDialog.getOpenFileName(self, "Selecionar Arquivo", "", "Ficheiros Excel (*.xlsx *.xls)")
         if not filepath: return
         try:
-            df = pd.read_excel(filepath, dtype=str)
-            df.columns = [str(col).lower() for col in df.columns]
-            colunas_esperadas_lower = [col.lower() for col in self.colunas_arquivo]
-            colunas_faltando = [col for col in colunas_esperadas_lower if col not in df.columns]
-            if colunas_faltando:
-                mapa_lower_original = {col.lower(): col for col in self.colunas_arquivo}
-                nomes_originais_faltando = [mapa_lower_original[col] for col in colunas_faltando]
-                QMessageBox.critical(self, "Erro de Colunas", f"O arquivo não contém as seguintes colunas obrigatórias: {', '.join(nomes_originais_faltando)}")
-                return
-            mapa_renomear = {col.lower(): col for col in self.colunas_arquivo}
-            df = df.rename(columns=mapa_renomear)
-            df = df[self.colunas_arquivo]
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce')
-            df.fillna({'Valor': 0.0, 'Operacao': '', 'Matricula': '', 'Codigo': '', 'Referencia': '', 'Prazo': '', 'Observacao': ''}, inplace=True)
-            if self.table.rowCount() > 0:
-                resposta = QMessageBox.question(self, "Confirmar Importação",
-                    "A tabela já contém dados. Deseja limpá-la antes de importar?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel)
-                if resposta == QMessageBox.StandardButton.Cancel: return
-                if resposta == QMessageBox.StandardButton.Yes: self.table.setRowCount(0)
-            for _, row in df.iterrows():
-                row['Valor'] = f"{row['Valor']:.2f}".replace('.', ',')
-                linha = row.tolist() + [datetime.now().strftime('%d/%m/%Y')]
-                rowCount = self.table.rowCount()
-                self.table.insertRow(rowCount)
-                for col, value in enumerate(linha):
-                    self.table.setItem(rowCount, col, QTableWidgetItem(str(value)))
-            QMessageBox.information(self, "Importado", f"{self.table.rowCount()} linhas importadas com sucesso.")
+            df = ImplantacoesStore.ler_arquivo(filepath)
+        except ValueError as e:
+            QMessageBox.critical(self, "Erro de Colunas", str(e))
+            return
         except Exception as e:
             QMessageBox.critical(self, "Erro ao Importar", f"Ocorreu um erro inesperado: {str(e)}")
+            return
+
+        substituir = False
+        if len(self.store) > 0:
+            resposta = QMessageBox.question(self, "Confirmar Importação",
+                "A tabela já contém dados. Deseja limpá-la antes de importar?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel)
+            if resposta == QMessageBox.StandardButton.Cancel: return
+            substituir = resposta == QMessageBox.StandardButton.Yes
+
+        importadas = self.store.importar(df, substituir=substituir)
+        self.modelo_tabela.sincronizar(self.store.df)
+        QMessageBox.information(self, "Importado", f"{importadas} linhas importadas com sucesso.")
 
     @Slot()
     def _exportar_para_excel(self):
-        if self.table.rowCount() == 0:
+        if len(self.store) == 0:
             QMessageBox.information(self, "Exportar", "Não há dados para exportar.")
             return
         filepath, _ = QFileDialog.getSaveFileName(self, "Salvar como", "", "Ficheiros Excel (*.xlsx);;Todos os ficheiros (*.*)")
         if not filepath: return
         try:
-            dados = []
-            for row in range(self.table.rowCount()):
-                linha = [self.table.item(row, col).text() if self.table.item(row, col) else '' for col in range(self.table.columnCount())]
-                dados.append(linha)
-            df = pd.DataFrame(dados, columns=self.colunas_tabela)
-            df['Valor'] = df['Valor'].str.replace(',', '.', regex=False)
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0.0)
-            df.to_excel(filepath, index=False)
+            self.store.exportar_excel(filepath)
             QMessageBox.information(self, "Sucesso", f"Dados exportados com sucesso para {os.path.basename(filepath)}")
         except Exception as e:
             QMessageBox.critical(self, "Erro ao Exportar", str(e))
 
-    @Slot(int, int)
-    def _iniciar_edicao_item(self, row, column):
+    @Slot(QModelIndex)
+    def _iniciar_edicao_item(self, index):
+        row = self.table.linha_origem(index)
         self.item_selecionado_para_edicao_row = row
         for i, campo in enumerate(['operacao', 'matricula', 'codigo', 'valor', 'referencia', 'prazo', 'observacao']):
-            self.entries[campo].setText(self.table.item(row, i).text())
+            self.entries[campo].setText(self.modelo_tabela.texto(row, i))
         self._alternar_modo_edicao(editar=True)
 
     @Slot()
@@ -312,15 +280,8 @@ class ImplantacoesGUI(QWidget):
         if not all([dados[0], dados[1], dados[2], dados[6]]):
             QMessageBox.critical(self, "Erro", "Os campos 'Operacao', 'Matricula', 'Codigo' e 'Observacao' são obrigatórios.")
             return
-        try:
-            valor_float = float(dados[3].replace(',', '.')) if dados[3] else 0.0
-            dados[3] = f"{valor_float:.2f}".replace('.', ',')
-        except (ValueError, TypeError):
-            dados[3] = "0,00"
-        data_original = self.table.item(self.item_selecionado_para_edicao_row, 7).text()
-        dados.append(data_original)
-        for col, value in enumerate(dados):
-            self.table.setItem(self.item_selecionado_para_edicao_row, col, QTableWidgetItem(str(value)))
+        self.store.atualizar(self.item_selecionado_para_edicao_row, dados)
+        self.modelo_tabela.sincronizar(self.store.df, linha_alterada=self.item_selecionado_para_edicao_row)
         self._cancelar_edicao()
         self.status_label.setText("Item atualizado com sucesso.")
 
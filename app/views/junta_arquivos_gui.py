@@ -1,18 +1,17 @@
 # app/views/junta_arquivos_gui.py
 import os
-import datetime
-import threading
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QFrame, QTreeWidget, 
-                               QHeaderView, QTreeWidgetItem, QFileDialog, QMessageBox, QTextEdit, QLabel)
-from PySide6.QtCore import Slot, Signal, QObject
-
-from app.logic.junta_arquivos_processor import ExcelProcessor
+                               QHeaderView, QTreeWidgetItem, QFileDialog, QMessageBox, QLabel, QSpinBox, QComboBox, QLineEdit,
+                               QCheckBox)
+from PySide6.QtCore import Slot
+
+from app.logic.junta_arquivos_processor import ExcelProcessor, max_processos_padrao
+from app.logic.cabecalho_planilha import ler_cabecalho
+from app.logic.leitor_excel import interpretar_abas
+from app.process_worker import PoolProcessos
+from app.task_runner import TaskRunner
 from app.widgets.styled_widgets import StyledButton
-
-# Classe para emitir sinais de uma thread secundária para a GUI principal
-class WorkerSignals(QObject):
-    log_message = Signal(str)
-    finished = Signal(dict)
+from app.widgets.log_console import LogConsole
 
 class JuntaArquivosGUI(QWidget):
     def __init__(self):
@@ -23,9 +22,8 @@ class JuntaArquivosGUI(QWidget):
         os.makedirs(self.pasta_destino_saida, exist_ok=True)
         self.processor = ExcelProcessor(logger_callback=self._log_mensagem_thread_safe)
         
-        self.signals = WorkerSignals()
-        self.signals.log_message.connect(self._append_log_message)
-        self.signals.finished.connect(self._on_processing_finished)
+        self.runner = TaskRunner.instancia()
+        self.pool_processos = PoolProcessos.instancia()
         
         self._criar_interface()
 
@@ -45,8 +43,9 @@ class JuntaArquivosGUI(QWidget):
         actions_layout.addStretch()
 
         self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Arquivos na Fila para Processamento"])
-        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.tree.setHeaderLabels(["Arquivos na Fila para Processamento", "Linhas (aprox.)", "Colunas", "Verificação"])
+        self.tree.header().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
 
         top_layout.addLayout(actions_layout)
         top_layout.addWidget(self.tree)
@@ -60,13 +59,40 @@ class JuntaArquivosGUI(QWidget):
         self.lbl_pasta_destino.setWordWrap(True)
         btn_selecionar_pasta = StyledButton("Selecionar Pasta", variant="primary")
         
+        # Quantos arquivos são lidos ao mesmo tempo (um processo por arquivo)
+        processos_layout = QHBoxLayout()
+        self.spin_processos = QSpinBox()
+        self.spin_processos.setRange(1, max(os.cpu_count() or 1, max_processos_padrao()))
+        self.spin_processos.setValue(max_processos_padrao())
+        processos_layout.addWidget(QLabel("Leituras simultâneas:"))
+        processos_layout.addWidget(self.spin_processos)
+        # Formato do arquivo consolidado
+        self.combo_formato = QComboBox()
+        self.combo_formato.addItem("Excel (.xlsx)", "xlsx")
+        self.combo_formato.addItem("CSV (.csv)", "csv")
+        self.combo_formato.addItem("Parquet (.parquet)", "parquet")
+        processos_layout.addWidget(QLabel("Formato de saída:"))
+        processos_layout.addWidget(self.combo_formato)
+        # Em fluxo: grava um arquivo de entrada por vez, com pouca memória, mas sem unificar os tipos das colunas
+        self.check_em_fluxo = QCheckBox("Gravar em fluxo (menos memória, sem conversão de tipos)")
+        processos_layout.addWidget(self.check_em_fluxo)
+        processos_layout.addStretch()
+
+        # Abas consolidadas de cada arquivo (vazio = só a primeira)
+        abas_layout = QHBoxLayout()
+        self.entry_abas = QLineEdit()
+        self.entry_abas.setPlaceholderText("Primeira aba. Ex: * (todas), #1,#3 (posições), Janeiro, Folha* (padrão)")
+        abas_layout.addWidget(QLabel("Abas:"))
+        abas_layout.addWidget(self.entry_abas, 1)
+
         bottom_layout.addWidget(self.lbl_pasta_destino)
         bottom_layout.addWidget(btn_selecionar_pasta)
+        bottom_layout.addLayout(processos_layout)
+        bottom_layout.addLayout(abas_layout)
 
         # --- Botão de processamento e Log ---
         self.btn_processar = StyledButton("🚀 Processar Arquivos", variant="processing")
-        self.caixa_log = QTextEdit()
-        self.caixa_log.setReadOnly(True)
+        self.caixa_log = LogConsole(nome_arquivo_log="junta_arquivos")
 
         main_layout.addWidget(top_frame)
         main_layout.addWidget(bottom_frame)
@@ -85,15 +111,50 @@ class JuntaArquivosGUI(QWidget):
         arquivos, _ = QFileDialog.getOpenFileNames(self, "Selecione um ou mais arquivos", "", "Arquivos Excel (*.xlsx *.xls)")
         if not arquivos: return
         
-        novos_adicionados = 0
+        novos = []
         for path in arquivos:
             if not any(d['caminho'] == path for d in self.arquivos_selecionados):
-                self.arquivos_selecionados.append({'caminho': path, 'nome_amigavel': os.path.basename(path)})
-                novos_adicionados += 1
+                novos.append({'caminho': path, 'nome_amigavel': os.path.basename(path), 'verificacao': 'Verificando...'})
         
-        if novos_adicionados > 0:
-            self._log_mensagem_thread_safe(f"📁 {novos_adicionados} arquivo(s) adicionado(s).")
+        if novos:
+            self.arquivos_selecionados.extend(novos)
+            self._log_mensagem_thread_safe(f"📁 {len(novos)} arquivo(s) adicionado(s).")
             self._atualizar_tabela()
+            # Lê só o cabeçalho de cada arquivo, para apontar problemas antes do processamento
+            self.runner.executar("Verificar arquivos", self._inspecionar_arquivos, [d['caminho'] for d in novos],
+                                 ao_concluir=self._on_inspecao_concluida)
+
+    def _inspecionar_arquivos(self, contexto, caminhos):
+        inspecoes = {}
+        for i, caminho in enumerate(caminhos):
+            contexto.verificar_cancelamento()
+            contexto.progresso(i, len(caminhos), os.path.basename(caminho))
+            try:
+                inspecoes[caminho] = ler_cabecalho(caminho, linhas_amostra=0)
+            except Exception as e:
+                inspecoes[caminho] = {'erro': str(e)}
+        return inspecoes
+
+    @Slot(object)
+    def _on_inspecao_concluida(self, inspecoes):
+        colunas_referencia = None
+        for item_data in self.arquivos_selecionados:
+            inspecao = inspecoes.get(item_data['caminho'], item_data.get('inspecao'))
+            if inspecao is None:
+                continue
+            item_data['inspecao'] = inspecao
+            if 'erro' in inspecao:
+                item_data['verificacao'] = 'Erro ❌'
+                self._log_mensagem_thread_safe(f"❌ Não foi possível ler '{item_data['nome_amigavel']}': {inspecao['erro']}")
+            elif not inspecao['colunas']:
+                item_data['verificacao'] = 'Vazio ⚠️'
+            elif colunas_referencia is not None and inspecao['colunas'] != colunas_referencia:
+                item_data['verificacao'] = 'Colunas diferentes ⚠️'
+            else:
+                item_data['verificacao'] = 'OK ✅'
+            if colunas_referencia is None and inspecao.get('colunas'):
+                colunas_referencia = inspecao['colunas']
+        self._atualizar_tabela()
 
     @Slot()
     def _remover_arquivo_selecionado(self):
@@ -110,7 +171,12 @@ class JuntaArquivosGUI(QWidget):
     def _atualizar_tabela(self):
         self.tree.clear()
         for item_data in self.arquivos_selecionados:
-            tree_item = QTreeWidgetItem([item_data['nome_amigavel']])
+            inspecao = item_data.get('inspecao') or {}
+            linhas = inspecao.get('linhas_estimadas')
+            tree_item = QTreeWidgetItem([item_data['nome_amigavel'],
+                                         "" if linhas is None else str(linhas),
+                                         str(len(inspecao['colunas'])) if 'colunas' in inspecao else "",
+                                         item_data.get('verificacao', '')])
             self.tree.addTopLevelItem(tree_item)
 
     @Slot()
@@ -130,22 +196,25 @@ class JuntaArquivosGUI(QWidget):
         
         lista_caminhos = [d['caminho'] for d in self.arquivos_selecionados]
         
-        # Executa o processamento em uma thread separada
-        thread = threading.Thread(target=self._executar_processamento, args=(lista_caminhos,), daemon=True)
-        thread.start()
-
-    def _executar_processamento(self, lista_de_arquivos):
+        # Executa o processamento em segundo plano, pelo executor de tarefas compartilhado
+        self.runner.executar("Juntar Arquivos", self._executar_processamento, lista_caminhos, self.pasta_destino_saida,
+                             self.spin_processos.value(), self.combo_formato.currentData(),
+                             interpretar_abas(self.entry_abas.text()), self.check_em_fluxo.isChecked(),
+                             ao_concluir=self._on_processing_finished,
+                             ao_cancelar=lambda: self._on_processing_finished({"status": "erro", "mensagem": "Processamento cancelado pelo usuário."}))
+
+    def _executar_processamento(self, contexto, lista_de_arquivos, pasta_destino, max_processos, formato_saida, abas,
+                                em_fluxo):
         try:
-            df_consolidado = self.processor.processar_arquivos_excel(lista_de_arquivos)
-            self.processor.salvar_consolidado_excel(self.pasta_destino_saida, df_consolidado)
-            self.processor.gerar_resumo_e_pdf_log(self.pasta_destino_saida, df_consolidado)
-            resultado = {"status": "sucesso", "mensagem": "Processamento concluído com sucesso!"}
+            mensagem = self.pool_processos.executar(contexto, "app.logic.junta_arquivos_processor:ExcelProcessor.juntar_arquivos",
+                                                    lista_de_arquivos, pasta_destino, max_processos=max_processos,
+                                                    formato_saida=formato_saida, em_fluxo=em_fluxo, abas=abas,
+                                                    logger=self._log_mensagem_thread_safe)
+            return {"status": "sucesso", "mensagem": mensagem}
         except Exception as e:
-            resultado = {"status": "erro", "mensagem": str(e)}
-        
-        self.signals.finished.emit(resultado)
+            return {"status": "erro", "mensagem": str(e)}
 
-    @Slot(dict)
+    @Slot(object)
     def _on_processing_finished(self, resultado):
         if resultado["status"] == "sucesso":
             QMessageBox.information(self, "Sucesso", resultado["mensagem"])
@@ -158,9 +227,4 @@ class JuntaArquivosGUI(QWidget):
         self.btn_processar.setText("🚀 Processar Arquivos")
     
     def _log_mensagem_thread_safe(self, mensagem):
-        self.signals.log_message.emit(mensagem)
-
-    @Slot(str)
-    def _append_log_message(self, mensagem):
-        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
-        self.caixa_log.append(f"[{timestamp}] {mensagem}")
\ No newline at end of file
+        self.caixa_log.registrar(mensagem)
\ No newline at end of file
@@ -0,0 +1,256 @@
+# app/widgets/dataframe_table.py
+import bisect
+import pandas as pd
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def _formatar_valor_padrao(valor):
+    """Converte um valor de célula em texto, exibindo nulos como célula vazia."""
+    if valor is None:
+        return ""
+    try:
+        if pd.isna(valor):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    return str(valor)
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Modelo de tabela virtualizado apoiado diretamente em um DataFrame (ou tabela Arrow).
+
+    Nenhum item Qt é criado por célula: a view pede apenas as células visíveis e
+    o texto de cada uma é formatado sob demanda em data().
+    """
+
+    def __init__(self, dados=None, colunas_ocultas=None, formatadores=None, parent=None):
+        """
+        Args:
+            dados (pd.DataFrame | pyarrow.Table, optional): Dados iniciais.
+            colunas_ocultas (list, optional): Colunas que não devem ser exibidas (ex: '_merge').
+            formatadores (dict, optional): Mapeia nome da coluna -> função que recebe o valor
+                                           bruto e retorna o texto a ser exibido.
+        """
+        super().__init__(parent)
+        self.colunas_ocultas = set(colunas_ocultas or [])
+        self.formatadores = dict(formatadores or {})
+        self._dados = None
+        self._colunas = []
+        self._valores = []          # Um array por coluna (DataFrame) ou ChunkedArray (Arrow)
+        self._offsets_chunks = []   # Início de cada chunk por coluna (apenas Arrow)
+        self._numericas = []
+        self._n_linhas = 0
+        self._carregar(dados)
+
+    # --- Carga dos dados ---
+
+    def _carregar(self, dados):
+        self._dados = dados
+        self._colunas, self._valores, self._offsets_chunks, self._numericas = [], [], [], []
+        self._n_linhas = 0
+        if dados is None:
+            return
+
+        if isinstance(dados, pd.DataFrame):
+            self._colunas = [str(c) for c in dados.columns if c not in self.colunas_ocultas]
+            colunas_df = [c for c in dados.columns if c not in self.colunas_ocultas]
+            for col in colunas_df:
+                serie = dados[col]
+                # to_numpy() não copia colunas object/numéricas; a leitura é feita célula a célula.
+                # Datas usam o array do pandas para que cada célula seja um Timestamp.
+                if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+                    self._valores.append(serie.array)
+                else:
+                    self._valores.append(serie.to_numpy())
+                self._numericas.append(pd.api.types.is_numeric_dtype(serie.dtype)
+                                       and not pd.api.types.is_bool_dtype(serie.dtype))
+            self._n_linhas = len(dados)
+        elif hasattr(dados, "column_names") and hasattr(dados, "num_rows"):
+            # Tabela Arrow: mantém os ChunkedArrays originais, sem cópia nem conversão
+            for nome in dados.column_names:
+                if nome in self.colunas_ocultas:
+                    continue
+                coluna = dados.column(nome)
+                self._colunas.append(str(nome))
+                self._valores.append(coluna)
+                offsets, inicio = [], 0
+                for chunk in coluna.chunks:
+                    offsets.append(inicio)
+                    inicio += len(chunk)
+                self._offsets_chunks.append(offsets)
+                tipo = str(coluna.type)
+                self._numericas.append(tipo.startswith(("int", "uint", "float", "double", "decimal")))
+            self._n_linhas = dados.num_rows
+        else:
+            raise TypeError(f"Tipo de dados não suportado pelo modelo: {type(dados).__name__}")
+
+    def definir_dados(self, dados):
+        """Substitui todos os dados exibidos pelo modelo."""
+        self.beginResetModel()
+        self._carregar(dados)
+        self.endResetModel()
+
+    def adicionar_linhas(self, df_novo: pd.DataFrame):
+        """Acrescenta as linhas de um DataFrame ao final dos dados atuais."""
+        if df_novo is None or df_novo.empty:
+            return
+        if self._dados is None or (isinstance(self._dados, pd.DataFrame) and self._dados.empty):
+            self.definir_dados(df_novo.reset_index(drop=True))
+            return
+        if not isinstance(self._dados, pd.DataFrame):
+            raise TypeError("Só é possível adicionar linhas a um modelo apoiado em DataFrame.")
+
+        inicio = self._n_linhas
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(df_novo) - 1)
+        self._carregar(pd.concat([self._dados, df_novo], ignore_index=True))
+        self.endInsertRows()
+
+    def sincronizar(self, dados, linha_alterada: int = None):
+        """
+        Atualiza o modelo depois que os dados de origem foram alterados fora dele
+        (ex: por um armazenamento da camada de lógica), notificando a view apenas do que mudou.
+        """
+        n_antes, n_depois = self._n_linhas, len(dados)
+        if linha_alterada is not None and n_depois == n_antes:
+            self._carregar(dados)
+            self.dataChanged.emit(self.index(linha_alterada, 0),
+                                  self.index(linha_alterada, len(self._colunas) - 1))
+        elif n_depois > n_antes > 0:
+            self.beginInsertRows(QModelIndex(), n_antes, n_depois - 1)
+            self._carregar(dados)
+            self.endInsertRows()
+        else:
+            self.definir_dados(dados)
+
+    def limpar(self):
+        self.definir_dados(None)
+
+    def dados(self):
+        """Retorna o objeto de dados (DataFrame ou tabela Arrow) que apoia o modelo."""
+        return self._dados
+
+    def colunas(self) -> list:
+        return list(self._colunas)
+
+    # --- Acesso às células ---
+
+    def valor_bruto(self, linha: int, coluna: int):
+        """Retorna o valor original (não formatado) de uma célula."""
+        valores = self._valores[coluna]
+        if self._offsets_chunks:
+            offsets = self._offsets_chunks[coluna]
+            idx_chunk = bisect.bisect_right(offsets, linha) - 1
+            return valores.chunk(idx_chunk)[linha - offsets[idx_chunk]].as_py()
+        return valores[linha]
+
+    def texto(self, linha: int, coluna: int) -> str:
+        """Retorna o texto exibido para uma célula, aplicando o formatador da coluna."""
+        formatador = self.formatadores.get(self._colunas[coluna], _formatar_valor_padrao)
+        return formatador(self.valor_bruto(linha, coluna))
+
+    def linha(self, linha: int) -> list:
+        """Retorna os valores brutos de uma linha inteira."""
+        return [self.valor_bruto(linha, j) for j in range(len(self._colunas))]
+
+    def textos_coluna(self, coluna: int) -> pd.Series:
+        """Retorna, de forma vetorizada, o texto exibido de todas as linhas de uma coluna."""
+        valores = self._valores[coluna]
+        serie = valores.to_pandas() if self._offsets_chunks else pd.Series(valores)
+        formatador = self.formatadores.get(self._colunas[coluna])
+        if formatador is not None:
+            return serie.map(formatador).astype(str)
+        return serie.astype(object).where(serie.notna(), "").astype(str)
+
+    # --- Interface QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._n_linhas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._colunas)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return self.texto(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole and self._numericas[index.column()]:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._colunas[section] if section < len(self._colunas) else None
+        return str(section + 1)
+
+
+class DataFrameTableView(QTableView):
+    """
+    QTableView configurada para grandes volumes: altura de linha fixa, sem quebra de
+    texto e largura das colunas estimada a partir de uma amostra (e não de todas as linhas,
+    como faz o ResizeToContents).
+    """
+
+    LARGURA_MAXIMA_COLUNA = 350
+    MARGEM_COLUNA = 24
+
+    def __init__(self, modelo: DataFrameTableModel = None, parent=None):
+        super().__init__(parent)
+        self.modelo = modelo if modelo is not None else DataFrameTableModel()
+        self.setModel(self.modelo)
+
+        self.setWordWrap(False)
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        vertical = self.verticalHeader()
+        vertical.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical.setDefaultSectionSize(self.fontMetrics().height() + 8)
+
+        self.modelo.modelReset.connect(self.ajustar_larguras)
+
+    def definir_dados(self, dados):
+        """Atalho para substituir os dados do modelo (as larguras são reestimadas)."""
+        self.modelo.definir_dados(dados)
+
+    def linha_origem(self, index) -> int:
+        """Converte um índice da view na linha do modelo de dados (considerando um filtro instalado)."""
+        if self.model() is not self.modelo:
+            index = self.model().mapToSource(index)
+        return index.row()
+
+    def selecionar_linha_origem(self, linha: int):
+        """Seleciona e rola até uma linha do modelo de dados, se ela estiver visível no filtro atual."""
+        indice = self.modelo.index(linha, 0)
+        if self.model() is not self.modelo:
+            indice = self.model().mapFromSource(indice)
+        if indice.isValid():
+            self.selectRow(indice.row())
+            self.scrollTo(indice)
+        else:
+            self.clearSelection()
+
+    def ajustar_larguras(self, amostra: int = 200):
+        """Estima a largura de cada coluna a partir do cabeçalho e de uma amostra de linhas."""
+        n_linhas = self.modelo.rowCount()
+        if n_linhas <= amostra:
+            linhas_amostra = range(n_linhas)
+        else:
+            passo = n_linhas / amostra
+            linhas_amostra = sorted({int(i * passo) for i in range(amostra)})
+
+        metricas = self.fontMetrics()
+        metricas_cabecalho = self.horizontalHeader().fontMetrics()
+        for col in range(self.modelo.columnCount()):
+            cabecalho = str(self.modelo.headerData(col, Qt.Orientation.Horizontal))
+            largura = metricas_cabecalho.horizontalAdvance(cabecalho)
+            textos = (self.modelo.texto(i, col) for i in linhas_amostra)
+            maior_texto = max(textos, key=len, default="")
+            largura = max(largura, metricas.horizontalAdvance(maior_texto))
+            self.setColumnWidth(col, min(largura + self.MARGEM_COLUNA, self.LARGURA_MAXIMA_COLUNA))
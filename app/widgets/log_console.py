@@ -0,0 +1,122 @@
+# app/widgets/log_console.py
+import os
+import datetime
+import threading
+from collections import deque
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QComboBox, QLabel
+from PySide6.QtCore import QTimer, Slot
+
+# Níveis do log, do menos ao mais grave
+NIVEL_INFO, NIVEL_AVISO, NIVEL_ERRO = 0, 1, 2
+
+PASTA_LOGS = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/logs'))
+
+
+def detectar_nivel(mensagem: str) -> int:
+    """Deduz o nível de uma mensagem a partir dos marcadores já usados nos logs do sistema."""
+    if any(marcador in mensagem for marcador in ("❌", "🚨", "ERRO", "Erro")):
+        return NIVEL_ERRO
+    if any(marcador in mensagem for marcador in ("⚠️", "AVISO", "Aviso")):
+        return NIVEL_AVISO
+    return NIVEL_INFO
+
+
+class LogConsole(QWidget):
+    """
+    Console de log compartilhado pelas telas.
+
+    registrar() pode ser chamado de qualquer thread: as mensagens ficam em uma fila e são
+    escritas na tela em lote por um timer, em vez de um append (e um redesenho) por mensagem.
+    Apenas as últimas `max_linhas` mensagens são mantidas em memória; opcionalmente, todas
+    são gravadas também em um arquivo de log.
+    """
+
+    INTERVALO_MS = 100
+    FILTROS = [("Todas as mensagens", NIVEL_INFO), ("Avisos e erros", NIVEL_AVISO), ("Apenas erros", NIVEL_ERRO)]
+
+    def __init__(self, max_linhas: int = 5000, nome_arquivo_log: str = None, parent=None):
+        """
+        Args:
+            max_linhas (int): Quantidade máxima de mensagens mantidas no console.
+            nome_arquivo_log (str, optional): Se informado, as mensagens também são gravadas em
+                                              data/logs/<nome>_<data>.log.
+        """
+        super().__init__(parent)
+        self._pendentes = deque()
+        self._trava = threading.Lock()
+        self._historico = deque(maxlen=max_linhas)   # (nível, linha) das últimas mensagens
+        self._nivel_minimo = NIVEL_INFO
+        self.caminho_arquivo_log = None
+        if nome_arquivo_log:
+            os.makedirs(PASTA_LOGS, exist_ok=True)
+            data = datetime.date.today().strftime('%Y%m%d')
+            self.caminho_arquivo_log = os.path.join(PASTA_LOGS, f"{nome_arquivo_log}_{data}.log")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        barra = QHBoxLayout()
+        barra.addStretch()
+        barra.addWidget(QLabel("Exibir:"))
+        self.combo_nivel = QComboBox()
+        self.combo_nivel.addItems([rotulo for rotulo, _ in self.FILTROS])
+        barra.addWidget(self.combo_nivel)
+        self.texto = QPlainTextEdit()
+        self.texto.setReadOnly(True)
+        self.texto.setMaximumBlockCount(max_linhas)
+        layout.addLayout(barra)
+        layout.addWidget(self.texto)
+
+        self.combo_nivel.currentIndexChanged.connect(self._alterar_filtro)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.INTERVALO_MS)
+        self._timer.timeout.connect(self._descarregar)
+        self._timer.start()
+
+    def registrar(self, mensagem: str, nivel: int = None):
+        """Enfileira uma mensagem (seguro para chamar a partir de threads de trabalho)."""
+        timestamp = datetime.datetime.now().strftime('%H:%M:%S')
+        nivel = detectar_nivel(mensagem) if nivel is None else nivel
+        with self._trava:
+            self._pendentes.append((nivel, f"[{timestamp}] {mensagem}"))
+
+    @Slot()
+    def _descarregar(self):
+        """Escreve de uma só vez, na tela e no arquivo, as mensagens acumuladas desde o último ciclo."""
+        with self._trava:
+            if not self._pendentes:
+                return
+            lote, self._pendentes = self._pendentes, deque()
+
+        self._historico.extend(lote)
+        visiveis = [linha for nivel, linha in lote if nivel >= self._nivel_minimo]
+        if visiveis:
+            # Se o lote for maior que o limite, só as últimas linhas ficariam na tela de qualquer forma
+            maximo = self.texto.maximumBlockCount()
+            self.texto.appendPlainText("\n".join(visiveis[-maximo:] if maximo else visiveis))
+
+        if self.caminho_arquivo_log:
+            try:
+                with open(self.caminho_arquivo_log, 'a', encoding='utf-8') as arquivo:
+                    arquivo.write("\n".join(linha for _, linha in lote) + "\n")
+            except OSError as e:
+                self.caminho_arquivo_log = None
+                self.texto.appendPlainText(f"⚠️ Não foi possível gravar o arquivo de log: {e}")
+
+    @Slot(int)
+    def _alterar_filtro(self, indice):
+        self._descarregar()
+        self._nivel_minimo = self.FILTROS[indice][1]
+        self.texto.setPlainText("\n".join(linha for nivel, linha in self._historico if nivel >= self._nivel_minimo))
+        self.texto.verticalScrollBar().setValue(self.texto.verticalScrollBar().maximum())
+
+    def clear(self):
+        """Descarta as mensagens pendentes, o histórico e o texto exibido."""
+        with self._trava:
+            self._pendentes.clear()
+        self._historico.clear()
+        self.texto.clear()
+
+    def toPlainText(self) -> str:
+        self._descarregar()
+        return self.texto.toPlainText()
@@ -0,0 +1,280 @@
+# app/widgets/table_filter.py
+import unicodedata
+import numpy as np
+import pandas as pd
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QComboBox, QLabel
+from PySide6.QtCore import Qt, QAbstractProxyModel, QModelIndex, QTimer, Slot, Signal
+
+from app.widgets.dataframe_table import DataFrameTableView
+
+
+def normalizar_texto(texto: str) -> str:
+    """Normaliza um termo de busca: sem acentos, sem espaços nas pontas e sem diferença de caixa."""
+    sem_acentos = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return sem_acentos.strip().casefold()
+
+
+class DataFrameFilterProxyModel(QAbstractProxyModel):
+    """
+    Proxy de filtro para um DataFrameTableModel.
+
+    Em vez de avaliar cada linha em filterAcceptsRow (uma chamada Python por linha), mantém
+    para cada coluna um índice com o texto já normalizado e calcula as linhas aceitas de forma
+    vetorizada. As linhas visíveis ficam em um array, então o mapeamento proxy <-> origem é O(1).
+    """
+
+    filtro_aplicado = Signal(int, int)  # linhas visíveis, total de linhas
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._indices = {}        # coluna -> array com o texto normalizado
+        self._linhas = None       # None = sem filtro (todas as linhas da origem)
+        self._posicao = None      # linha da origem -> linha do proxy (-1 se oculta)
+        self._termo = ""
+        self._colunas_busca = None
+        self._repassando_insercao = False  # beginInsertRows repassado, aguardando o rowsInserted da origem
+        self.colunas_padrao = []  # Colunas pesquisadas quando nenhuma é escolhida
+
+    def setSourceModel(self, modelo):
+        anterior = self.sourceModel()
+        if anterior is not None:
+            anterior.modelReset.disconnect(self._origem_resetada)
+            anterior.rowsAboutToBeInserted.disconnect(self._origem_inserindo_linhas)
+            anterior.rowsInserted.disconnect(self._origem_linhas_inseridas)
+            anterior.dataChanged.disconnect(self._origem_dados_alterados)
+        self.beginResetModel()
+        super().setSourceModel(modelo)
+        self._limpar_estado()
+        self.endResetModel()
+        modelo.modelReset.connect(self._origem_resetada)
+        modelo.rowsAboutToBeInserted.connect(self._origem_inserindo_linhas)
+        modelo.rowsInserted.connect(self._origem_linhas_inseridas)
+        modelo.dataChanged.connect(self._origem_dados_alterados)
+
+    def _limpar_estado(self):
+        self._indices.clear()
+        self._linhas = None
+        self._posicao = None
+
+    # --- Índices normalizados ---
+
+    def _colunas_alvo(self, colunas=None) -> list:
+        origem = self.sourceModel()
+        nomes = origem.colunas()
+        alvo = colunas if colunas else (self.colunas_padrao or nomes)
+        return [nomes.index(c) for c in alvo if c in nomes]
+
+    def _indice(self, coluna: int) -> np.ndarray:
+        """Retorna (construindo e guardando na primeira vez) o índice normalizado de uma coluna."""
+        indice = self._indices.get(coluna)
+        if indice is None:
+            textos = self.sourceModel().textos_coluna(coluna).str.strip().str.casefold()
+            # Só as células com acentos precisam da normalização Unicode, que é bem mais lenta
+            acentuadas = ~textos.str.isascii()
+            if acentuadas.any():
+                textos[acentuadas] = textos[acentuadas].map(normalizar_texto)
+            indice = textos.to_numpy(dtype=object)
+            self._indices[coluna] = indice
+        return indice
+
+    def preparar_indices(self):
+        """Pré-calcula os índices das colunas padrão para que a primeira busca já seja imediata."""
+        if self.sourceModel() is None:
+            return
+        for coluna in self._colunas_alvo():
+            self._indice(coluna)
+
+    # --- Filtro ---
+
+    def filtrar(self, termo: str, colunas: list = None):
+        """
+        Mostra apenas as linhas em que alguma das colunas contém o termo.
+
+        Args:
+            termo (str): Texto buscado (acentos e caixa são ignorados). Vazio remove o filtro.
+            colunas (list, optional): Nomes das colunas pesquisadas. Usa colunas_padrao se None.
+        """
+        termo_normalizado = normalizar_texto(termo)
+        origem = self.sourceModel()
+        total = origem.rowCount() if origem is not None else 0
+
+        # Refinamento: se o termo apenas cresceu, basta procurar entre as linhas já aceitas
+        refinamento = (self._linhas is not None and self._termo and colunas == self._colunas_busca
+                       and termo_normalizado.startswith(self._termo))
+
+        self.beginResetModel()
+        if not termo_normalizado or origem is None:
+            self._linhas = None
+            self._posicao = None
+        else:
+            candidatas = self._linhas if refinamento else np.arange(total)
+            aceitas = np.zeros(len(candidatas), dtype=bool)
+            for coluna in self._colunas_alvo(colunas):
+                valores = pd.Series(self._indice(coluna)[candidatas], dtype=object)
+                aceitas |= valores.str.contains(termo_normalizado, regex=False).to_numpy(dtype=bool)
+            self._linhas = candidatas[aceitas]
+            self._posicao = np.full(total, -1, dtype=np.int64)
+            self._posicao[self._linhas] = np.arange(len(self._linhas))
+        self._termo = termo_normalizado
+        self._colunas_busca = colunas
+        self.endResetModel()
+        self.filtro_aplicado.emit(self.rowCount(), total)
+
+    def filtro_ativo(self) -> bool:
+        return self._linhas is not None
+
+    def _reaplicar(self):
+        self._indices.clear()
+        termo, self._termo = self._termo, ""
+        self.filtrar(termo, self._colunas_busca)
+
+    # --- Reação às mudanças da origem ---
+
+    @Slot()
+    def _origem_resetada(self):
+        self.beginResetModel()
+        self._limpar_estado()
+        self.endResetModel()
+        if self._termo:
+            self._reaplicar()
+        else:
+            self.filtro_aplicado.emit(self.rowCount(), self.rowCount())
+        QTimer.singleShot(0, self.preparar_indices)
+
+    @Slot(QModelIndex, int, int)
+    def _origem_inserindo_linhas(self, parent, inicio, fim):
+        # Sem filtro, as linhas do proxy são as da origem: a inserção é repassada enquanto as linhas
+        # ainda não existem (rowCount() repassa o da origem). Com filtro, o filtro é reaplicado depois.
+        if not self.filtro_ativo():
+            self._repassando_insercao = True
+            self.beginInsertRows(QModelIndex(), inicio, fim)
+
+    @Slot(QModelIndex, int, int)
+    def _origem_linhas_inseridas(self, parent, inicio, fim):
+        self._indices.clear()
+        if not self._repassando_insercao:
+            self._reaplicar()
+            return
+        self._repassando_insercao = False
+        self.endInsertRows()
+        self.filtro_aplicado.emit(self.rowCount(), self.rowCount())
+
+    @Slot(QModelIndex, QModelIndex)
+    def _origem_dados_alterados(self, topo, base, papeis=None):
+        if self.filtro_ativo():
+            self._reaplicar()
+            return
+        self._indices.clear()
+        self.dataChanged.emit(self.mapFromSource(topo), self.mapFromSource(base))
+
+    # --- Interface QAbstractProxyModel ---
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._linhas is None else len(self._linhas)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount()) or not (0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        linha = proxy_index.row() if self._linhas is None else int(self._linhas[proxy_index.row()])
+        return self.sourceModel().index(linha, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        linha = source_index.row() if self._posicao is None else int(self._posicao[source_index.row()])
+        if linha < 0:
+            return QModelIndex()
+        return self.index(linha, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Vertical and self._linhas is not None and role == Qt.ItemDataRole.DisplayRole:
+            # Mostra o número da linha original, útil para localizar o registro depois de limpar o filtro
+            return str(int(self._linhas[section]) + 1) if section < len(self._linhas) else None
+        return self.sourceModel().headerData(section, orientation, role) if self.sourceModel() else None
+
+
+class FilterBar(QWidget):
+    """
+    Barra de busca que filtra uma DataFrameTableView enquanto o usuário digita.
+    Instala um DataFrameFilterProxyModel entre a view e o seu modelo.
+    """
+
+    ATRASO_MS = 150
+
+    def __init__(self, tabela: DataFrameTableView, colunas: list = None, parent=None):
+        """
+        Args:
+            tabela (DataFrameTableView): Tabela a ser filtrada.
+            colunas (list, optional): Colunas pesquisadas em "Todas as colunas" e oferecidas
+                                      no seletor (ex: matrícula, código, status).
+        """
+        super().__init__(parent)
+        self.tabela = tabela
+        self.colunas = list(colunas or [])
+
+        self.proxy = DataFrameFilterProxyModel(self)
+        self.proxy.colunas_padrao = self.colunas
+        self.proxy.setSourceModel(tabela.modelo)
+        tabela.setModel(self.proxy)
+        tabela.proxy = self.proxy
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.entry_busca = QLineEdit()
+        self.entry_busca.setPlaceholderText("🔍 Filtrar por matrícula, código, status...")
+        self.entry_busca.setClearButtonEnabled(True)
+        self.combo_coluna = QComboBox()
+        self.lbl_contagem = QLabel("")
+        layout.addWidget(self.entry_busca, 1)
+        layout.addWidget(self.combo_coluna)
+        layout.addWidget(self.lbl_contagem)
+
+        # Espera o usuário parar de digitar por um instante antes de filtrar
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.ATRASO_MS)
+        self._timer.timeout.connect(self._aplicar_filtro)
+        self.entry_busca.textChanged.connect(self._timer.start)
+        self.combo_coluna.currentIndexChanged.connect(self._aplicar_filtro)
+        self.proxy.filtro_aplicado.connect(self._atualizar_contagem)
+        tabela.modelo.modelReset.connect(self._atualizar_colunas)
+
+        self._atualizar_colunas()
+
+    @Slot()
+    def _atualizar_colunas(self):
+        disponiveis = self.tabela.modelo.colunas()
+        opcoes = [c for c in self.colunas if c in disponiveis] if self.colunas else disponiveis
+        atual = self.combo_coluna.currentText()
+        self.combo_coluna.blockSignals(True)
+        self.combo_coluna.clear()
+        self.combo_coluna.addItem("Todas as colunas")
+        self.combo_coluna.addItems(opcoes)
+        if atual in opcoes:
+            self.combo_coluna.setCurrentText(atual)
+        self.combo_coluna.blockSignals(False)
+
+    @Slot()
+    def _aplicar_filtro(self):
+        coluna = self.combo_coluna.currentText()
+        colunas = [coluna] if self.combo_coluna.currentIndex() > 0 else None
+        self.proxy.filtrar(self.entry_busca.text(), colunas)
+
+    @Slot(int, int)
+    def _atualizar_contagem(self, visiveis, total):
+        self.lbl_contagem.setText(f"{visiveis} de {total} registros" if self.proxy.filtro_ativo() else f"{total} registros")
@@ -0,0 +1,102 @@
+# app/widgets/task_list.py
+from PySide6.QtWidgets import QWidget, QFrame, QVBoxLayout, QHBoxLayout, QLabel, QProgressBar, QPushButton
+from PySide6.QtCore import QTimer, Slot
+
+from app.task_runner import TaskRunner, CONCLUIDA, FALHOU, CANCELADA
+
+
+class _LinhaTarefa(QFrame):
+    """Uma tarefa na lista: nome, etapa, barra de progresso e botão de cancelar."""
+
+    def __init__(self, tarefa, parent=None):
+        super().__init__(parent)
+        self.tarefa = tarefa
+        self.setObjectName("linha_tarefa")
+        self.setStyleSheet("#linha_tarefa { border: 1px solid #dcdcdc; border-radius: 4px; }")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.setSpacing(2)
+        topo = QHBoxLayout()
+        self.lbl_nome = QLabel(f"<b>{tarefa.nome}</b>")
+        self.lbl_nome.setWordWrap(True)
+        self.btn_cancelar = QPushButton("✖")
+        self.btn_cancelar.setFixedWidth(24)
+        self.btn_cancelar.setToolTip("Cancelar tarefa")
+        topo.addWidget(self.lbl_nome, 1)
+        topo.addWidget(self.btn_cancelar)
+        self.lbl_etapa = QLabel(tarefa.estado)
+        self.lbl_etapa.setWordWrap(True)
+        self.barra = QProgressBar()
+        self.barra.setMaximumHeight(10)
+        self.barra.setTextVisible(False)
+        self.barra.setRange(0, 0)
+        layout.addLayout(topo)
+        layout.addWidget(self.lbl_etapa)
+        layout.addWidget(self.barra)
+
+        self.btn_cancelar.clicked.connect(tarefa.cancelar)
+        tarefa.progresso_alterado.connect(self._atualizar_progresso)
+        tarefa.estado_alterado.connect(self._atualizar_estado)
+
+    @Slot(int, int, str)
+    def _atualizar_progresso(self, atual, total, etapa):
+        if total > 0:
+            self.barra.setRange(0, total)
+            self.barra.setValue(min(atual, total))
+            self.lbl_etapa.setText(f"{etapa} ({atual}/{total})" if etapa else f"{atual}/{total}")
+        else:
+            self.barra.setRange(0, 0)
+            self.lbl_etapa.setText(etapa or self.tarefa.estado)
+
+    @Slot(str)
+    def _atualizar_estado(self, estado):
+        if estado in (CONCLUIDA, FALHOU, CANCELADA):
+            self.btn_cancelar.setEnabled(False)
+            self.barra.setRange(0, 1)
+            self.barra.setValue(1 if estado == CONCLUIDA else 0)
+            texto = f"{estado} em {self.tarefa.duracao():.1f}s"
+            if estado == FALHOU and self.tarefa.erro:
+                texto += f": {self.tarefa.erro}"
+            self.lbl_etapa.setText(texto)
+        elif not self.tarefa.etapa:
+            self.lbl_etapa.setText(estado)
+
+
+class TaskListWidget(QWidget):
+    """Painel da janela principal com as tarefas em segundo plano em andamento."""
+
+    TEMPO_EXIBICAO_FINALIZADA_MS = 8000
+
+    def __init__(self, runner: TaskRunner = None, parent=None):
+        super().__init__(parent)
+        self.runner = runner or TaskRunner.instancia()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.lbl_titulo = QLabel()
+        self.layout_linhas = QVBoxLayout()
+        self.layout_linhas.setSpacing(4)
+        layout.addWidget(self.lbl_titulo)
+        layout.addLayout(self.layout_linhas)
+
+        self.runner.tarefa_adicionada.connect(self._adicionar_tarefa)
+        for tarefa in self.runner.tarefas_ativas():
+            self._adicionar_tarefa(tarefa)
+        self._atualizar_titulo()
+
+    @Slot(object)
+    def _adicionar_tarefa(self, tarefa):
+        linha = _LinhaTarefa(tarefa)
+        self.layout_linhas.addWidget(linha)
+        tarefa.estado_alterado.connect(lambda estado, l=linha: self._ao_mudar_estado(l, estado))
+        self._atualizar_titulo()
+
+    def _ao_mudar_estado(self, linha, estado):
+        self._atualizar_titulo()
+        if estado in (CONCLUIDA, FALHOU, CANCELADA):
+            QTimer.singleShot(self.TEMPO_EXIBICAO_FINALIZADA_MS, linha.deleteLater)
+
+    def _atualizar_titulo(self):
+        ativas = len(self.runner.tarefas_ativas())
+        self.lbl_titulo.setText(f"<b>Tarefas em andamento: {ativas}</b>" if ativas else "<b>Nenhuma tarefa em andamento</b>")
@@ -1,9 +1,19 @@
 # main.py
 import sys
-from PySide6.QtWidgets import QApplication
-from app.main_window import MainWindow
+import time
+import multiprocessing
+
+# Marca o início do processo para medir o tempo até a janela aparecer
+INICIO_APLICACAO = time.perf_counter()
 
 if __name__ == "__main__":
+    # Necessário para os processos de trabalho quando o sistema é distribuído como executável
+    multiprocessing.freeze_support()
+
+    # Importados aqui para que os processos de trabalho (que reexecutam este arquivo) não carreguem a interface
+    from PySide6.QtWidgets import QApplication
+    from app.main_window import MainWindow
+
     app = QApplication(sys.argv)
     
     # Define uma folha de estilos global para um visual mais moderno
@@ -20,6 +30,6 @@ if __name__ == "__main__":
         }
     """)
 
-    window = MainWindow()
+    window = MainWindow(inicio_aplicacao=INICIO_APLICACAO)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,95 @@
+# tests/test_calc_aco_processor.py
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+from app.logic.calc_aco_processor import CalcAcoProcessor
+from app.logic.tabela_tarifas import TabelaTarifas
+
+pytest.importorskip("openpyxl")
+
+
+@pytest.fixture
+def processor(tmp_path):
+    caminho = str(tmp_path / "tarifas.xlsx")
+    pd.DataFrame({
+        'CLF': ['A1', 'B2', 'B2', 'C3', 'D4'],
+        'CODIGO': ['1', '1', '2', '9', '5'],
+        'VALOR': ['10,00', '20', '30', 'x', '2.5'],
+    }).to_excel(caminho, index=False)
+    return CalcAcoProcessor(logger_callback=lambda _mensagem: None, caminho_dados=caminho)
+
+
+def _importado(linhas):
+    return pd.DataFrame(linhas, columns=['MATRICULA', 'CLF', 'CODIGO', 'REFERENCIA', 'OBSERVACAO']).fillna('')
+
+
+def test_buscar_tarifas(processor):
+    assert processor.buscar_tarifas('A1') == {'status': 'sucesso', 'tarifa_normal': 10.0,
+                                              'tarifa_majorada': pytest.approx(13.0)}
+    assert processor.buscar_tarifas('B2')['status'] == 'ambíguo'
+    assert processor.buscar_tarifas('B2', '2')['tarifa_normal'] == 30.0
+    assert processor.buscar_tarifas('B2', '7')['mensagem'] == "CLF 'B2' com código '7' não encontrado."
+    assert processor.buscar_tarifas('C3')['mensagem'] == "CLF 'C3' possui uma tarifa inválida na base de dados."
+    assert processor.buscar_tarifas('ZZ')['mensagem'] == "CLF 'ZZ' não encontrado."
+
+
+def test_calcular_lote_equivale_ao_calculo_linha_a_linha(processor):
+    df = _importado([
+        ['m1', 'A1', '', '1005', 'ok'],     # 5 h normais e 1 h majorada
+        ['m2', 'B2', '2', '8', ''],         # código desempata o CLF ambíguo
+        ['m3', 'D4', '', '12.0', ''],       # ".0" de números lidos como texto
+        ['m4', 'A1', '', 'abc', ''],        # horas inválidas valem zero
+        ['m5', 'B2', '', '8', ''],          # ambíguo sem código
+        ['m6', 'ZZ', '', '1', ''],          # CLF inexistente
+        ['m7', 'C3', '', '1', ''],          # tarifa inválida
+        ['', 'A1', '', '1', ''],            # matrícula faltando
+    ])
+    dados, erros = processor.calcular_lote(df)
+
+    assert isinstance(dados, pd.DataFrame)
+    assert dados['Matrícula'].tolist() == ['m1', 'm2', 'm3', 'm4']
+    assert dados.index.tolist() == [0, 1, 2, 3]
+    for _, linha in dados.iterrows():
+        esperado = processor.calcular_tudo(linha['CLF'], linha['Referencia (Horas)'], linha['Código'] or None)
+        assert linha['H. Normal'] == esperado['h_normal']
+        assert linha['H. Majorada'] == esperado['h_majorada']
+        assert linha['Tarifa Normal'] == pytest.approx(esperado['tarifa_normal'])
+        assert linha['Tarifa Majorada'] == pytest.approx(esperado['tarifa_majorada'])
+        assert linha['Valor Total'] == pytest.approx(esperado['valor_total'])
+    assert dados['Valor Total'].tolist() == pytest.approx([5 * 10 + 1 * 13, 8 * 30, 12 * 2.5, 0.0])
+
+    assert erros == [
+        "Linha 6 (Matrícula m5): CLF 'B2' é ambíguo. Forneça um Código.",
+        "Linha 7 (Matrícula m6): CLF 'ZZ' não encontrado.",
+        "Linha 8 (Matrícula m7): CLF 'C3' possui uma tarifa inválida na base de dados.",
+        "Linha 9: Dados obrigatórios faltando.",
+    ]
+
+
+def test_atualizacao_bloqueante_aguarda_recarga_em_andamento(processor):
+    tabela = processor.tabela
+    pd.DataFrame({'CLF': ['A1'], 'CODIGO': ['1'], 'VALOR': ['99']}).to_excel(tabela.caminho, index=False)
+    estado = os.stat(tabela.caminho)
+    os.utime(tabela.caminho, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1_000_000_000))
+
+    liberar = threading.Event()
+    carregar = tabela.carregar
+
+    def carregar_devagar(*args, **kwargs):
+        liberar.wait(5)
+        carregar(*args, **kwargs)
+
+    tabela.carregar = carregar_devagar
+    assert tabela.verificar_atualizacao(em_segundo_plano=True)
+    threading.Timer(0.2, liberar.set).start()
+    tabela.verificar_atualizacao(em_segundo_plano=False)
+    assert processor.buscar_tarifas('A1')['tarifa_normal'] == 99.0
+
+
+@pytest.fixture(autouse=True)
+def _sem_instancias_compartilhadas():
+    yield
+    TabelaTarifas._instancias.clear()
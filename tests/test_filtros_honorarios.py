@@ -0,0 +1,96 @@
+# tests/test_filtros_honorarios.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.logic.honorarios_processor import (FILTROS_HONORARIOS, FILTROS_COMPILADOS, compilar_filtros,
+                                            selecionar_por_filtro, somar_por_filtro, somar_em_blocos,
+                                            colunas_dos_filtros)
+
+
+def _folha(linhas: int = 2000, semente: int = 7) -> pd.DataFrame:
+    """Folha sintética com os valores que as regras distinguem, como texto (como lida da planilha)."""
+    gerador = np.random.default_rng(semente)
+    clf = gerador.choice([10021, 10033, 49911, 40001, 45000, 49107, 49108, 55111, 55257, 60000], linhas)
+    df = pd.DataFrame({
+        'CODIGO': gerador.choice(['898', '116', '898.0', ''], linhas),
+        'CLF': clf.astype(str),
+        'GRUPO': gerador.choice(['MAG', 'SFT', 'OUT', None], linhas),
+        'COD_ORGAO': gerador.choice(['29', '8', '12', 'x'], linhas),
+        'VALOR': gerador.integers(0, 100_000, linhas).astype(str),
+    })
+    df.loc[::17, 'CLF'] = 'sem clf'
+    return df
+
+
+def _referencia(df: pd.DataFrame, regra: dict) -> np.ndarray:
+    """Seleção de uma regra avaliada de forma direta, condição por condição."""
+    selecao = pd.Series(True, index=df.index)
+    for chave, valor in regra.items():
+        if isinstance(valor, dict):
+            coluna, valores = df[valor['coluna']], valor['valores']
+            if all(isinstance(v, (int, float)) for v in valores):
+                coluna = pd.to_numeric(coluna, errors='coerce')
+            if chave == 'isin':
+                selecao &= coluna.isin(valores)
+            elif chave == 'not_in':
+                selecao &= ~coluna.isin(valores)
+            else:
+                selecao &= coluna.between(valores[0], valores[1]).fillna(False)
+        else:
+            coluna = df[chave]
+            if isinstance(valor, (int, float)):
+                coluna = pd.to_numeric(coluna, errors='coerce')
+            selecao &= (coluna == valor).fillna(False)
+    return selecao.to_numpy(dtype=bool)
+
+
+def test_selecao_de_cada_regra_igual_a_avaliacao_direta():
+    df = _folha()
+    selecoes = selecionar_por_filtro(df)
+    assert list(selecoes) == list(FILTROS_HONORARIOS)
+    for nome, regra in FILTROS_HONORARIOS.items():
+        esperado = _referencia(df, regra)
+        assert esperado.any(), f"a folha de teste não exercita a regra {nome}"
+        np.testing.assert_array_equal(selecoes[nome], esperado, err_msg=nome)
+
+
+def test_somar_por_filtro_soma_valor_das_linhas_selecionadas():
+    df = _folha()
+    valor = pd.to_numeric(df['VALOR'])
+    totais = somar_por_filtro(df)
+    for nome, regra in FILTROS_HONORARIOS.items():
+        assert totais[nome] == pytest.approx(valor[_referencia(df, regra)].sum()), nome
+
+
+def test_somar_por_filtro_nao_altera_o_df():
+    df = _folha(100)
+    original = df.copy()
+    somar_por_filtro(df)
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_somar_em_blocos_igual_a_soma_do_arquivo_inteiro():
+    df = _folha()
+    blocos = (df.iloc[inicio:inicio + 300] for inicio in range(0, len(df), 300))
+    totais, linhas = somar_em_blocos(blocos)
+    assert linhas == len(df)
+    assert totais == pytest.approx(somar_por_filtro(df))
+
+
+def test_condicoes_repetidas_sao_compiladas_na_mesma_forma():
+    condicoes = [condicao for regra in FILTROS_COMPILADOS.values() for condicao in regra]
+    assert condicoes.count(('CODIGO', 'igual', 898)) == len(FILTROS_HONORARIOS)
+    assert ('CLF', 'range', (40001, 49107)) in FILTROS_COMPILADOS['MAG PENSAO']
+
+
+def test_operador_desconhecido():
+    with pytest.raises(ValueError, match="Operador desconhecido na regra 'X'"):
+        compilar_filtros({'X': {'entre': {'coluna': 'CLF', 'valores': [1, 2]}}})
+
+
+def test_nova_regra_com_coluna_de_texto():
+    df = pd.DataFrame({'GRUPO': ['MAG', 'SFT', 'MAG'], 'CLF': ['1', '2', '3'], 'VALOR': ['10', '20', '30']})
+    filtros = compilar_filtros({'MAG': {'GRUPO': 'MAG'}, 'SEM SFT': {'not_in': {'coluna': 'GRUPO', 'valores': ['SFT']}}})
+    assert somar_por_filtro(df, filtros) == {'MAG': 40.0, 'SEM SFT': 40.0}
+    assert colunas_dos_filtros(filtros) == ['GRUPO', 'VALOR']
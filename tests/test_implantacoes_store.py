@@ -0,0 +1,51 @@
+# tests/test_implantacoes_store.py
+import pandas as pd
+import pytest
+
+from app.logic.implantacoes_store import ImplantacoesStore
+
+
+@pytest.mark.parametrize("digitado, esperado", [
+    ('1.234,56', 1234.56),
+    ('1.234.567,8', 1234567.8),
+    ('15,5', 15.5),
+    ('15.5', 15.5),
+    ('10', 10.0),
+    (' 2,00 ', 2.0),
+    (12.5, 12.5),
+    ('', 0.0),
+    ('abc', 0.0),
+    (None, 0.0),
+])
+def test_converter_valor(digitado, esperado):
+    assert ImplantacoesStore.converter_valor(digitado) == pytest.approx(esperado)
+
+
+def test_normalizar_numero_so_trata_pontos_como_milhar_quando_ha_virgula():
+    textos = pd.Series(['1.234,56', '15.5', '1.000', '7,25'])
+    assert ImplantacoesStore._normalizar_numero(textos).tolist() == ['1234.56', '15.5', '1.000', '7.25']
+
+
+def _lote(valores):
+    df = pd.DataFrame({coluna: ['x'] * len(valores) for coluna in ImplantacoesStore.COLUNAS_ARQUIVO})
+    df['Valor'] = valores
+    df['Data'] = '01/02/2024'
+    return ImplantacoesStore._tipar(df)
+
+
+def test_tipar_converte_valores_no_formato_brasileiro():
+    df = _lote(['1.234,56', '15.5', None, 'abc'])
+    assert df['Valor'].dtype == 'float64'
+    assert df['Valor'].tolist() == pytest.approx([1234.56, 15.5, 0.0, 0.0])
+    assert df['Data'].iloc[0] == pd.Timestamp(2024, 2, 1)
+
+
+def test_importar_retorna_apenas_as_linhas_adicionadas():
+    store = ImplantacoesStore()
+    store.adicionar(['I', '123', '898', '2.000,00', '1', '12', 'obs'])
+    assert store.importar(_lote(['1', '2'])) == 2
+    assert len(store) == 3
+    assert store.df['Valor'].tolist() == pytest.approx([2000.0, 1.0, 2.0])
+
+    assert store.importar(_lote(['5']), substituir=True) == 1
+    assert len(store) == 1
@@ -0,0 +1,52 @@
+# tests/test_indice_prefixos.py
+import math
+import random
+
+import pandas as pd
+import pytest
+
+from app.logic.tabela_tarifas import IndicePrefixos, compilar
+
+
+def _busca_linear(linhas, prefixo_clf="", prefixo_codigo="", limite=50):
+    return sorted(linha for linha in linhas
+                  if linha[0].startswith(prefixo_clf) and linha[1].startswith(prefixo_codigo))[:limite]
+
+
+@pytest.fixture(scope="module")
+def linhas():
+    gerador = random.Random(3)
+    return [(str(gerador.randint(10000, 99999)), str(gerador.randint(1, 999)), float(gerador.randint(1, 500)), 1)
+            for _ in range(5000)]
+
+
+@pytest.mark.parametrize("prefixo_clf, prefixo_codigo", [
+    ("", ""), ("1", ""), ("123", ""), ("99999", ""), ("", "7"), ("", "12"), ("4", "3"), ("00", ""), ("5", "999"),
+])
+def test_buscar_igual_a_busca_linear(linhas, prefixo_clf, prefixo_codigo):
+    indice = IndicePrefixos(linhas)
+    todas = _busca_linear(linhas, prefixo_clf, prefixo_codigo, limite=len(linhas))
+    assert indice.buscar(prefixo_clf, prefixo_codigo, limite=len(linhas)) == todas
+    for limite in (1, 50):
+        # Com mais candidatos do que o limite, vêm `limite` deles (os primeiros da faixa mais estreita), ordenados por CLF
+        encontradas = indice.buscar(prefixo_clf, prefixo_codigo, limite)
+        assert len(encontradas) == min(limite, len(todas))
+        assert encontradas == sorted(encontradas)
+        assert set(encontradas) <= set(todas)
+
+
+def test_buscar_por_clf_traz_os_primeiros_clfs(linhas):
+    indice = IndicePrefixos(linhas)
+    assert indice.buscar("1", "", 50) == _busca_linear(linhas, "1", "", 50)
+
+
+def test_compilar_marca_ambiguos_e_tarifas_invalidas():
+    indice = compilar(pd.DataFrame({'CLF': [' 10021', '10021', '10033', '20000'], 'CODIGO': ['1', '2', '1', '1'],
+                                    'VALOR': ['10,5', '11', 'x', '7']}))
+    assert len(indice.prefixos) == 4
+    encontrados = indice.prefixos.buscar("1002")
+    assert [(clf, codigo, tarifa, linhas_clf) for clf, codigo, tarifa, linhas_clf in encontrados] == [
+        ('10021', '1', 10.5, 2), ('10021', '2', 11.0, 2)]
+    clf, codigo, tarifa, linhas_clf = indice.prefixos.buscar("10033")[0]
+    assert (clf, codigo, linhas_clf) == ('10033', '1', 1) and math.isnan(tarifa)
+    assert indice.prefixos.buscar("3") == []
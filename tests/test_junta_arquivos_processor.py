@@ -0,0 +1,17 @@
+# tests/test_junta_arquivos_processor.py
+import os
+
+import pytest
+
+from app.logic.junta_arquivos_processor import ExcelProcessor
+
+pytest.importorskip("fpdf")
+
+
+def test_pdf_resumo_aceita_nomes_fora_do_latin1(tmp_path):
+    processor = ExcelProcessor(logger_callback=lambda _mensagem: None)
+    processor._gerar_pdf_resumo(str(tmp_path), {"jan–fev.xlsx": 2},
+                                {"jan–fev.xlsx": ["Colunas ausentes: Valor – bruto"]})
+    gerados = os.listdir(tmp_path)
+    assert len(gerados) == 1 and gerados[0].endswith(".pdf")
+    assert os.path.getsize(tmp_path / gerados[0]) > 0
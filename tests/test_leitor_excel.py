@@ -0,0 +1,37 @@
+# tests/test_leitor_excel.py
+import pytest
+
+from app.logic.leitor_excel import interpretar_abas, selecionar_abas
+
+NOMES = ['Janeiro', '2024', 'Fev-1', 'Fev-2', 'Resumo']
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("", None),
+    ("  ", None),
+    ("*", ["*"]),
+    ("#1, #3", [0, 2]),
+    ("2024", ["2024"]),
+    ("Janeiro, Fev*, # 2", ["Janeiro", "Fev*", 1]),
+    ("#x", ["#x"]),
+])
+def test_interpretar_abas(texto, esperado):
+    assert interpretar_abas(texto) == esperado
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("", ['Janeiro']),
+    ("*", NOMES),
+    ("2024", ['2024']),
+    ("#2", ['2024']),
+    ("#5, #1", ['Janeiro', 'Resumo']),
+    ("#9", []),
+    ("fev*", ['Fev-1', 'Fev-2']),
+    ("Resumo, Fev-?, Janeiro", ['Janeiro', 'Fev-1', 'Fev-2', 'Resumo']),
+])
+def test_selecionar_abas_a_partir_do_texto(texto, esperado):
+    assert selecionar_abas(NOMES, interpretar_abas(texto)) == esperado
+
+
+def test_selecionar_abas_posicao_negativa():
+    assert selecionar_abas(NOMES, -1) == ['Resumo']
@@ -0,0 +1,90 @@
+# tests/test_reconciliacao_esquema.py
+import pandas as pd
+import pytest
+
+from app.logic.reconciliacao_esquema import (ReconciliadorEsquema, chave_coluna, tipo_da_coluna, _tipo_unificado,
+                                             COLUNA_ORIGEM, VAZIO, INTEIRO, DECIMAL, DATA, LOGICO, TEXTO)
+
+
+def test_chave_coluna_ignora_caixa_e_espacos():
+    assert chave_coluna(" Matrícula  ") == chave_coluna("MATRÍCULA") == "matrícula"
+    assert chave_coluna("Valor   Bruto") == "valor bruto"
+
+
+@pytest.mark.parametrize("valores, esperado", [
+    ([None, None], VAZIO),
+    ([1, 2], INTEIRO),
+    ([1.0, None, 3.0], INTEIRO),  # Inteiros com células vazias são lidos como decimais
+    ([1.5, 2.0], DECIMAL),
+    ([True, False], LOGICO),
+    ([pd.Timestamp(2024, 1, 1), None], DATA),
+    (['a', 1], TEXTO),
+])
+def test_tipo_da_coluna(valores, esperado):
+    assert tipo_da_coluna(pd.Series(valores)) == esperado
+
+
+@pytest.mark.parametrize("tipos, esperado", [
+    (set(), VAZIO),
+    ({VAZIO}, VAZIO),
+    ({INTEIRO, VAZIO}, INTEIRO),
+    ({INTEIRO, DECIMAL}, DECIMAL),
+    ({INTEIRO, TEXTO}, TEXTO),
+    ({DATA, DECIMAL}, TEXTO),
+])
+def test_tipo_unificado(tipos, esperado):
+    assert _tipo_unificado(tipos) == esperado
+
+
+def _consolidar(*arquivos):
+    reconciliador = ReconciliadorEsquema()
+    dfs = []
+    for nome, df in arquivos:
+        df = df.assign(**{COLUNA_ORIGEM: nome})
+        dfs.append(reconciliador.registrar(nome, df))
+    return reconciliador, reconciliador.consolidar(dfs)
+
+
+def test_consolidar_alinha_grafias_e_unifica_tipos():
+    reconciliador, df = _consolidar(
+        ("jan.xlsx", pd.DataFrame({"Matrícula": [1, 2], "Valor": [10, 20]})),
+        ("fev.xlsx", pd.DataFrame({"MATRÍCULA ": [3], "Valor": [1.5], "Obs": ["x"]})),
+    )
+    assert list(df.columns) == ["Matrícula", "Valor", "Obs", COLUNA_ORIGEM]
+    assert df["Matrícula"].tolist() == [1, 2, 3]
+    assert str(df["Matrícula"].dtype) == "Int8"  # Menor inteiro que comporta os valores
+    assert df["Valor"].dtype == "float64"
+    assert df["Valor"].tolist() == [10.0, 20.0, 1.5]
+    assert df["Obs"].isna().tolist() == [True, True, False]
+    assert isinstance(df[COLUNA_ORIGEM].dtype, pd.CategoricalDtype)
+    assert df[COLUNA_ORIGEM].tolist() == ["jan.xlsx", "jan.xlsx", "fev.xlsx"]
+
+
+def test_consolidar_mantem_texto_sem_ponto_zero():
+    _, df = _consolidar(
+        ("a.xlsx", pd.DataFrame({"Codigo": [898.0, None]})),
+        ("b.xlsx", pd.DataFrame({"Codigo": ["ABC"]})),
+    )
+    assert df["Codigo"].astype(object).where(df["Codigo"].notna(), None).tolist() == ["898", None, "ABC"]
+
+
+def test_menor_inteiro_acompanha_a_faixa_de_todos_os_arquivos():
+    _, df = _consolidar(
+        ("a.xlsx", pd.DataFrame({"N": [1]})),
+        ("b.xlsx", pd.DataFrame({"N": [70000]})),
+    )
+    assert str(df["N"].dtype) == "Int32"
+
+
+def test_divergencias():
+    reconciliador, _ = _consolidar(
+        ("jan.xlsx", pd.DataFrame({"Matrícula": [1], "Valor": [10]})),
+        ("fev.xlsx", pd.DataFrame({"MATRÍCULA": [2], "Valor": ["dez"]})),
+    )
+    relatorio = reconciliador.divergencias()
+    assert set(relatorio) == {"jan.xlsx", "fev.xlsx"}
+    assert "Colunas renomeadas: 'MATRÍCULA' -> 'Matrícula'" in relatorio["fev.xlsx"]
+    assert relatorio["jan.xlsx"] == ["Tipos divergentes: Valor (inteiro, consolidada como texto)"]
+
+    em_fluxo = reconciliador.divergencias(tipos_convertidos=False)
+    assert em_fluxo["jan.xlsx"] == ["Tipos divergentes: Valor (inteiro, gravada como veio do arquivo, sem conversão para texto)"]